@@ -0,0 +1,74 @@
+"""
+Benchmark: batched remove_overlap / remove_overlap_new vs the pairwise-loop versions
+
+Usage (from the OmniParser directory):
+    python benchmark_overlap.py
+    python benchmark_overlap.py --sizes 100,500,2000 --repeat 3 --ocr-ratio 0.5
+"""
+import argparse
+import copy
+import random
+import time
+
+import torch
+
+from util.utils import remove_overlap, remove_overlap_loop, remove_overlap_new, remove_overlap_new_loop
+
+
+def synthetic_boxes(n, rng):
+    """n normalized xyxy boxes shaped like UI elements (small, many overlaps)"""
+    boxes = []
+    for _ in range(n):
+        w, h = rng.uniform(0.01, 0.15), rng.uniform(0.01, 0.06)
+        x, y = rng.uniform(0, 1 - w), rng.uniform(0, 1 - h)
+        boxes.append([x, y, x + w, y + h])
+    return boxes
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='remove_overlap benchmark')
+    parser.add_argument('--sizes', default='100,250,500,1000,2000', help='number of icon boxes')
+    parser.add_argument('--ocr-ratio', type=float, default=0.5, help='ocr boxes per icon box')
+    parser.add_argument('--iou', type=float, default=0.7)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'function':<20}{'boxes':>7}{'ocr':>7}{'loop (s)':>11}{'batched (s)':>13}{'speedup':>9}  same")
+    for n in (int(v) for v in args.sizes.split(',')):
+        icons = synthetic_boxes(n, rng)
+        ocr = synthetic_boxes(int(n * args.ocr_ratio), rng)
+        icon_elems = [{'type': 'icon', 'bbox': b, 'interactivity': True, 'content': None} for b in icons]
+        ocr_elems = [{'type': 'text', 'bbox': b, 'interactivity': False, 'content': f'text {i}', 'source': 'box_ocr_content_ocr'}
+                     for i, b in enumerate(ocr)]
+
+        cases = [
+            ('remove_overlap', remove_overlap_loop, remove_overlap,
+             lambda: (torch.tensor(icons), args.iou, [list(b) for b in ocr])),
+            ('remove_overlap_new', remove_overlap_new_loop, remove_overlap_new,
+             lambda: (copy.deepcopy(icon_elems), args.iou, copy.deepcopy(ocr_elems))),
+        ]
+        for name, loop_fn, batched_fn, make_args in cases:
+            loop_s, expected = timed(lambda: loop_fn(*make_args()), args.repeat)
+            batched_s, result = timed(lambda: batched_fn(*make_args()), args.repeat)
+            if isinstance(expected, torch.Tensor):
+                same = torch.equal(expected, result)
+            else:
+                same = expected == result
+            speedup = loop_s / batched_s if batched_s else float('inf')
+            print(f"{name:<20}{n:>7}{len(ocr):>7}{loop_s:>11.3f}{batched_s:>13.3f}{speedup:>8.1f}x  {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,7 +8,7 @@ from PIL import Image
 from anthropic.types.beta import BetaToolComputerUse20241022Param
 
 from .base import BaseAnthropicTool, ToolError, ToolResult
-from .screen_capture import get_screenshot
+from .screen_capture import get_screenshot, wait_for_stable
 import requests
 import re
 
@@ -242,7 +242,8 @@ class ComputerTool(BaseAnthropicTool):
                 json={"command": command_list},
                 timeout=90
             )
-            time.sleep(0.7) # avoid async error as actions take time to complete
+            if not parse:
+                wait_for_stable() # actions take time to complete: return once the screen settles
             print(f"action executed")
             if response.status_code != 200:
                 raise ToolError(f"Failed to execute command. Status code: {response.status_code}")
@@ -262,7 +263,6 @@ class ComputerTool(BaseAnthropicTool):
             self.target_dimension = MAX_SCALING_TARGETS["WXGA"]
         width, height = self.target_dimension["width"], self.target_dimension["height"]
         screenshot, path = get_screenshot(resize=True, target_width=width, target_height=height)
-        time.sleep(0.7) # avoid async error as actions take time to complete
         return ToolResult(base64_image=base64.b64encode(path.read_bytes()).decode())
 
     def padding_image(self, screenshot):
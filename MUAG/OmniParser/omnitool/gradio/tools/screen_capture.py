@@ -1,7 +1,8 @@
+import time
 from pathlib import Path
 from uuid import uuid4
 import requests
-from PIL import Image
+from PIL import Image, ImageChops
 from .base import BaseAnthropicTool, ToolError
 from io import BytesIO
 
@@ -26,4 +27,41 @@ def get_screenshot(resize: bool = False, target_width: int = 1920, target_height
         screenshot.save(path)
         return screenshot, path
     except Exception as e:
-        raise ToolError(f"Failed to capture screenshot: {str(e)}")
\ No newline at end of file
+        raise ToolError(f"Failed to capture screenshot: {str(e)}")
+
+def _sample_screen(size=(320, 200)):
+    """Small grayscale screenshot used to detect on-screen changes"""
+    response = requests.get('http://localhost:5000/screenshot')
+    if response.status_code != 200:
+        raise ToolError(f"Failed to capture screenshot: HTTP {response.status_code}")
+    return Image.open(BytesIO(response.content)).convert("L").resize(size)
+
+
+def wait_for_stable(timeout: float = 2.0, quiet: float = 0.3, interval: float = 0.1, threshold: float = 0.002):
+    """
+    Wait until the VM screen stops changing, at most `timeout` seconds.
+    Returns True as soon as no change was seen for `quiet` seconds.
+    """
+    start = time.time()
+    try:
+        previous = _sample_screen()
+    except Exception:
+        time.sleep(min(timeout, 0.7)) # screen unavailable: previous fixed delay
+        return False
+    last_change = time.time()
+    while time.time() - last_change < quiet:
+        if time.time() - start >= timeout:
+            return False
+        time.sleep(interval)
+        try:
+            current = _sample_screen()
+        except Exception:
+            # capture lost mid-wait: spend the rest of the budget, then let the action proceed
+            time.sleep(max(0.0, timeout - (time.time() - start)))
+            return False
+        histogram = ImageChops.difference(previous, current).histogram()
+        changed = sum(histogram[30:]) / float(current.size[0] * current.size[1])
+        if changed > threshold:
+            last_change = time.time()
+        previous = current
+    return True
@@ -1,3 +1,4 @@
+from collections import defaultdict
 from typing import List, Optional, Union, Tuple
 
 import cv2
@@ -85,6 +86,7 @@ class BoxAnnotator:
             ```
         """
         font = cv2.FONT_HERSHEY_SIMPLEX
+        grid = DetectionGrid(detections.xyxy.astype(int)) if self.avoid_overlap else None
         for i in range(len(detections)):
             x1, y1, x2, y2 = detections.xyxy[i].astype(int)
             class_id = (
@@ -135,7 +137,7 @@ class BoxAnnotator:
                 # text_background_x2 = x1
                 # text_background_y2 = y1 + 2 * self.text_padding + text_height
             else:
-                text_x, text_y, text_background_x1, text_background_y1, text_background_x2, text_background_y2 = get_optimal_label_pos(self.text_padding, text_width, text_height, x1, y1, x2, y2, detections, image_size)
+                text_x, text_y, text_background_x1, text_background_y1, text_background_x2, text_background_y2 = get_optimal_label_pos(self.text_padding, text_width, text_height, x1, y1, x2, y2, detections, image_size, grid=grid)
 
             cv2.rectangle(
                 img=scene,
@@ -186,16 +188,56 @@ def IoU(box1, box2, return_max=True):
         return intersection / union
 
 
-def get_optimal_label_pos(text_padding, text_width, text_height, x1, y1, x2, y2, detections, image_size):
+class DetectionGrid:
+    """
+    Spatial hash over detection boxes (xyxy, int), built once per annotate() call.
+    A label background can only overlap (IoU > 0) the boxes registered in the
+    grid cells it covers, so each candidate position is checked against those
+    boxes only instead of every detection.
+    """
+
+    def __init__(self, boxes, cell_size=64):
+        self.boxes = boxes
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self.always = []  # degenerate boxes, checked on every query
+        for i, (bx1, by1, bx2, by2) in enumerate(boxes):
+            if bx2 < bx1 or by2 < by1:
+                self.always.append(i)
+                continue
+            for key in self._cells(bx1, by1, bx2, by2):
+                self.cells[key].append(i)
+
+    def _cells(self, x1, y1, x2, y2):
+        for gx in range(int(x1) // self.cell_size, int(x2) // self.cell_size + 1):
+            for gy in range(int(y1) // self.cell_size, int(y2) // self.cell_size + 1):
+                yield gx, gy
+
+    def query(self, x1, y1, x2, y2):
+        found = set(self.always)
+        if x2 >= x1 and y2 >= y1:
+            for key in self._cells(x1, y1, x2, y2):
+                found.update(self.cells.get(key, ()))
+        else:
+            found.update(range(len(self.boxes)))
+        return sorted(found)
+
+
+def get_optimal_label_pos(text_padding, text_width, text_height, x1, y1, x2, y2, detections, image_size, grid=None):
     """ check overlap of text and background detection box, and get_optimal_label_pos, 
         pos: str, position of the text, must be one of 'top left', 'top right', 'outer left', 'outer right' TODO: if all are overlapping, return the last one, i.e. outer right
         Threshold: default to 0.3
+        grid: optional DetectionGrid over detections.xyxy, limits the overlap checks to nearby boxes
     """
 
     def get_is_overlap(detections, text_background_x1, text_background_y1, text_background_x2, text_background_y2, image_size):
         is_overlap = False
-        for i in range(len(detections)):
-            detection = detections.xyxy[i].astype(int)
+        if grid is not None:
+            candidates = grid.query(text_background_x1, text_background_y1, text_background_x2, text_background_y2)
+            boxes = [grid.boxes[i] for i in candidates]
+        else:
+            boxes = [detections.xyxy[i].astype(int) for i in range(len(detections))]
+        for detection in boxes:
             if IoU([text_background_x1, text_background_y1, text_background_x2, text_background_y2], detection) > 0.3:
                 is_overlap = True
                 break
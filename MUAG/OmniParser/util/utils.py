@@ -17,18 +17,49 @@ import cv2
 import numpy as np
 # %matplotlib inline
 from matplotlib import pyplot as plt
-import easyocr
-from paddleocr import PaddleOCR
-reader = easyocr.Reader(['en'])
-paddle_ocr = PaddleOCR(
-    lang='en',  # other lang also available
-    use_angle_cls=False,
-    use_gpu=False,  # using cuda will conflict with pytorch in the same process
-    show_log=False,
-    max_batch_size=1024,
-    use_dilation=True,  # improves accuracy
-    det_db_score_mode='slow',  # improves accuracy
-    rec_batch_num=1024)
+import threading
+_ocr_lock = threading.Lock()
+_reader = None
+_paddle_ocr = None
+
+
+def get_easyocr_reader():
+    """EasyOCR reader, created on first use"""
+    global _reader
+    if _reader is None:
+        with _ocr_lock:
+            if _reader is None:
+                import easyocr
+                _reader = easyocr.Reader(['en'])
+    return _reader
+
+
+def get_paddle_ocr():
+    """PaddleOCR instance, created on first use"""
+    global _paddle_ocr
+    if _paddle_ocr is None:
+        with _ocr_lock:
+            if _paddle_ocr is None:
+                from paddleocr import PaddleOCR
+                _paddle_ocr = PaddleOCR(
+                    lang='en',  # other lang also available
+                    use_angle_cls=False,
+                    use_gpu=False,  # using cuda will conflict with pytorch in the same process
+                    show_log=False,
+                    max_batch_size=1024,
+                    use_dilation=True,  # improves accuracy
+                    det_db_score_mode='slow',  # improves accuracy
+                    rec_batch_num=1024)
+    return _paddle_ocr
+
+
+def __getattr__(name):
+    # backward compatibility for `from util.utils import reader, paddle_ocr`
+    if name == 'reader':
+        return get_easyocr_reader()
+    if name == 'paddle_ocr':
+        return get_paddle_ocr()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 import time
 import base64
 
@@ -175,9 +206,153 @@ def get_parsed_content_icon_phi3v(filtered_boxes, ocr_bbox, image_source, captio
 
     return generated_texts
 
+# Batched box overlap: all pairwise IoU / containment ratios are computed as
+# numpy matrices (row blocks of OVERLAP_BLOCK_ROWS to bound memory) instead of
+# per-pair Python calls. Results are identical to the *_loop reference versions.
+OVERLAP_BLOCK_ROWS = 512
+
+
+def _boxes_array(boxes):
+    if isinstance(boxes, torch.Tensor):
+        boxes = boxes.tolist()
+    return np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+
+
+def _box_areas(boxes):
+    return (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+
+def _intersection_matrix(boxes1, boxes2):
+    """inter[i, j] = intersection area of boxes1[i] and boxes2[j] (xyxy)"""
+    w = np.minimum(boxes1[:, None, 2], boxes2[None, :, 2]) - np.maximum(boxes1[:, None, 0], boxes2[None, :, 0])
+    h = np.minimum(boxes1[:, None, 3], boxes2[None, :, 3]) - np.maximum(boxes1[:, None, 1], boxes2[None, :, 1])
+    return np.maximum(0, w) * np.maximum(0, h)
+
+
+def _iou_matrix(inter, areas1, areas2):
+    """Same score as remove_overlap's IoU(): max(IoU, inter/area1, inter/area2)"""
+    a1 = areas1[:, None]
+    a2 = areas2[None, :]
+    union = a1 + a2 - inter + 1e-6
+    both_positive = (a1 > 0) & (a2 > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        iou = inter / union
+        ratio1 = np.where(both_positive, inter / a1, 0)
+        ratio2 = np.where(both_positive, inter / a2, 0)
+    return np.maximum(iou, np.maximum(ratio1, ratio2))
+
+
+def _inside_matrix(inter, areas, threshold):
+    """inside[i, j] = inter[i, j] / areas[i] > threshold (row box inside column box)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = inter / areas[:, None]
+    return np.nan_to_num(ratio, nan=0.0, posinf=0.0, neginf=0.0) > threshold
+
+
+def _keep_smaller_boxes(boxes, iou_threshold):
+    """valid[i] = no other box j overlaps box i (IoU > threshold) while being smaller"""
+    n = len(boxes)
+    areas = _box_areas(boxes)
+    valid = np.ones(n, dtype=bool)
+    for start in range(0, n, OVERLAP_BLOCK_ROWS):
+        rows = slice(start, min(start + OVERLAP_BLOCK_ROWS, n))
+        inter = _intersection_matrix(boxes[rows], boxes)
+        overlap = _iou_matrix(inter, areas[rows], areas) > iou_threshold
+        overlap &= areas[rows, None] > areas[None, :]
+        idx = np.arange(rows.start, rows.stop)
+        overlap[idx - rows.start, idx] = False
+        valid[rows] = ~overlap.any(axis=1)
+    return valid
+
+
 def remove_overlap(boxes, iou_threshold, ocr_bbox=None):
     assert ocr_bbox is None or isinstance(ocr_bbox, List)
 
+    box_list = boxes.tolist()
+    boxes_np = _boxes_array(box_list)
+    filtered_boxes = []
+    if ocr_bbox:
+        filtered_boxes.extend(ocr_bbox)
+    if not box_list:
+        return torch.tensor(filtered_boxes)
+
+    valid = _keep_smaller_boxes(boxes_np, iou_threshold)
+    if ocr_bbox:
+        # only keep a box if it does not overlap (without being inside) any ocr bbox
+        ocr_np = _boxes_array(ocr_bbox)
+        inter = _intersection_matrix(boxes_np, ocr_np)
+        overlap = _iou_matrix(inter, _box_areas(boxes_np), _box_areas(ocr_np)) > iou_threshold
+        overlap &= ~_inside_matrix(inter, _box_areas(boxes_np), 0.95)
+        valid &= ~overlap.any(axis=1)
+    filtered_boxes.extend(box_list[i] for i in np.flatnonzero(valid))
+    return torch.tensor(filtered_boxes)
+
+
+def remove_overlap_new(boxes, iou_threshold, ocr_bbox=None):
+    '''
+    ocr_bbox format: [{'type': 'text', 'bbox':[x,y], 'interactivity':False, 'content':str }, ...]
+    boxes format: [{'type': 'icon', 'bbox':[x,y], 'interactivity':True, 'content':None }, ...]
+
+    Batched version of remove_overlap_new_loop: the icon/icon IoU matrix and the
+    icon/ocr containment matrices are computed once, then only the ocr boxes
+    related to each kept icon are visited (in the original order).
+    '''
+    assert ocr_bbox is None or isinstance(ocr_bbox, List)
+
+    if not boxes:
+        return list(ocr_bbox) if ocr_bbox else []
+
+    boxes_np = _boxes_array([elem['bbox'] for elem in boxes])
+    valid = _keep_smaller_boxes(boxes_np, iou_threshold)
+
+    if not ocr_bbox:
+        return [boxes[i]['bbox'] for i in np.flatnonzero(valid)]
+
+    ocr_np = _boxes_array([elem['bbox'] for elem in ocr_bbox])
+    inter = _intersection_matrix(ocr_np, boxes_np)  # [ocr, icon]
+    ocr_in_icon = _inside_matrix(inter, _box_areas(ocr_np), 0.80)
+    icon_in_ocr = _inside_matrix(inter.T, _box_areas(boxes_np), 0.80)
+    related = ocr_in_icon.T | icon_in_ocr  # [icon, ocr]
+
+    removed = set()
+    added = []
+    for i in np.flatnonzero(valid):
+        box_added = False
+        ocr_labels = ''
+        for k in np.flatnonzero(related[i]):
+            if ocr_in_icon[k, i]: # ocr inside icon
+                try:
+                    # gather all ocr labels
+                    ocr_labels += ocr_bbox[k]['content'] + ' '
+                except:
+                    continue
+                j = _first_equal(ocr_bbox, ocr_np, k, removed)
+                if j is not None:
+                    removed.add(int(j))
+            else: # icon inside ocr, don't add this icon box (ocr boxes don't overlap)
+                box_added = True
+                break
+        if not box_added:
+            if ocr_labels:
+                added.append({'type': 'icon', 'bbox': boxes[i]['bbox'], 'interactivity': True, 'content': ocr_labels, 'source':'box_yolo_content_ocr'})
+            else:
+                added.append({'type': 'icon', 'bbox': boxes[i]['bbox'], 'interactivity': True, 'content': None, 'source':'box_yolo_content_yolo'})
+    return [elem for k, elem in enumerate(ocr_bbox) if k not in removed] + added
+
+
+def _first_equal(elems, elems_np, k, removed):
+    # list.remove() semantics of the loop version: the first remaining element
+    # equal to elems[k] is removed (None when all its duplicates are gone)
+    for j in np.flatnonzero((elems_np == elems_np[k]).all(axis=1)):
+        if j not in removed and elems[j] == elems[k]:
+            return j
+    return None
+
+
+def remove_overlap_loop(boxes, iou_threshold, ocr_bbox=None):
+    """Reference pairwise-loop implementation of remove_overlap (kept for benchmarks)"""
+    assert ocr_bbox is None or isinstance(ocr_bbox, List)
+
     def box_area(box):
         return (box[2] - box[0]) * (box[3] - box[1])
 
@@ -228,8 +403,10 @@ def remove_overlap(boxes, iou_threshold, ocr_bbox=None):
     return torch.tensor(filtered_boxes)
 
 
-def remove_overlap_new(boxes, iou_threshold, ocr_bbox=None):
+def remove_overlap_new_loop(boxes, iou_threshold, ocr_bbox=None):
     '''
+    Reference pairwise-loop implementation of remove_overlap_new (kept for benchmarks)
+
     ocr_bbox format: [{'type': 'text', 'bbox':[x,y], 'interactivity':False, 'content':str }, ...]
     boxes format: [{'type': 'icon', 'bbox':[x,y], 'interactivity':True, 'content':None }, ...]
 
@@ -514,13 +691,13 @@ def check_ocr_box(image_source: Union[str, Image.Image], display_img = True, out
             text_threshold = 0.5
         else:
             text_threshold = easyocr_args['text_threshold']
-        result = paddle_ocr.ocr(image_np, cls=False)[0]
+        result = get_paddle_ocr().ocr(image_np, cls=False)[0]
         coord = [item[0] for item in result if item[1][1] > text_threshold]
         text = [item[1][0] for item in result if item[1][1] > text_threshold]
     else:  # EasyOCR
         if easyocr_args is None:
             easyocr_args = {}
-        result = reader.readtext(image_np, **easyocr_args)
+        result = get_easyocr_reader().readtext(image_np, **easyocr_args)
         coord = [item[0] for item in result]
         text = [item[1] for item in result]
     if display_img:
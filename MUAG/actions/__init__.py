@@ -3,4 +3,24 @@ Actions Package - Modules d'automatisation de l'ordinateur
 """
 from pathlib import Path
 
-__all__ = []
+__all__ = ["warmup_vision"]
+
+
+def warmup_vision() -> dict:
+    """
+    Charge et préchauffe les modèles vision (OmniParser + PaddleOCR)
+    Les détecteurs sont sinon chargés au premier usage par le CUA.
+
+    Returns:
+        {composant: durée en secondes}
+    """
+    import time
+    from .omniparser_detector import get_omniparser
+    from .paddle_ocr_detector import get_paddle_ocr
+
+    timings = {}
+    for name, getter in [("omniparser", get_omniparser), ("paddleocr", get_paddle_ocr)]:
+        start = time.time()
+        getter().warmup()
+        timings[name] = time.time() - start
+    return timings
@@ -7,6 +7,8 @@ from pathlib import Path
 import json
 import psutil
 
+from .screen_monitor import screen_monitor
+
 
 class AppLauncher:
     def __init__(self):
@@ -178,7 +180,6 @@ class AppLauncher:
     
     def launch_url(self, url, browser="chrome"):
         """Lance une URL dans Chrome en mode debug pour Playwright"""
-        import time
         import os
         from config import CHROME_DEBUG_PORT
         
@@ -200,7 +201,7 @@ class AppLauncher:
                 # Fallback: utiliser start
                 subprocess.Popen(f'start chrome "{url}"', shell=True)
                 print(f"🌐 URL ouverte: {url}")
-                time.sleep(3)
+                screen_monitor.wait_for_stable(timeout=3.0, min_wait=0.5)
                 return True
             
             # Lancer Chrome en mode debug
@@ -213,7 +214,8 @@ class AppLauncher:
             
             subprocess.Popen(cmd)
             print(f"🌐 URL ouverte (mode debug port {CHROME_DEBUG_PORT}): {url}")
-            time.sleep(3)
+            # Rend la main dès que la fenêtre a fini de s'afficher (3s max)
+            screen_monitor.wait_for_stable(timeout=3.0, min_wait=0.5)
             return True
             
         except Exception as e:
@@ -4,28 +4,45 @@ Architecture: VLM #1 (Planificateur) ↔ VLM #2 (Exécuteur) avec Feedback Loop
 Pipeline: Screenshot → VLM #1 → OmniParser + PaddleOCR + SemanticEnricher →
           Annotation → VLM #2 → PyAutoGUI
 """
+import re
+import threading
 import time
-import base64
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
 import pyautogui
-import cv2
 import numpy as np
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 from .gui_controller import GUIController
 from .file_manager import FileManager
 from .app_launcher import AppLauncher
 from utils.ollama_client import OllamaClient
-from config import WEB_SCREENSHOTS_DIR
+from utils.model_residency import residency_manager
+from utils.inference_telemetry import inference_telemetry
+from config import (
+    WEB_SCREENSHOTS_DIR,
+    VISION_TIMEOUT,
+    VISION_CANCEL_POLL_S,
+    CUA_ZONE_FIRST,
+    CUA_ZONE_LLM_FALLBACK,
+    CUA_ZONES,
+    CUA_DEFAULT_ZONE,
+    CUA_ZONE_KEYWORDS,
+    CUA_PROMPT_PREFIX_FIRST,
+)
 
 # Modules de vision
 from .vision_preprocessing import preprocessor
-from .omniparser_detector import omniparser
+from .omniparser_detector import get_omniparser
 from .screen_monitor import screen_monitor
-from .visual_annotator import annotator
+from .incremental_parser import incremental_parser, offset_detection
+from .visual_annotator import annotator, MarkedFrame
+from .vlm_image_encoder import vlm_image_encoder
+from .frame import Frame, frame_dumper
+from .screen_state_cache import screen_state_cache
 
 # OCR Paddle
-from .paddle_ocr_detector import paddle_ocr
+from .paddle_ocr_detector import get_paddle_ocr
 
 # Semantic Enricher
 from .semantic_enricher import semantic_enricher
@@ -60,7 +77,7 @@ class CUAAgent:
         self.gui = GUIController()
         self.files = FileManager()
         self.apps = AppLauncher()
-        self.llm = OllamaClient()
+        self.llm = OllamaClient(component="cua_zone")
         # WebHelper (Playwright) - fail-safe
         from config import ENABLE_PLAYWRIGHT_SUPPORT, CHROME_DEBUG_PORT
         
@@ -86,7 +103,7 @@ class CUAAgent:
         if vlm_model is None:
             try:
                 print(f"[CUA] Initialisation VLM #1 (planification): {FALLBACK_VLM_MODEL}")
-                self.vlm1 = OllamaClient(model=FALLBACK_VLM_MODEL)
+                self.vlm1 = OllamaClient(model=FALLBACK_VLM_MODEL, component="vlm1")
                 print("[CUA] VLM #1 chargé ✓")
             except Exception as e:
                 print(f"[CUA] Erreur VLM #1: {e}")
@@ -94,7 +111,7 @@ class CUAAgent:
             
             try:
                 print(f"[CUA] Initialisation VLM #2 (exécution): {TARS_MODEL_NAME}")
-                self.vlm2 = OllamaClient(model=TARS_MODEL_NAME)
+                self.vlm2 = OllamaClient(model=TARS_MODEL_NAME, component="vlm2")
                 print("[CUA] VLM #2 chargé ✓")
             except Exception as e:
                 print(f"[CUA] Erreur VLM #2: {e}")
@@ -106,8 +123,8 @@ class CUAAgent:
         else:
             # Mode manuel : même modèle pour les deux
             self.vlm_model = vlm_model
-            self.vlm1 = OllamaClient(model=vlm_model)
-            self.vlm2 = OllamaClient(model=vlm_model)
+            self.vlm1 = OllamaClient(model=vlm_model, component="vlm1")
+            self.vlm2 = OllamaClient(model=vlm_model, component="vlm2")
             self.vlm = self.vlm1
 
         self.screenshots_dir = Path(WEB_SCREENSHOTS_DIR)
@@ -115,6 +132,16 @@ class CUAAgent:
 
         self.action_history: List[Dict] = []
         self.max_iterations = 50
+        # Évaluation du prompt par appel VLM (clé → cumul), comparée avec/sans préfixe en tête
+        self.prompt_eval_stats: Dict[str, Dict] = {}
+
+        # Détecteurs vision indépendants jusqu'au SemanticEnricher → en parallèle
+        self.vision_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="vision")
+        # Vision spéculative lancée dès le screenshot, en parallèle de VLM #1
+        self.speculative_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vision-spec")
+        self.last_vision_timings: Dict = {}
+        # Dernier appel de chaque détecteur (jamais relancé tant qu'il tourne encore)
+        self.detector_futures: Dict = {}
 
         print("[CUA] Agent prêt (Dual-VLM + OmniParser + PaddleOCR + SemanticEnricher)")
 
@@ -137,6 +164,10 @@ class CUAAgent:
 
         self.action_history = []
         screen_monitor.reset_history()
+        incremental_parser.reset()
+        task_start = time.time()
+
+        self.prompt_eval_stats = {}
         step = 0
         task_completed = False
 
@@ -198,10 +229,10 @@ class CUAAgent:
                     from config import AUTO_CLOSE_POPUPS
                     if AUTO_CLOSE_POPUPS and self.web.handle_popups_auto():
                         print("[WebHelper] Popups fermés")
-                        time.sleep(0.5)  # Laisser le DOM se stabiliser
+                        self.web.wait_for_page_settled(timeout_s=1.0, network_idle=False)  # Laisser le DOM se stabiliser
                 
-                # 1. SCREENSHOT
-                screenshot_path = self.capture_screen(step)
+                # 1. SCREENSHOT (en mémoire, dump de debug en arrière-plan)
+                screenshot = self.capture_screen(step)
                 
                 # Vérifier pause manuelle
                 if keyboard_ctrl and keyboard_ctrl.paused:
@@ -217,39 +248,44 @@ class CUAAgent:
                     continue
 
                 # 2. PREPROCESSING
-                original_img = cv2.imread(str(screenshot_path))
                 # --- AJOUT: CROP PARTIE DROITE ---
                 # Exemple: on garde 70% de la largeur (de 0 à 70%)
-                h, w = original_img.shape[:2]
+                h, w = screenshot.shape[:2]
                 new_width = int(w * 0.70)  # <--- Change 0.70 selon tes besoins
-                original_img = original_img[0:h, 0:new_width]
                 
-                # CRITIQUE: On écrase le fichier pour que tout le pipeline utilise le crop
-                cv2.imwrite(str(screenshot_path), original_img)
-                if original_img is None:
-                    print(f"[CUA] Impossible de lire le screenshot: {screenshot_path}")
-                    break
+                # CRITIQUE: tout le pipeline utilise le crop (vue en mémoire, pas de réécriture)
+                screenshot = screenshot.crop(0, 0, new_width, h, name=screenshot.name)
+                screenshot.dump()
+                original_img = screenshot.image
 
                 original_h, original_w = original_img.shape[:2]
 
-                preprocessed = self.preprocess_screenshot(screenshot_path)
-                preprocessed_path = self.screenshots_dir / f"preprocessed_step_{step}.png"
-                cv2.imwrite(str(preprocessed_path), preprocessed)
+                preprocessed = self.preprocess_screenshot(screenshot, step)
 
                 preprocessed_h, preprocessed_w = preprocessed.shape[:2]
 
-                scale_x = original_w / float(preprocessed_w)
-                scale_y = original_h / float(preprocessed_h)
+                scale_x, scale_y = preprocessed.scale
                 context["scale_factor"] = (scale_x, scale_y)
                 print(
                     f"[CUA] Scale: {original_w}x{original_h} → {preprocessed_w}x{preprocessed_h} "
                     f"(x{scale_x:.2f}, y{scale_y:.2f})"
                 )
 
+                # 2.5 VISION SPÉCULATIVE: ne dépend que du screenshot, tourne pendant VLM #1
+                # (zone d'abord: sur la zone de l'étape précédente, en pari)
+                vision_zone = context.get("zone", CUA_DEFAULT_ZONE) if CUA_ZONE_FIRST else None
+                # Écran déjà vu (même fenêtre/URL, même image): vision reprise du cache
+                state_key = self.screen_state_key(context)
+                vision_cancel = threading.Event()
+                vision_future = self.speculative_executor.submit(
+                    self.run_vision_stage, preprocessed, vision_cancel, vision_zone, state_key
+                )
+
                 # 3. VLM #1 - PLANIFICATION / CHECK TÂCHE
-                vlm_plan = self.analyze_with_vlm(screenshot_path, context)
+                vlm_plan = self.analyze_with_vlm(screenshot, context)
                 # Vérifier pause manuelle
                 if keyboard_ctrl and keyboard_ctrl.paused:
+                    self._discard_vision(vision_cancel, vision_future, "pause")
                     print("⏸️  En pause - En attente de [C]...")
                     while keyboard_ctrl.paused and not keyboard_ctrl.stop_requested:
                         time.sleep(0.5)
@@ -261,13 +297,26 @@ class CUAAgent:
                 vlm_description = vlm_plan.get("description", "Écran visible")
                 vlm_suggestion = vlm_plan.get("suggestion", "Continuer")
                 task_complete = vlm_plan.get("task_complete", False)
-                # Décharger VLM #1 immédiatement pour libérer VRAM
+                # Libérer VLM #1 selon la politique de résidence (no-op si gardé chaud)
                 self.vlm1.unload()
                 if task_complete:
+                    self._discard_vision(vision_cancel, vision_future, "tâche terminée")
                     print(f"\n[CUA] VLM #1 confirme: tâche terminée en {step} étapes")
                     task_completed = True
                     break
 
+                # 3.1 ZONE: connue avant la vision (VLM #1, sinon mots-clés)
+                zone = self.determine_zone(task_description, vlm_plan)
+                context["zone"] = zone
+                if CUA_ZONE_FIRST and zone != vision_zone:
+                    # Pari raté: relancer la vision sur la zone choisie
+                    self._discard_vision(vision_cancel, vision_future, f"zone {vision_zone} → {zone}")
+                    vision_zone = zone
+                    vision_cancel = threading.Event()
+                    vision_future = self.speculative_executor.submit(
+                        self.run_vision_stage, preprocessed, vision_cancel, vision_zone, state_key
+                    )
+
                 # 3.5 PLAYWRIGHT FAST-PATH (NOUVEAU)
                 # Tenter d'exécuter via Playwright AVANT le pipeline Vision
                 if self.router:
@@ -277,6 +326,7 @@ class CUAAgent:
                     try:
                         if self.router.try_fast_path(vlm_suggestion, task_description):
                             print("[CUA] ✅ Fast-path réussi ! Skip Vision pipeline")
+                            self._discard_vision(vision_cancel, vision_future, "fast-path Playwright")
                             
                             # Mettre à jour le contexte
                             context["last_action_result"] = f"Fast-path Playwright: {vlm_suggestion} - SUCCÈS"
@@ -290,7 +340,9 @@ class CUAAgent:
                                 "result": "Succès via Playwright",
                             })
                             
-                            time.sleep(2)
+                            # Attendre la fin du chargement puis l'affichage (au lieu de 2s fixes)
+                            self.web.wait_for_page_settled()
+                            screen_monitor.wait_for_stable()
                             
                             # ✅ NOUVEAU : Vérifier si tâche globale terminée
                             step += 1
@@ -315,80 +367,20 @@ class CUAAgent:
                 # → Continuer avec le pipeline Vision normal
 
                 # 4. VISION: OmniParser + PaddleOCR + SemanticEnricher
-                print("\n[CUA] Vision: OmniParser + PaddleOCR + SemanticEnricher")
-
-                # 4.1 OmniParser
-                omni_clickables = omniparser.detect_ui_elements(preprocessed)
-                print(
-                    f"[CUA] OmniParser: {len(omni_clickables)} éléments UI bruts détectés"
-                )
-
-                # 4.2 PaddleOCR sur l'image préprocessée (même repère que OmniParser)
-                ocr_results = paddle_ocr.detect_text(preprocessed)
-                print(f"[CUA] PaddleOCR: {len(ocr_results)} textes détectés")
-
-                # 4.3 SemanticEnricher: fusion OCR + OmniParser, classification fonctionnelle
-                enriched_clickables = semantic_enricher.enrich(
-                    clickable_elements=omni_clickables,
-                    ocr_results=ocr_results,
-                    image_shape=preprocessed.shape[:2],
-                    context="browser",
-                )
-                clickables_text = semantic_enricher.format_for_llm(enriched_clickables)
+                # (lancée en spéculatif à l'étape 2.5, on récupère son résultat)
 
-                # 4.4 AJOUT : Tous les textes OCR comme éléments cliquables séparés
-                # (même si déjà dans une box OmniParser - le VLM choisira la précision)
-                ocr_elements = []
-                symboles_communs = ['×', '+', '−', '—', '←', '→', '↑', '↓', '☰', '⋮', '•', '*', '.', ',', '!', '?', 'x', 'X']
-                
-                for ocr in ocr_results:
-                    ocr_text = ocr.get('text', '').strip()
-                    
-                    # Ignorer symboles simples (déjà détectés par OmniParser)
-                    if ocr_text in symboles_communs:
-                        continue
-                    
-                    # Ignorer textes vides ou trop courts (< 2 caractères) sauf chiffres
-                    if len(ocr_text) < 1 or (len(ocr_text) == 1 and not ocr_text.isdigit()):
-                        continue
-                    
-                    ocr_elem = {
-                        'id': len(enriched_clickables) + len(ocr_elements),
-                        'label': ocr_text,
-                        'description': f"Text: {ocr_text}",
-                        'bbox': ocr.get('bbox', [0, 0, 0, 0]),
-                        'center': ocr.get('center', (0, 0)),
-                        'confidence': ocr.get('confidence', 0.0),
-                        'type': 'text_ocr',  # Pour distinction visuelle (couleur cyan)
-                        'enriched_description': f"Text: {ocr_text}",
-                        'visual_description': 'Text element',
-                        'ocr_nearby': ocr_text,
-                        'functional_type': 'text',
-                        'function': 'text',
-                        'spatial_context': 'main content',
-                        'position': list(ocr.get('center', (0, 0))),
-                    }
-                    ocr_elements.append(ocr_elem)
-                
-                symboles_ignores = len([t for t in ocr_results if t.get('text','').strip() in symboles_communs])
-                print(f"[CUA] Ajout {len(ocr_elements)} textes OCR (ignoré {symboles_ignores} symboles)")
-                
-                # Combiner OmniParser enrichis + Textes OCR
-                enriched_clickables = enriched_clickables + ocr_elements
-                
-                # Réassigner IDs séquentiels pour cohérence
-                for i, elem in enumerate(enriched_clickables):
-                    elem['id'] = i
-                
-                # Reformater pour VLM avec éléments combinés
-                clickables_text = semantic_enricher.format_for_llm(enriched_clickables)
+                # Préchauffer VLM #2 pendant que la vision termine
+                residency_manager.prepare_stage("cua_execution")
 
-                # 5. ANNOTATION VISUELLE (Set-of-Mark) avec éléments enrichis + OCR
-                annotated_screenshot = annotator.annotate_screenshot(
-                    preprocessed_path,
-                    enriched_clickables,
-                )
-                print(f"[CUA] Screenshot annoté: {annotated_screenshot}")
+                vision = vision_future.result()
+                if vision is None:
+                    # Abandonnée alors qu'on en a besoin (ne devrait pas arriver): relancer
+                    vision = self.run_vision_stage(preprocessed, zone=vision_zone, state_key=state_key)
+                enriched_clickables = vision["enriched_clickables"]
+                clickables_text = vision["clickables_text"]
+                annotated_screenshot = vision["annotated_screenshot"]
+                # Zone rendue pour VLM #2: celle parsée ("full" si repli plein écran)
+                render_zone = vision["zone"] if CUA_ZONE_FIRST else zone
 
                 # 6. SCREEN MONITORING
                 image = original_img
@@ -417,6 +409,7 @@ class CUAAgent:
                     change_summary,
                     context,
                     annotated_screenshot,
+                    render_zone,
                 )
                 # Vérifier pause manuelle
                 if keyboard_ctrl and keyboard_ctrl.paused:
@@ -434,7 +427,7 @@ class CUAAgent:
                 if self.intervention_detector:
                     page_text = self.web.get_page_text() if self.web else ""
                     intervention = self.intervention_detector.detect_intervention_needed(
-                        screenshot_path=str(screenshot_path),
+                        screenshot_path=str(screenshot.path or ""),
                         page_text=page_text,
                         vlm_description=vlm_description,
                         planned_action=next_action  # ✅ DICT maintenant
@@ -485,7 +478,10 @@ class CUAAgent:
                 )
                 context["steps_done"].append(action_description)
 
-                time.sleep(2)
+                # Attendre que l'UI réagisse à l'action (au lieu de 2s fixes)
+                if self.web and self.web.connected:
+                    self.web.wait_for_page_settled()
+                screen_monitor.wait_for_stable()
 
             except Exception as e:
                 print(f"[CUA] Erreur étape {step}: {e}")
@@ -498,6 +494,16 @@ class CUAAgent:
                 else:
                     break
 
+        # Dumps de debug en attente écrits avant de rendre la main
+        frame_dumper.flush()
+        screen_state_cache.save()
+
+        print(residency_manager.format_decision_log())
+        print(f"[VLMEncoder] {vlm_image_encoder.get_stats()}")
+        print(f"[ScreenCache] {screen_state_cache.get_stats()}")
+        print(inference_telemetry.format_report(since=task_start))
+        print(self.format_prompt_eval_stats())
+
         return {
             "status": "success" if task_completed else "partial",
             "steps": step,
@@ -507,15 +513,305 @@ class CUAAgent:
             "task_complete": task_completed, 
         }
 
-    def capture_screen(self, step: int) -> Path:
-        """Capture screenshot"""
-        return self.gui.take_screenshot(f"cua_step_{step}.png")
+    def capture_screen(self, step: int) -> Frame:
+        """Capture screenshot (en mémoire)"""
+        return self.gui.capture_frame(f"cua_step_{step}.png")
+
+    def preprocess_screenshot(self, screenshot: Frame, step: int) -> Frame:
+        """Preprocessing OpenCV (dump de debug en arrière-plan)"""
+        preprocessed = preprocessor.preprocess_frame(screenshot, f"preprocessed_step_{step}.png")
+        preprocessed.dump()
+        return preprocessed
+
+    def run_vision_stage(
+        self,
+        preprocessed: Frame,
+        cancel_event: Optional[threading.Event] = None,
+        zone: Optional[str] = None,
+        state_key: Optional[str] = None,
+    ) -> Optional[Dict]:
+        """
+        Vision complète d'une étape: OmniParser + PaddleOCR + SemanticEnricher + annotation.
+        Ne dépend que du screenshot: lancée en spéculatif pendant VLM #1 et abandonnée
+        (retourne None) si cancel_event est levé entre deux sous-étapes.
+
+        zone: détection + OCR limités à cette zone (CUA_ZONES), repli plein écran
+        si rien n'y est détecté. None = plein écran.
+        Une seule échéance (VISION_TIMEOUT) couvre toutes les détections de l'étape.
+        state_key: fenêtre/URL de l'écran (screen_state_key); si l'image de la zone
+        est déjà dans screen_state_cache, détection + OCR + enrichissement sont repris.
+
+        Returns:
+            {enriched_clickables, clickables_text, ocr_results,
+             annotated_screenshot (MarkedFrame), zone (zone parsée ou "full"),
+             complete (False si un détecteur a échoué)} ou None
+        """
+        requested_zone = zone or "full"
+        print(f"\n[CUA] Vision: OmniParser + PaddleOCR + SemanticEnricher (zone: {requested_zone})")
+
+        # 4.0 ÉCRAN DÉJÀ VU: résultats mémorisés (l'annotation est refaite sur cette frame)
+        zone_image = self.zone_image(preprocessed, zone)
+        cached = screen_state_cache.get(state_key, requested_zone, zone_image)
+        if cached is not None:
+            for elem in cached["enriched_clickables"]:
+                elem["center"] = tuple(elem.get("center", (0, 0)))
+            annotated_screenshot = annotator.prepare_frame(preprocessed, cached["enriched_clickables"])
+            print(f"[CUA] Vision reprise du cache: {len(cached['enriched_clickables'])} éléments")
+            return {
+                "enriched_clickables": cached["enriched_clickables"],
+                "clickables_text": cached["clickables_text"],
+                "ocr_results": cached["ocr_results"],
+                "annotated_screenshot": annotated_screenshot,
+                "zone": cached["zone"],
+                "complete": True,
+            }
+
+        # 4.1 + 4.2 OmniParser + PaddleOCR (seulement sur les zones modifiées
+        # depuis l'étape précédente, le reste est repris)
+        deadline = time.time() + VISION_TIMEOUT
+
+        def detect_fn(image):
+            return self.detect_vision(image, deadline, cancel_event)
+
+        omni_clickables, ocr_results = [], []
+        complete = True
+        if zone:
+            x1, y1, x2, y2 = self.zone_rect(zone, preprocessed.shape)
+            omni_clickables, ocr_results, info = incremental_parser.parse(
+                zone_image, detect_fn, key=zone, cancel_event=cancel_event
+            )
+            complete = info["complete"]
+            if info.get("cancelled"):
+                print("[CUA] Vision spéculative abandonnée (pendant la détection)")
+                return None
+            # Repère de la frame entière (enrichissement, annotation et clics inchangés)
+            omni_clickables = [offset_detection(d, x1, y1) for d in omni_clickables]
+            ocr_results = [offset_detection(d, x1, y1) for d in ocr_results]
+            if complete and not omni_clickables and not ocr_results:
+                print(f"[CUA] Rien détecté dans la zone {zone} → repli plein écran")
+                zone = None
+        if not zone:
+            zone = "full"
+            omni_clickables, ocr_results, info = incremental_parser.parse(
+                preprocessed.image, detect_fn, key=zone, cancel_event=cancel_event
+            )
+            complete = info["complete"]
+            if info.get("cancelled"):
+                print("[CUA] Vision spéculative abandonnée (pendant la détection)")
+                return None
+        if not complete:
+            print("[CUA] ⚠️ Vision incomplète (détecteur en échec ou hors délai)")
+        print(
+            f"[CUA] OmniParser: {len(omni_clickables)} éléments UI bruts détectés"
+        )
+        print(f"[CUA] PaddleOCR: {len(ocr_results)} textes détectés")
+        if cancel_event is not None and cancel_event.is_set():
+            print("[CUA] Vision spéculative abandonnée (après détection)")
+            return None
+
+        # 4.3 SemanticEnricher: fusion OCR + OmniParser, classification fonctionnelle
+        enriched_clickables = semantic_enricher.enrich(
+            clickable_elements=omni_clickables,
+            ocr_results=ocr_results,
+            image_shape=preprocessed.shape[:2],
+            context="browser",
+        )
+        clickables_text = semantic_enricher.format_for_llm(enriched_clickables)
+
+        # 4.4 AJOUT : Tous les textes OCR comme éléments cliquables séparés
+        # (même si déjà dans une box OmniParser - le VLM choisira la précision)
+        ocr_elements = []
+        symboles_communs = ['×', '+', '−', '—', '←', '→', '↑', '↓', '☰', '⋮', '•', '*', '.', ',', '!', '?', 'x', 'X']
+        
+        for ocr in ocr_results:
+            ocr_text = ocr.get('text', '').strip()
+            
+            # Ignorer symboles simples (déjà détectés par OmniParser)
+            if ocr_text in symboles_communs:
+                continue
+            
+            # Ignorer textes vides ou trop courts (< 2 caractères) sauf chiffres
+            if len(ocr_text) < 1 or (len(ocr_text) == 1 and not ocr_text.isdigit()):
+                continue
+            
+            ocr_elem = {
+                'id': len(enriched_clickables) + len(ocr_elements),
+                'label': ocr_text,
+                'description': f"Text: {ocr_text}",
+                'bbox': ocr.get('bbox', [0, 0, 0, 0]),
+                'center': ocr.get('center', (0, 0)),
+                'confidence': ocr.get('confidence', 0.0),
+                'type': 'text_ocr',  # Pour distinction visuelle (couleur cyan)
+                'enriched_description': f"Text: {ocr_text}",
+                'visual_description': 'Text element',
+                'ocr_nearby': ocr_text,
+                'functional_type': 'text',
+                'function': 'text',
+                'spatial_context': 'main content',
+                'position': list(ocr.get('center', (0, 0))),
+            }
+            ocr_elements.append(ocr_elem)
+        
+        symboles_ignores = len([t for t in ocr_results if t.get('text','').strip() in symboles_communs])
+        print(f"[CUA] Ajout {len(ocr_elements)} textes OCR (ignoré {symboles_ignores} symboles)")
+        
+        # Combiner OmniParser enrichis + Textes OCR
+        enriched_clickables = enriched_clickables + ocr_elements
+        
+        # Réassigner IDs séquentiels pour cohérence
+        for i, elem in enumerate(enriched_clickables):
+            elem['id'] = i
+        
+        # Reformater pour VLM avec éléments combinés
+        clickables_text = semantic_enricher.format_for_llm(enriched_clickables)
+
+        if cancel_event is not None and cancel_event.is_set():
+            print("[CUA] Vision spéculative abandonnée (avant annotation)")
+            return None
+
+        # 5. ANNOTATION VISUELLE (Set-of-Mark) avec éléments enrichis + OCR
+        # Étiquettes placées ici, dessinées seulement sur la zone envoyée au VLM #2
+        annotated_screenshot = annotator.prepare_frame(preprocessed, enriched_clickables)
+        print(f"[CUA] Étiquettes SoM placées: {len(enriched_clickables)} éléments")
+
+        vision = {
+            "enriched_clickables": enriched_clickables,
+            "clickables_text": clickables_text,
+            "ocr_results": ocr_results,
+            "zone": zone,
+            "complete": complete,
+        }
+        # Seulement si les deux détecteurs ont abouti: un échec n'est pas un écran vide
+        if complete and zone == requested_zone:
+            screen_state_cache.put(state_key, requested_zone, zone_image, vision)
+        elif complete:
+            # Repli plein écran: mémorisé sous "full" (empreinte de l'écran entier)
+            screen_state_cache.put(state_key, zone, preprocessed.image, vision)
+
+        return dict(vision, annotated_screenshot=annotated_screenshot)
 
-    def preprocess_screenshot(self, screenshot_path: Path) -> np.ndarray:
-        """Preprocessing OpenCV"""
-        return preprocessor.preprocess_from_path(screenshot_path)
+    def screen_state_key(self, context: Dict) -> Optional[str]:
+        """
+        Identité de l'écran pour screen_state_cache: URL si Playwright est connecté,
+        sinon titre de la fenêtre active. None = pas de cache pour cette étape.
+        """
+        if self.web and self.web.connected:
+            url = context.get("current_url")
+            if url and url != "Inconnue":
+                return f"url:{url}"
+        title = self.gui.get_active_window_title()
+        return f"window:{title}" if title else None
+
+    def zone_image(self, preprocessed: Frame, zone: Optional[str]) -> np.ndarray:
+        """Image de la zone parsée (écran entier si zone None)"""
+        if not zone:
+            return preprocessed.image
+        x1, y1, x2, y2 = self.zone_rect(zone, preprocessed.shape)
+        return preprocessed.image[y1:y2, x1:x2]
+
+    def _discard_vision(self, cancel_event: threading.Event, future, reason: str):
+        """Annule la vision spéculative devenue inutile (ou abandonne son résultat)"""
+        cancel_event.set()
+        if future.cancel():
+            print(f"[CUA] Vision spéculative annulée avant démarrage ({reason})")
+        elif future.done():
+            print(f"[CUA] Vision spéculative terminée mais ignorée ({reason})")
+        else:
+            print(f"[CUA] Vision spéculative interrompue ({reason})")
 
-    def analyze_with_vlm(self, screenshot_path: Path, context: Dict) -> Dict:
+    def detect_vision(
+        self,
+        image: np.ndarray,
+        deadline: Optional[float] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Tuple[Optional[List[Dict]], Optional[List[Dict]]]:
+        """
+        OmniParser + PaddleOCR en parallèle sur une image (ou une zone) préprocessée
+        (même repère pour les deux).
+
+        deadline: échéance (time.time()) commune à toute l'étape vision, VISION_TIMEOUT
+        à partir de maintenant si None.
+        cancel_event: vision abandonnée → retour immédiat sans attendre les détecteurs
+        (ils terminent en arrière-plan, l'appel suivant attend seulement leur fin).
+
+        Returns:
+            (omni, ocr): None pour un détecteur en échec (exception, échéance dépassée,
+            appel précédent encore en cours ou annulation), à distinguer d'un écran vide ([])
+        """
+        start = time.time()
+        deadline = start + VISION_TIMEOUT if deadline is None else deadline
+        timings = {}
+
+        def timed(name, fn):
+            t0 = time.time()
+            try:
+                return fn(image)
+            finally:
+                timings[name] = time.time() - t0
+
+        detectors = {
+            "omniparser": lambda: get_omniparser().detect_ui_elements,
+            "paddleocr": lambda: get_paddle_ocr().detect_text,
+        }
+        results = {name: None for name in detectors}
+        if start >= deadline:
+            print("[CUA] ⚠️ Échéance vision dépassée → détection ignorée")
+            return results["omniparser"], results["paddleocr"]
+
+        # Appel d'une vision abandonnée encore en cours: attendre sa fin (pas toute
+        # la vision spéculative) plutôt qu'empiler derrière lui
+        busy = [f for f in (self.detector_futures.get(n) for n in detectors) if f and not f.done()]
+        self._wait_detectors(busy, deadline, cancel_event)
+
+        futures = {}
+        for name, get_fn in detectors.items():
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            previous = self.detector_futures.get(name)
+            if previous is not None and not previous.done():
+                print(f"[CUA] ⚠️ {name} encore occupé par un appel précédent → ignoré")
+                continue
+            futures[name] = self.vision_executor.submit(timed, name, get_fn())
+            self.detector_futures[name] = futures[name]
+
+        self._wait_detectors(list(futures.values()), deadline, cancel_event)
+        cancelled = cancel_event is not None and cancel_event.is_set()
+        if cancelled:
+            print("[CUA] Détection interrompue (vision abandonnée)")
+
+        for name, future in futures.items():
+            if not future.done():
+                if not cancelled:
+                    print(f"[CUA] ⚠️ {name} dépasse l'échéance vision ({VISION_TIMEOUT}s) → ignoré")
+                continue
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"[CUA] ⚠️ Erreur {name}: {e}")
+
+        wall = time.time() - start
+        timings = dict(timings)  # Un détecteur en retard peut encore écrire
+        self.last_vision_timings = dict(timings, wall=wall)
+        print(
+            "[CUA] ⏱️ Vision: "
+            + " | ".join(f"{name} {t:.2f}s" for name, t in timings.items())
+            + f" | mur {wall:.2f}s (séquentiel ~{sum(timings.values()):.2f}s)"
+        )
+        return results["omniparser"], results["paddleocr"]
+
+    @staticmethod
+    def _wait_detectors(futures: List, deadline: float, cancel_event: Optional[threading.Event]):
+        """Attend des appels détecteurs jusqu'à l'échéance, par tranches pour réagir à l'annulation"""
+        pending = set(futures)
+        while pending:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return
+            _, pending = wait_futures(pending, timeout=min(VISION_CANCEL_POLL_S, remaining))
+
+    def analyze_with_vlm(self, screenshot: Frame, context: Dict) -> Dict:
         """
         VLM #1: Planification et vérification (utilise qwen2.5vl via FALLBACK_VLM_MODEL)
 
@@ -534,8 +830,8 @@ class CUAAgent:
             }
 
         try:
-            with open(screenshot_path, "rb") as f:
-                image_data = base64.b64encode(f.read()).decode()
+            # Image réduite/compressée selon le profil du modèle (pas de coordonnées dans la réponse)
+            image_data, _ = vlm_image_encoder.encode(screenshot, self.vlm1.model)
 
             last_action = context.get(
                 "last_action_result", "Aucune action précédente"
@@ -549,21 +845,18 @@ class CUAAgent:
 
             current_url = context.get("current_url", "Inconnue")
             
-            prompt = f"""Tu es un planificateur intelligent pour un agent d'automatisation.
+            # Préfixe stable pour toute la tâche
+            prefix = f"""Tu es un planificateur intelligent pour un agent d'automatisation.
 
 TÂCHE GLOBALE: {context['task']}
-URL ACTUELLE: {current_url}
-
-ACTION PRÉCÉDENTE: {last_action}
 
-ÉTAPES DÉJÀ ACCOMPLIES:
-{steps_text}
-
-REGARDE L'IMAGE et réponds en JSON:
+À chaque étape tu reçois une capture d'écran et l'état courant. REGARDE L'IMAGE et réponds en JSON:
 
 1. "description": Décris brièvement ce que tu vois (application, état, éléments principaux)
 2. "suggestion": Quelle action faire MAINTENANT pour progresser vers la tâche ? (langage naturel, générique)
 3. "task_complete": true si la tâche globale est complètement terminée, false sinon
+4. "zone": où se trouve l'élément à utiliser pour cette action:
+   "browser_toolbar" (onglets, navigation, URL), "content" (menu du site, recherche, contenu) ou "footer" (bas de page, pagination)
 
 NE JAMAIS mentionner d'IDs ou de coordonnées - seulement des descriptions.
 
@@ -571,17 +864,24 @@ RÉPONDS UNIQUEMENT en JSON valide:
 {{
     "description": "...",
     "suggestion": "...",
-    "task_complete": true/false
+    "task_complete": true/false,
+    "zone": "content"
 }}"""
 
-            response = self.vlm1.generate_with_image(prompt, image_data)
+            # Suffixe propre à l'étape
+            suffix = f"""URL ACTUELLE: {current_url}
 
-            import json
-            import re
+ACTION PRÉCÉDENTE: {last_action}
+
+ÉTAPES DÉJÀ ACCOMPLIES:
+{steps_text}
 
-            match = re.search(r"\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}", response, re.DOTALL)
-            if match:
-                result = json.loads(match.group())
+REGARDE L'IMAGE et réponds UNIQUEMENT en JSON valide."""
+
+            # Streaming: coupure dès que l'objet JSON est complet
+            result = self._generate_vlm_json(self.vlm1, "planner", prefix, suffix, image_data)
+
+            if result is not None:
                 print("[CUA] VLM #1 planificateur:")
                 print(
                     f"  Description: {result.get('description', '')[:100]}..."
@@ -595,7 +895,7 @@ RÉPONDS UNIQUEMENT en JSON valide:
             else:
                 self.vlm1.unload() 
                 return {
-                    "description": response[:200],
+                    "description": (self.vlm1.last_response or self.vlm1.last_error)[:200],
                     "suggestion": "Continuer",
                     "task_complete": False,
                 }
@@ -611,6 +911,97 @@ RÉPONDS UNIQUEMENT en JSON valide:
                 "task_complete": False,
             }
 
+    def _generate_vlm_json(self, vlm: OllamaClient, step_key: str, prefix: str, suffix: str, image_data: str):
+        """
+        Appel VLM avec le préfixe stable de la tâche en tête (CUA_PROMPT_PREFIX_FIRST):
+        le runner Ollama réutilise son cache KV pour un début de prompt identique à
+        la requête précédente. L'image étant placée par Ollama avant le texte, le gain
+        n'est pas garanti: prompt_eval_count / durée sont journalisés par étape pour
+        comparer avec CUA_PROMPT_PREFIX_FIRST = False (étape en tête).
+        """
+        if CUA_PROMPT_PREFIX_FIRST:
+            prompt = f"{prefix}\n\n{suffix}"
+        else:
+            prompt = f"{suffix}\n\n{prefix}"
+        result = vlm.generate_with_image_json(prompt, image_data)
+        self._record_prompt_eval(step_key, vlm.last_metrics)
+        return result
+
+    def _record_prompt_eval(self, step_key: str, metrics: Dict):
+        """Journalise et cumule l'évaluation du prompt d'un appel VLM"""
+        if metrics.get("cached") or "ttft_s" not in metrics:
+            return
+        stats = self.prompt_eval_stats.setdefault(
+            step_key, {"calls": 0, "ttft_s": 0.0, "measured": 0, "tokens": 0, "eval_s": 0.0}
+        )
+        stats["calls"] += 1
+        stats["ttft_s"] += metrics["ttft_s"]
+        # Compteurs Ollama présents seulement si le flux n'a pas été coupé avant la fin
+        if "prompt_eval_count" in metrics:
+            stats["measured"] += 1
+            stats["tokens"] += metrics["prompt_eval_count"]
+            stats["eval_s"] += metrics.get("prompt_eval_s", 0.0)
+            evaluated = (
+                f"{metrics['prompt_eval_count']} tokens de prompt évalués "
+                f"en {metrics.get('prompt_eval_s', 0.0):.2f}s"
+            )
+        else:
+            evaluated = "prompt_eval non rapporté (flux coupé)"
+        layout = "préfixe en tête" if CUA_PROMPT_PREFIX_FIRST else "étape en tête"
+        print(f"[CUA] {step_key}: premier token après {metrics['ttft_s']:.2f}s, {evaluated} ({layout})")
+
+    def format_prompt_eval_stats(self) -> str:
+        """Moyennes par appel VLM de la tâche (à comparer entre les deux valeurs de CUA_PROMPT_PREFIX_FIRST)"""
+        layout = "préfixe en tête" if CUA_PROMPT_PREFIX_FIRST else "étape en tête"
+        lines = [f"[CUA] Évaluation des prompts VLM ({layout}):"]
+        for step_key, stats in self.prompt_eval_stats.items():
+            line = f"  {step_key:<15} {stats['calls']} appel(s), premier token {stats['ttft_s'] / stats['calls']:.2f}s moy"
+            if stats["measured"]:
+                line += (
+                    f", {stats['tokens'] / stats['measured']:.0f} tokens évalués"
+                    f" en {stats['eval_s'] / stats['measured']:.2f}s moy ({stats['measured']} mesuré(s))"
+                )
+            lines.append(line)
+        if not self.prompt_eval_stats:
+            lines.append("  aucun appel VLM mesuré")
+        return "\n".join(lines)
+
+    def determine_zone(self, task: str, vlm_plan: Dict) -> str:
+        """
+        Zone à analyser, décidée AVANT la vision:
+        champ "zone" de VLM #1, sinon mots-clés de la suggestion, sinon LLM
+        (CUA_ZONE_LLM_FALLBACK), sinon CUA_DEFAULT_ZONE
+        """
+        suggestion = vlm_plan.get("suggestion", "")
+        zone = str(vlm_plan.get("zone") or "").strip().lower()
+        source = "VLM #1"
+        if zone not in CUA_ZONES:
+            zone = self.classify_zone(suggestion)
+            source = "mots-clés"
+        if zone is None and CUA_ZONE_LLM_FALLBACK:
+            return self.determine_zone_with_llm(task, suggestion)
+        if zone is None:
+            zone = CUA_DEFAULT_ZONE
+            source = "défaut"
+        print(f"[CUA] Zone déterminée ({source}): {zone}")
+        return zone
+
+    @staticmethod
+    def classify_zone(text: str) -> Optional[str]:
+        """Classifieur par mots-clés (CUA_ZONE_KEYWORDS), None si aucun ne correspond"""
+        lower = (text or "").lower()
+        for zone, keywords in CUA_ZONE_KEYWORDS.items():
+            if any(re.search(rf"\b{re.escape(kw)}\b", lower) for kw in keywords):
+                return zone
+        return None
+
+    @staticmethod
+    def zone_rect(zone: str, shape: Tuple[int, ...]) -> Tuple[int, int, int, int]:
+        """Rectangle (x1, y1, x2, y2) d'une zone (CUA_ZONES), image entière sinon ("full")"""
+        h, w = shape[:2]
+        fx1, fy1, fx2, fy2 = CUA_ZONES.get(zone, (0.0, 0.0, 1.0, 1.0))
+        return int(w * fx1), int(h * fy1), int(w * fx2), int(h * fy2)
+
     def determine_zone_with_llm(self, task: str, vlm_suggestion: str) -> str:
         """
         LLM détermine quelle zone scanner (parmi 4 choix)
@@ -628,7 +1019,7 @@ SUGGESTION: {vlm_suggestion}
 Réponds UNIQUEMENT avec le nom de la zone (1 mot):"""
 
         try:
-            response = self.llm.generate(prompt)
+            response = self.llm.generate(prompt, temperature=0.0)
             zone = response.strip().lower()
             
             # Validation
@@ -645,37 +1036,20 @@ Réponds UNIQUEMENT avec le nom de la zone (1 mot):"""
             self.llm.unload()  # ← OK vous l'avez déjà
             return "content"
 
-    def crop_annotated_image(self, image_path: Path, zone: str) -> Path:
+    def crop_annotated_image(self, annotated: MarkedFrame, zone: str) -> Frame:
         """
-        Découpe l'image annotée selon la zone déterminée par le LLM
-        Retourne le chemin de l'image croppée
+        Rend l'image annotée uniquement sur la zone choisie avant la vision
+        Retourne la Frame croppée (annotée en mémoire)
         """
-        # Lire l'image annotée
-        img = cv2.imread(str(image_path))
-        if img is None:
-            print(f"[CUA] Erreur lecture image: {image_path}")
-            return image_path
-        
-        h, w = img.shape[:2]
-        
-        # Définir les zones (en pourcentage de hauteur)
-        ZONES = {
-            "browser_toolbar": (0, 0, w, int(h * 0.15)),
-            "content": (0, int(h * 0.10), w, int(h * 0.90)),
-            "footer": (0, int(h * 0.90), w, h)
-        }
-        
-        x1, y1, x2, y2 = ZONES.get(zone, (0, 0, w, h))
-        cropped = img[y1:y2, x1:x2]
-        
-        # Sauvegarder l'image croppée
-        cropped_path = image_path.parent / f"cropped_{image_path.name}"
-        cv2.imwrite(str(cropped_path), cropped)
+        h, w = annotated.shape[:2]
+        x1, y1, x2, y2 = self.zone_rect(zone, annotated.shape)
+        cropped = annotated.render(region=(x1, y1, x2, y2))
+        cropped.dump()
         
         percentage = (x2-x1)*(y2-y1)*100/(w*h)
         print(f"[CUA] Image annotée croppée ({zone}): {cropped.shape[1]}x{cropped.shape[0]} ({percentage:.1f}% de l'image)")
         
-        return cropped_path
+        return cropped
 
     def plan_next_action(
         self,
@@ -685,7 +1059,8 @@ Réponds UNIQUEMENT avec le nom de la zone (1 mot):"""
         clickables: str,
         changes: str,
         context: Dict,
-        annotated_screenshot_path: Path,
+        annotated_screenshot: MarkedFrame,
+        zone: str = CUA_DEFAULT_ZONE,
     ) -> Dict:
         """
         VLM #2: Exécuteur avec screenshot annoté + suggestion VLM #1
@@ -715,36 +1090,33 @@ Réponds UNIQUEMENT avec le nom de la zone (1 mot):"""
             match = re.search(r"['\"]([^'\"]+)['\"]", vlm_suggestion)
             search_text = match.group(1) if match else "youtube"
 
-            prompt = f"""REGARDE l'image annotée.
-
-Tu vois des NUMÉROS VERTS sur l'écran, chacun correspond à un élément cliquable.
-
-SUGGESTION HAUT NIVEAU: {vlm_suggestion}
-
+            step_key = "executor_search"
+            prefix = """Tu vois des NUMÉROS VERTS sur l'écran, chacun correspond à un élément cliquable.
 
 TROUVE le numéro de la BARRE DE RECHERCHE (cherche "Recherch" ou "saisir").
 
 Renvoie UNIQUEMENT un JSON valide de la forme:
 
-{{
+{
   "action": "sequence",
-  "params": {{
+  "params": {
     "steps": [
-      {{"action": "click_on_element", "params": {{"id": ID_BARRE_RECHERCHE}}}},
-      {{"action": "type_text", "params": {{"text": "{search_text}"}}}},
-      {{"action": "press_key", "params": {{"key": "enter"}}}}
+      {"action": "click_on_element", "params": {"id": ID_BARRE_RECHERCHE}},
+      {"action": "type_text", "params": {"text": "TEXTE_A_TAPER"}},
+      {"action": "press_key", "params": {"key": "enter"}}
     ]
-  }}
-}}"""
-        else:
-            prompt = f"""REGARDE l'image annotée.
-
-Tu vois des NUMÉROS VERTS sur l'écran, chacun correspond à un élément cliquable.
-
-TÂCHE GLOBALE: {task}
+  }
+}"""
+            suffix = f"""REGARDE l'image annotée.
 
 SUGGESTION HAUT NIVEAU: {vlm_suggestion}
 
+TEXTE_A_TAPER: {search_text}"""
+        else:
+            step_key = "executor_click"
+            prefix = f"""Tu vois des NUMÉROS VERTS sur l'écran, chacun correspond à un élément cliquable.
+
+TÂCHE GLOBALE: {task}
 
 Choisis le prochain élément à cliquer pour faire progresser la tâche, et renvoie UNIQUEMENT un JSON valide de la forme:
 
@@ -754,58 +1126,37 @@ Choisis le prochain élément à cliquer pour faire progresser la tâche, et ren
     "id": ID_A_CLIQUER
   }}
 }}"""
+            suffix = f"""REGARDE l'image annotée.
+
+SUGGESTION HAUT NIVEAU: {vlm_suggestion}"""
+        prompt = f"{prefix}\n\n{suffix}"
 
         try:
-            # Déterminer la zone pertinente avec le LLM
-            zone = self.determine_zone_with_llm(task, vlm_suggestion)
+            # Rendre l'image annotée sur la zone (décidée avant la vision)
+            cropped_screenshot = self.crop_annotated_image(annotated_screenshot, zone)
             
-            # Cropper l'image annotée selon la zone
-            cropped_screenshot_path = self.crop_annotated_image(annotated_screenshot_path, zone)
-            
-            # Lire l'image croppée
-            with open(cropped_screenshot_path, "rb") as f:
-                image_data = base64.b64encode(f.read()).decode()
+            # Encoder l'image croppée (VLM #2 répond par ID d'élément: le redimensionnement
+            # ne change pas le mapping vers l'écran, fait via les clickables)
+            image_data, _ = vlm_image_encoder.encode(cropped_screenshot, self.vlm2.model)
 
             print("\n[CUA] Prompt envoyé à VLM #2:")
             print(prompt)
             print("=" * 60)
 
-            response = self.vlm2.generate_with_image(prompt, image_data)
+            action = self._generate_vlm_json(self.vlm2, step_key, prefix, suffix, image_data)
 
             print("\n[CUA] Réponse brute du VLM #2:")
-            print(response)
+            print(self.vlm2.last_response)
             print("=" * 60)
 
-            # Vérifier si la réponse est une erreur rapportée par OllamaClient
-            if response.startswith("Erreur VLM Ollama:"):
-                raise Exception(response)
-
-            import json
-
-            start = response.find("{")
-            if start != -1:
-                bracket_count = 0
-                for i, char in enumerate(response[start:], start=start):
-                    if char == "{":
-                        bracket_count += 1
-                    elif char == "}":
-                        bracket_count -= 1
-                        if bracket_count == 0:
-                            json_str = response[start : i + 1]
-                            try:
-                                action = json.loads(json_str)
-                                print(f"[CUA] VLM #2 JSON parsé: {action}")
-                                self.vlm2.unload() 
-                                return action
-                            except json.JSONDecodeError as e:
-                                print(f"[CUA] Erreur parsing JSON: {e}")
-                                print(f"[CUA] JSON extrait: {json_str}")
-                                self.vlm2.unload() 
-                                return {
-                                    "action": "wait",
-                                    "params": {"seconds": 2},
-                                    "reasoning": f"Parse failed: {e}",
-                                }
+            # Vérifier si la requête a échoué côté OllamaClient (timeout, connexion...)
+            if action is None and self.vlm2.last_error.startswith("Erreur Ollama:"):
+                raise Exception(self.vlm2.last_error)
+
+            if action is not None:
+                print(f"[CUA] VLM #2 JSON parsé: {action}")
+                self.vlm2.unload() 
+                return action
 
             self.vlm2.unload() 
             return {
@@ -827,37 +1178,21 @@ Choisis le prochain élément à cliquer pour faire progresser la tâche, et ren
                 try:
                     # Réutiliser l'image annotée croppée déjà préparée
                     # et le même prompt - juste changer le modèle
-                    with open(cropped_screenshot_path, "rb") as f:
-                        image_data = base64.b64encode(f.read()).decode()
+                    image_data, _ = vlm_image_encoder.encode(cropped_screenshot, self.vlm1.model)
                     
                     print("[CUA] Envoi vers VLM #1 (fallback) avec même image annotée croppée...")
                     print(f"[CUA] Prompt identique à VLM #2")
                     
-                    fallback_response = self.vlm1.generate_with_image(prompt, image_data)
+                    action = self.vlm1.generate_with_image_json(prompt, image_data)
                     
                     print(f"\n[CUA] Réponse fallback VLM #1:")
-                    print(fallback_response)
+                    print(self.vlm1.last_response)
                     print("=" * 60)
                     
-                    # Parser le JSON (même logique que VLM #2)
-                    import json
-                    start = fallback_response.find("{")
-                    if start != -1:
-                        bracket_count = 0
-                        for i, char in enumerate(fallback_response[start:], start=start):
-                            if char == "{":
-                                bracket_count += 1
-                            elif char == "}":
-                                bracket_count -= 1
-                                if bracket_count == 0:
-                                    json_str = fallback_response[start : i + 1]
-                                    try:
-                                        action = json.loads(json_str)
-                                        print(f"[CUA] ✓ Fallback VLM #1 JSON parsé: {action}")
-                                        self.vlm1.unload() 
-                                        return action
-                                    except json.JSONDecodeError as e:
-                                        print(f"[CUA] Erreur parsing fallback JSON: {e}")
+                    if action is not None:
+                        print(f"[CUA] ✓ Fallback VLM #1 JSON parsé: {action}")
+                        self.vlm1.unload() 
+                        return action
                     
                     print("[CUA] ❌ Fallback: aucun JSON trouvé, action wait par défaut")
                     self.vlm1.unload() 
@@ -906,7 +1241,7 @@ Choisis le prochain élément à cliquer pour faire progresser la tâche, et ren
                 for step in steps:
                     result = self.execute_action(step, clickables, scale_factor)
                     results.append(result)
-                    time.sleep(0.3)
+                    screen_monitor.wait_for_stable(timeout=1.0, quiet_s=0.15)
                 return " → ".join(results)
 
             elif action == "click_on_element":
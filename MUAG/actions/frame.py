@@ -0,0 +1,147 @@
+"""
+Frame - Image d'une étape CUA gardée en mémoire
+Le buffer numpy (BGR) circule entre GUIController, VisionPreprocessor,
+VisualAnnotator, VLMImageEncoder et CUAAgent sans aller-retour PNG.
+Les vues dérivées (crop, préprocessée, annotée) sont des Frames liées à leur
+source, avec leur décalage et leur échelle par rapport à la capture d'origine.
+
+Les dumps de debug dans WEB_SCREENSHOTS_DIR sont optionnels (SAVE_DEBUG_FRAMES)
+et écrits en arrière-plan.
+"""
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config import WEB_SCREENSHOTS_DIR, SAVE_DEBUG_FRAMES
+
+_frame_ids = itertools.count(1)
+
+
+class Frame:
+    """Image en mémoire + vues dérivées"""
+
+    def __init__(
+        self,
+        image: np.ndarray,
+        name: str,
+        origin: Tuple[int, int] = (0, 0),
+        scale: Tuple[float, float] = (1.0, 1.0),
+        source: Optional["Frame"] = None,
+    ):
+        self.image = image
+        self.name = name
+        self.origin = origin  # Décalage (x, y) dans la capture d'origine
+        self.scale = scale    # Facteur (x, y) vers la capture d'origine
+        self.source = source
+        self.id = next(_frame_ids)
+        self.path: Optional[Path] = None  # Fichier du dump de debug (si écrit)
+        self._encoded: Dict[Tuple, bytes] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_pil(cls, pil_image, name: str) -> "Frame":
+        """Capture PIL (RGB) → Frame BGR"""
+        image = cv2.cvtColor(np.asarray(pil_image.convert("RGB")), cv2.COLOR_RGB2BGR)
+        return cls(image, name)
+
+    @classmethod
+    def from_path(cls, path: Path) -> "Frame":
+        image = cv2.imread(str(path))
+        if image is None:
+            raise ValueError(f"Impossible de charger l'image: {path}")
+        frame = cls(image, Path(path).name)
+        frame.path = Path(path)
+        return frame
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.image.shape
+
+    @property
+    def key(self) -> Tuple:
+        """Clé de cache stable pour ce contenu (l'image n'est jamais modifiée en place)"""
+        return ("frame", self.id)
+
+    # ============================================
+    # VUES DÉRIVÉES
+    # ============================================
+
+    def crop(self, x1: int, y1: int, x2: int, y2: int, name: Optional[str] = None) -> "Frame":
+        """Vue sans copie sur une zone [x1:x2, y1:y2]"""
+        return Frame(
+            self.image[y1:y2, x1:x2],
+            name or f"cropped_{self.name}",
+            origin=(self.origin[0] + int(x1 * self.scale[0]), self.origin[1] + int(y1 * self.scale[1])),
+            scale=self.scale,
+            source=self,
+        )
+
+    def derive(self, image: np.ndarray, name: str) -> "Frame":
+        """Nouvelle image calculée à partir de celle-ci (préprocessée, annotée...)"""
+        h, w = self.image.shape[:2]
+        new_h, new_w = image.shape[:2]
+        scale = (self.scale[0] * w / float(new_w), self.scale[1] * h / float(new_h))
+        return Frame(image, name, origin=self.origin, scale=scale, source=self)
+
+    # ============================================
+    # ENCODAGE / DUMP
+    # ============================================
+
+    def encode(self, ext: str = ".png", params: Tuple = ()) -> bytes:
+        """Octets encodés (mis en cache par format)"""
+        cache_key = (ext, tuple(params))
+        with self._lock:
+            if cache_key not in self._encoded:
+                ok, buffer = cv2.imencode(ext, self.image, list(params))
+                if not ok:
+                    raise ValueError(f"Encodage {ext} impossible: {self.name}")
+                self._encoded[cache_key] = buffer.tobytes()
+            return self._encoded[cache_key]
+
+    def dump(self, directory: Optional[Path] = None) -> Optional[Path]:
+        """Écrit l'image en arrière-plan (si SAVE_DEBUG_FRAMES), retourne le chemin prévu"""
+        return frame_dumper.dump(self, directory)
+
+
+class FrameDumper:
+    """Écriture asynchrone des dumps de debug (un seul thread, ordre conservé)"""
+
+    def __init__(self, enabled: Optional[bool] = None):
+        self.enabled = SAVE_DEBUG_FRAMES if enabled is None else enabled
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def dump(self, frame: Frame, directory: Optional[Path] = None) -> Optional[Path]:
+        if not self.enabled:
+            return None
+        path = Path(directory or WEB_SCREENSHOTS_DIR) / frame.name
+        frame.path = path
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="frame-dump")
+        self.executor.submit(self._write, frame, path)
+        return path
+
+    @staticmethod
+    def _write(frame: Frame, path: Path):
+        try:
+            ext = path.suffix or ".png"
+            path.write_bytes(frame.encode(ext))
+        except Exception as e:
+            print(f"[Frame] Erreur dump {path}: {e}")
+
+    def flush(self):
+        """Attend l'écriture des dumps en attente"""
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+# Instance globale
+frame_dumper = FrameDumper()
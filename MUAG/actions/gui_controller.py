@@ -12,6 +12,8 @@ from config import (
     PYAUTOGUI_FAILSAFE,
     WEB_SCREENSHOTS_DIR
 )
+from .frame import Frame
+from .screen_capture import screen_capture
 
 
 class GUIController:
@@ -177,12 +179,7 @@ class GUIController:
             
             screenshot_path = self.screenshots_dir / filename
             
-            if region:
-                screenshot = pyautogui.screenshot(region=region)
-            else:
-                screenshot = pyautogui.screenshot()
-            
-            screenshot.save(screenshot_path)
+            cv2.imwrite(str(screenshot_path), screen_capture.grab(region))
             print(f"📸 Screenshot: {screenshot_path}")
             return screenshot_path
             
@@ -190,6 +187,22 @@ class GUIController:
             print(f"❌ Erreur screenshot: {e}")
             return None
     
+    def capture_frame(self, name=None, region=None) -> Frame:
+        """
+        Capture en mémoire (pas d'écriture PNG)
+        Args:
+            name: nom utilisé pour un éventuel dump de debug
+            region: (x, y, width, height) ou None pour tout l'écran
+        Returns:
+            Frame: image BGR (origine = coin de la région capturée)
+        """
+        if name is None:
+            name = f"screenshot_{int(time.time())}.png"
+        frame = Frame(screen_capture.grab(region), name)
+        if region:
+            frame.origin = (region[0], region[1])
+        return frame
+    
     def locate_on_screen(self, image_path, confidence=0.8):
         """
         Trouve une image à l'écran
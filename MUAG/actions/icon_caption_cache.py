@@ -0,0 +1,222 @@
+"""
+Icon Caption Cache - Captions Florence-2 indexées par hash perceptuel du crop
+Les mêmes icônes (flèche retour, croix, loupe, entrées de la sidebar Spotify...)
+reviennent à chaque étape CUA: seules les icônes réellement nouvelles passent
+par le modèle de caption.
+
+Clé  = signature (format du crop + couleur moyenne) + pHash 64 bits (DCT 32x32
+       du crop en niveaux de gris, bloc 8x8 > médiane)
+Hit  = même signature, hash à CAPTION_CACHE_MAX_DISTANCE bits ou moins
+       (CAPTION_CACHE_TEXT_MAX_DISTANCE pour les crops allongés, boutons texte),
+       puis vérification pixel à pixel sur la référence 64x64 stockée: le pHash
+       seul confond des mots proches ("Save" / "Sane").
+Persistance JSON (CAPTION_CACHE_FILE), éviction LRU (CAPTION_CACHE_MAX_ENTRIES).
+"""
+import base64
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config import (
+    CAPTION_CACHE_ENABLED,
+    CAPTION_CACHE_FILE,
+    CAPTION_CACHE_MAX_ENTRIES,
+    CAPTION_CACHE_MAX_DISTANCE,
+    CAPTION_CACHE_TEXT_MAX_DISTANCE,
+    CAPTION_CACHE_TEXT_ASPECT,
+    CAPTION_CACHE_MAX_PIXEL_DIFF,
+)
+
+REF_SIZE = 64          # Côté de la référence de vérification (taille vue par Florence-2)
+REF_PIXEL_DELTA = 30   # Écart de niveau de gris compté comme un pixel différent
+
+# (signature, pHash)
+CacheKey = Tuple[str, int]
+
+
+class IconCaptionCache:
+    """Cache LRU persistant {(signature, hash perceptuel) → (caption, label)}"""
+
+    def __init__(self, path=None, max_entries=None, max_distance=None, enabled=None):
+        self.path = path or CAPTION_CACHE_FILE
+        self.max_entries = max_entries or CAPTION_CACHE_MAX_ENTRIES
+        self.max_distance = CAPTION_CACHE_MAX_DISTANCE if max_distance is None else max_distance
+        self.enabled = CAPTION_CACHE_ENABLED if enabled is None else enabled
+        self.entries: "OrderedDict[CacheKey, Dict]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.dirty = False
+        self._index = None  # {signature: np.uint64 des hashes} (reconstruit à la demande)
+        self.stats = {"hits": 0, "near_hits": 0, "misses": 0, "rejected": 0, "stores": 0, "evictions": 0}
+        if self.enabled:
+            self.load()
+
+    # ============================================
+    # HASH
+    # ============================================
+
+    @staticmethod
+    def phash(crop: np.ndarray) -> int:
+        """pHash 64 bits d'un crop RGB/BGR ou niveaux de gris"""
+        gray = crop if crop.ndim == 2 else cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+        small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+        block = cv2.dct(small)[:8, :8].flatten()
+        bits = block > np.median(block[1:])  # Coefficient DC ignoré pour le seuil
+        return int(np.packbits(bits).view(">u8")[0])
+
+    @staticmethod
+    def signature(crop: np.ndarray) -> str:
+        """
+        Format + couleur moyenne d'un crop (perdus par le pHash: crop redimensionné, gris)
+        "T" si le crop est allongé comme un bouton texte, "I" sinon
+        """
+        h, w = crop.shape[:2]
+        ratio = w / float(max(h, 1))
+        aspect = int(round(np.log2(max(ratio, 1e-3)) * 2))  # Pas d'une demi-octave
+        kind = "T" if ratio >= CAPTION_CACHE_TEXT_ASPECT else "I"
+        if crop.ndim == 2:
+            mean = [float(crop.mean())] * 3
+        else:
+            mean = crop.reshape(-1, crop.shape[2])[:, :3].mean(axis=0)
+        color = "".join(str(int(c) // 64) for c in mean)  # 4 niveaux par canal
+        return f"{kind}{aspect}:{color}"
+
+    def fingerprint(self, crop: np.ndarray) -> Dict:
+        """Clé de cache + référence 64x64 niveaux de gris d'un crop (taille d'origine)"""
+        gray = crop if crop.ndim == 2 else cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+        ref = cv2.resize(gray, (REF_SIZE, REF_SIZE), interpolation=cv2.INTER_AREA)
+        return {"key": (self.signature(crop), self.phash(ref)), "ref": ref}
+
+    @staticmethod
+    def _same_pixels(ref_png: bytes, ref: np.ndarray) -> bool:
+        stored = cv2.imdecode(np.frombuffer(ref_png, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        if stored is None or stored.shape != ref.shape:
+            return False
+        changed = np.count_nonzero(cv2.absdiff(stored, ref) > REF_PIXEL_DELTA)
+        return changed / float(ref.size) <= CAPTION_CACHE_MAX_PIXEL_DIFF
+
+    # ============================================
+    # LECTURE / ÉCRITURE
+    # ============================================
+
+    def get(self, fingerprint: Dict) -> Optional[Tuple[str, str]]:
+        """Caption du hash exact ou du plus proche voisin (même signature), vérifiée sur les pixels"""
+        if not self.enabled:
+            return None
+        key, ref = fingerprint["key"], fingerprint["ref"]
+        with self.lock:
+            found = key if key in self.entries else self._nearest(key)
+            if found is None:
+                self.stats["misses"] += 1
+                return None
+            entry = self.entries[found]
+            if not self._same_pixels(entry["ref"], ref):
+                # Hash proche mais contenu différent (autre mot, autre icône)
+                self.stats["rejected"] += 1
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(found)
+            self.stats["hits"] += 1
+            if found != key:
+                self.stats["near_hits"] += 1
+            return entry["caption"], entry["label"]
+
+    def put(self, fingerprint: Dict, caption: str, label: str):
+        if not self.enabled:
+            return
+        ok, png = cv2.imencode(".png", fingerprint["ref"])
+        if not ok:
+            return
+        key = fingerprint["key"]
+        with self.lock:
+            self.entries[key] = {"caption": caption, "label": label, "ref": png.tobytes()}
+            self.entries.move_to_end(key)
+            self.stats["stores"] += 1
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+            self._index = None
+            self.dirty = True
+
+    def _nearest(self, key: CacheKey) -> Optional[CacheKey]:
+        """Hash connu le plus proche de même signature (Hamming vectorisé), appelé sous verrou"""
+        sig, phash = key
+        max_distance = min(self.max_distance, CAPTION_CACHE_TEXT_MAX_DISTANCE) if sig[0] == "T" else self.max_distance
+        if not self.entries or max_distance <= 0:
+            return None
+        if self._index is None:
+            grouped = {}
+            for entry_sig, entry_hash in self.entries.keys():
+                grouped.setdefault(entry_sig, []).append(entry_hash)
+            self._index = {s: np.array(h, dtype=np.uint64) for s, h in grouped.items()}
+        hashes = self._index.get(sig)
+        if hashes is None:
+            return None
+        xor = np.bitwise_xor(hashes, np.uint64(phash))
+        distances = np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+        best = int(np.argmin(distances))
+        if distances[best] > max_distance:
+            return None
+        return sig, int(hashes[best])
+
+    # ============================================
+    # PERSISTANCE
+    # ============================================
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            skipped = 0
+            for entry in data.get("entries", []):
+                if "sig" not in entry or "ref" not in entry:
+                    skipped += 1  # Ancien format (pHash seul): pas vérifiable
+                    continue
+                self.entries[(entry["sig"], int(entry["hash"], 16))] = {
+                    "caption": entry["caption"],
+                    "label": entry["label"],
+                    "ref": base64.b64decode(entry["ref"]),
+                }
+            self.dirty = skipped > 0
+            print(f"[CaptionCache] {len(self.entries)} captions chargées ({skipped} ignorées, ancien format)")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[CaptionCache] Erreur chargement: {e}")
+
+    def save(self):
+        """Sauvegarde si des captions ont été ajoutées (ordre LRU conservé)"""
+        with self.lock:
+            if not self.dirty:
+                return
+            entries = [
+                {
+                    "sig": sig,
+                    "hash": f"{phash:016x}",
+                    "caption": entry["caption"],
+                    "label": entry["label"],
+                    "ref": base64.b64encode(entry["ref"]).decode("ascii"),
+                }
+                for (sig, phash), entry in self.entries.items()
+            ]
+            self.dirty = False
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({"entries": entries}, f, ensure_ascii=False)
+        except Exception as e:
+            print(f"[CaptionCache] Erreur sauvegarde: {e}")
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self.entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+# Instance globale
+icon_caption_cache = IconCaptionCache()
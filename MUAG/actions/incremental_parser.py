@@ -0,0 +1,254 @@
+"""
+Incremental Parser - Re-parse uniquement les zones modifiées de l'écran
+Entre deux étapes CUA, un survol ou un caractère tapé ne change qu'une petite
+zone: les détections OmniParser et OCR hors des zones modifiées sont reprises
+de la frame précédente, seules les zones modifiées (élargies + fusionnées) sont
+re-détectées, re-OCRisées et re-captionnées.
+
+Chaque élément porte un 'uid' stable entre les frames (repris par IoU quand
+un élément est re-détecté au même endroit).
+"""
+import copy
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import (
+    INCREMENTAL_PARSE_ENABLED,
+    INCREMENTAL_PARSE_PADDING,
+    INCREMENTAL_PARSE_MIN_AREA,
+    INCREMENTAL_PARSE_MAX_DIRTY,
+    INCREMENTAL_PARSE_MATCH_IOU,
+)
+from .screen_monitor import screen_monitor
+
+# detect_fn(image) -> (détections OmniParser, résultats OCR), None pour un détecteur en échec
+DetectFn = Callable[[np.ndarray], Tuple[List[Dict], List[Dict]]]
+
+
+def _iou(a: List[int], b: List[int]) -> float:
+    """IoU de deux bbox [x, y, w, h]"""
+    ix = max(0, min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union > 0 else 0.0
+
+
+def offset_detection(det: Dict, dx: int, dy: int) -> Dict:
+    """Ramène une détection faite sur un crop dans le repère de la frame"""
+    det = dict(det)
+    x, y, w, h = det["bbox"]
+    det["bbox"] = [x + dx, y + dy, w, h]
+    cx, cy = det["center"]
+    det["center"] = (cx + dx, cy + dy)
+    if det.get("polygon") is not None:
+        det["polygon"] = [[p[0] + dx, p[1] + dy] for p in det["polygon"]]
+    return det
+
+
+def _intersects(bbox: List[int], rect: List[int]) -> bool:
+    x, y, w, h = bbox
+    rx, ry, rw, rh = rect
+    return x < rx + rw and rx < x + w and y < ry + rh and ry < y + h
+
+
+class IncrementalParser:
+    """Cache des résultats vision de la frame précédente + re-parse des zones modifiées"""
+
+    def __init__(self):
+        self.enabled = INCREMENTAL_PARSE_ENABLED
+        self.uids = itertools.count(1)
+        self.reset()
+
+    def reset(self):
+        """Oublie la frame précédente (nouvelle tâche)"""
+        self.prev_frame = None
+        self.prev_key = None
+        self.prev_omni: List[Dict] = []
+        self.prev_ocr: List[Dict] = []
+
+    def parse(
+        self,
+        frame: np.ndarray,
+        detect_fn: DetectFn,
+        key=None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Tuple[List[Dict], List[Dict], Dict]:
+        """
+        Détections de la frame courante
+        key: identifie la zone d'écran parsée (parse complet si elle change)
+        cancel_event: vérifié entre les zones modifiées; une fois levé, le parse
+        s'arrête et la référence précédente est conservée telle quelle.
+
+        Un détecteur en échec (None) donne une liste vide pour cette frame, qui ne
+        sert pas de référence: la frame suivante est re-parsée entièrement.
+
+        Returns:
+            (omni_clickables, ocr_results, info) avec info = {mode, regions,
+            dirty_fraction, reused, complete, cancelled, time_s}
+        """
+        start = time.time()
+        regions = []
+        dirty_fraction = 1.0
+        mode = "full"
+
+        if (
+            self.enabled
+            and self.prev_frame is not None
+            and self.prev_key == key
+            and self.prev_frame.shape == frame.shape
+        ):
+            regions = screen_monitor.dirty_regions(
+                self.prev_frame,
+                frame,
+                padding=INCREMENTAL_PARSE_PADDING,
+                min_area=INCREMENTAL_PARSE_MIN_AREA,
+            )
+            h, w = frame.shape[:2]
+            regions = self._grow_regions(regions, (h, w))
+            dirty_fraction = sum(rw * rh for _, _, rw, rh in regions) / float(h * w)
+            if not regions:
+                mode = "reuse"
+            elif dirty_fraction <= INCREMENTAL_PARSE_MAX_DIRTY:
+                mode = "incremental"
+
+        complete = True
+        if mode == "full":
+            omni, ocr = detect_fn(frame)
+            complete = omni is not None and ocr is not None
+            omni = self._assign_uids(omni or [], self.prev_omni)
+            ocr = self._assign_uids(ocr or [], self.prev_ocr)
+            reused = 0
+        elif mode == "reuse":
+            omni, ocr = copy.deepcopy(self.prev_omni), copy.deepcopy(self.prev_ocr)
+            reused = len(omni) + len(ocr)
+        else:
+            omni, ocr, reused, complete = self._parse_regions(frame, regions, detect_fn, cancel_event)
+        cancelled = cancel_event is not None and cancel_event.is_set()
+
+        # Ordre de lecture (haut → bas, gauche → droite) et ids séquentiels
+        omni.sort(key=lambda d: (d["bbox"][1], d["bbox"][0]))
+        for idx, det in enumerate(omni):
+            det["id"] = idx
+
+        if cancelled:
+            # Vision abandonnée: résultat jeté par l'appelant, la référence reste valide
+            complete = False
+        elif complete:
+            self.prev_frame = frame.copy()
+            self.prev_key = key
+            self.prev_omni = copy.deepcopy(omni)
+            self.prev_ocr = copy.deepcopy(ocr)
+        else:
+            # Résultat partiel: pas de référence, les uids précédents restent disponibles
+            self.prev_frame = None
+
+        info = {
+            "mode": mode,
+            "regions": regions,
+            "dirty_fraction": dirty_fraction,
+            "reused": reused,
+            "complete": complete,
+            "cancelled": cancelled,
+            "time_s": time.time() - start,
+        }
+        print(
+            f"[Incremental] Mode {mode}: {len(regions)} zone(s) modifiée(s) "
+            f"({dirty_fraction * 100:.1f}% de l'écran), {reused} élément(s) repris, "
+            f"{info['time_s']:.2f}s{' (annulé)' if cancelled else '' if complete else ' (incomplet)'}"
+        )
+        return omni, ocr, info
+
+    def _parse_regions(
+        self,
+        frame: np.ndarray,
+        regions: List[List[int]],
+        detect_fn: DetectFn,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Tuple[List[Dict], List[Dict], int, bool]:
+        """
+        Re-détecte chaque zone modifiée et fusionne avec les éléments inchangés
+        S'arrête à la première zone dont un détecteur échoue ou si cancel_event
+        est levé (complete=False).
+        """
+        kept_omni, stale_omni = self._split(self.prev_omni, regions)
+        kept_ocr, stale_ocr = self._split(self.prev_ocr, regions)
+
+        new_omni, new_ocr = [], []
+        complete = True
+        for rx, ry, rw, rh in regions:
+            if cancel_event is not None and cancel_event.is_set():
+                complete = False
+                break
+            region_omni, region_ocr = detect_fn(frame[ry:ry + rh, rx:rx + rw])
+            new_omni.extend(offset_detection(d, rx, ry) for d in region_omni or [])
+            new_ocr.extend(offset_detection(d, rx, ry) for d in region_ocr or [])
+            if region_omni is None or region_ocr is None:
+                complete = False
+                break
+
+        omni = copy.deepcopy(kept_omni) + self._assign_uids(new_omni, stale_omni)
+        ocr = copy.deepcopy(kept_ocr) + self._assign_uids(new_ocr, stale_ocr)
+        return omni, ocr, len(kept_omni) + len(kept_ocr), complete
+
+    def _grow_regions(self, regions: List[List[int]], shape: Tuple[int, int]) -> List[List[int]]:
+        """
+        Élargit les zones modifiées aux éléments précédents qu'elles touchent (+ marge)
+        Un élément à cheval sur une zone est jeté par _split: sans cela, il serait
+        re-détecté tronqué par le bord du crop (ligne OCR coupée après une frappe).
+        """
+        if not regions:
+            return regions
+        h, w = shape
+        pad = INCREMENTAL_PARSE_PADDING
+        boxes = [d["bbox"] for d in self.prev_omni + self.prev_ocr]
+        rects = [[x, y, x + rw, y + rh] for x, y, rw, rh in regions]
+        grown = True
+        while grown:
+            grown = False
+            for rect in rects:
+                for bx, by, bw, bh in boxes:
+                    if not _intersects([bx, by, bw, bh], [rect[0], rect[1], rect[2] - rect[0], rect[3] - rect[1]]):
+                        continue
+                    x1, y1 = max(0, min(rect[0], bx - pad)), max(0, min(rect[1], by - pad))
+                    x2, y2 = min(w, max(rect[2], bx + bw + pad)), min(h, max(rect[3], by + bh + pad))
+                    if [x1, y1, x2, y2] != rect:
+                        rect[:] = [x1, y1, x2, y2]
+                        grown = True
+            # Zones élargies qui se recouvrent → une seule (puis nouveaux éléments touchés)
+            rects = screen_monitor._merge_rects(rects)
+        return [[x1, y1, x2 - x1, y2 - y1] for x1, y1, x2, y2 in rects]
+
+    @staticmethod
+    def _split(detections: List[Dict], regions: List[List[int]]) -> Tuple[List[Dict], List[Dict]]:
+        """Sépare les détections inchangées de celles touchées par une zone modifiée"""
+        kept, stale = [], []
+        for det in detections:
+            if any(_intersects(det["bbox"], r) for r in regions):
+                stale.append(det)
+            else:
+                kept.append(det)
+        return kept, stale
+
+    def _assign_uids(self, detections: List[Dict], previous: List[Dict]) -> List[Dict]:
+        """Reprend l'uid de l'élément précédent le plus recouvrant, sinon nouvel uid"""
+        available = [p for p in previous if "uid" in p]
+        for det in detections:
+            best, best_iou = None, INCREMENTAL_PARSE_MATCH_IOU
+            for i, prev in enumerate(available):
+                iou = _iou(det["bbox"], prev["bbox"])
+                if iou >= best_iou:
+                    best, best_iou = i, iou
+            if best is not None:
+                det["uid"] = available.pop(best)["uid"]
+            else:
+                det["uid"] = next(self.uids)
+        return detections
+
+
+# Instance globale
+incremental_parser = IncrementalParser()
@@ -0,0 +1,94 @@
+"""
+Label Layout - Placement des étiquettes Set-of-Mark par hachage spatial
+Les bbox des éléments sont rangées une fois dans une grille (SpatialHash);
+chaque position candidate d'étiquette n'est testée que contre les bbox des
+cellules qu'elle recouvre, au lieu de toutes les autres bbox (O(n²)).
+
+Règles de placement identiques à l'ancien VisualAnnotator.draw_marks:
+au-dessus, en dessous, à gauche, à droite; première position sans collision
+(tolérance de 2 px), sinon au-dessus.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from config import LABEL_LAYOUT_CELL_SIZE
+
+
+class SpatialHash:
+    """Grille uniforme de rectangles (x1, y1, x2, y2) indexés par clé entière"""
+
+    def __init__(self, cell_size: int = LABEL_LAYOUT_CELL_SIZE):
+        self.cell_size = max(1, int(cell_size))
+        self.cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self.always: List[int] = []  # Rectangles dégénérés: testés à chaque requête
+
+    def _range(self, lo: float, hi: float) -> range:
+        return range(int(lo // self.cell_size), int(hi // self.cell_size) + 1)
+
+    def insert(self, key: int, x1: float, y1: float, x2: float, y2: float):
+        if x2 < x1 or y2 < y1:
+            self.always.append(key)
+            return
+        for gx in self._range(x1, x2):
+            for gy in self._range(y1, y2):
+                self.cells[(gx, gy)].append(key)
+
+    def query(self, x1: float, y1: float, x2: float, y2: float) -> List[int]:
+        """Clés dont une cellule recoupe le rectangle (candidats, triés)"""
+        found = set(self.always)
+        for gx in self._range(x1, x2):
+            for gy in self._range(y1, y2):
+                found.update(self.cells.get((gx, gy), ()))
+        return sorted(found)
+
+
+def rectangles_overlap(rect1: Sequence[int], rect2: Sequence[int], tolerance: int = 2) -> bool:
+    """Vérifie si 2 rectangles [x, y, w, h] se chevauchent (avec tolérance)"""
+    x1, y1, w1, h1 = rect1
+    x2, y2, w2, h2 = rect2
+    # Ajouter tolérance (permet petit chevauchement acceptable)
+    if (x1 + w1 < x2 - tolerance or
+        x2 + w2 < x1 - tolerance or
+        y1 + h1 < y2 - tolerance or
+        y2 + h2 < y1 - tolerance):
+        return False
+    return True
+
+
+class LabelLayout:
+    """Positions des étiquettes d'ID autour des bbox [x, y, w, h]"""
+
+    def __init__(self, bboxes: Iterable[Sequence[int]], tolerance: int = 2, cell_size: int = None):
+        self.bboxes = [list(b) for b in bboxes]
+        self.tolerance = tolerance
+        self.index = SpatialHash(cell_size or LABEL_LAYOUT_CELL_SIZE)
+        for key, (x, y, w, h) in enumerate(self.bboxes):
+            # Élargie de la tolérance: tout rectangle en collision recoupe une de ses cellules
+            self.index.insert(key, x - tolerance, y - tolerance, x + w + tolerance, y + h + tolerance)
+
+    def collides(self, idx: int, rect: Sequence[int]) -> bool:
+        """Collision de rect [x, y, w, h] avec une bbox autre que idx"""
+        x, y, w, h = rect
+        for j in self.index.query(x, y, x + w, y + h):
+            if j != idx and rectangles_overlap(rect, self.bboxes[j], self.tolerance):
+                return True
+        return False
+
+    def place(self, idx: int, text_w: int, text_h: int) -> Tuple[int, int]:
+        """
+        Position (text_x, text_y) de l'étiquette de l'élément idx (avant bornage à l'image)
+        text_y est la ligne de base du texte (convention cv2.putText)
+        """
+        x, y, w, h = self.bboxes[idx]
+        # Essayer plusieurs positions dans l'ordre de priorité
+        positions = [
+            (x + (w - text_w) // 2, y - 5 - text_h),   # Au-dessus
+            (x + (w - text_w) // 2, y + h + 2),        # En dessous
+            (x - text_w - 2, y + (h - text_h) // 2),   # À gauche
+            (x + w + 2, y + (h - text_h) // 2),        # À droite
+        ]
+        for px, py in positions:
+            if not self.collides(idx, [px, py, text_w, text_h + 5]):
+                return px, py + text_h  # Ajuster pour baseline
+        # Toutes les positions en collision: au-dessus
+        return x + (w - text_w) // 2, y - 5
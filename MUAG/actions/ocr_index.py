@@ -0,0 +1,109 @@
+"""
+OCR Spatial Index - Association OCR ↔ éléments OmniParser par grille uniforme
+Les centres des boîtes OCR sont rangés une fois par frame dans une grille
+(cellules de OCR_INDEX_CELL_SIZE px). Chaque requête ne compare que les OCR
+des cellules couvertes, avec numpy, au lieu de parcourir toute la liste OCR
+pour chaque élément (O(éléments × lignes OCR)).
+
+Règles identiques à SemanticEnricher._find_nearby_ocr:
+- dedans : OCR dont le centre est dans la bbox (bornes incluses), triés par y
+- sinon  : OCR le plus proche (centre à centre) à moins de `threshold` px
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import OCR_INDEX_CELL_SIZE
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+class OCRSpatialIndex:
+    """Grille des centres OCR d'une frame"""
+
+    def __init__(self, ocr_results: List[Dict], cell_size: Optional[int] = None):
+        self.cell_size = float(cell_size or OCR_INDEX_CELL_SIZE)
+
+        texts, boxes = [], []
+        for ocr in ocr_results or []:
+            text = ocr.get("text", "").strip()
+            bbox = ocr.get("bbox", [])
+            if not text or len(bbox) < 4:
+                continue
+            texts.append(text)
+            boxes.append(bbox[:4])
+
+        self.texts = texts
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        # Centre comme _find_nearby_ocr: ox + ow // 2, oy + oh // 2
+        self.cx = boxes[:, 0] + np.floor_divide(boxes[:, 2], 2)
+        self.cy = boxes[:, 1] + np.floor_divide(boxes[:, 3], 2)
+        self.top = boxes[:, 1]
+
+        cells = defaultdict(list)
+        gx = np.floor(self.cx / self.cell_size).astype(np.int64)
+        gy = np.floor(self.cy / self.cell_size).astype(np.int64)
+        for idx, key in enumerate(zip(gx.tolist(), gy.tolist())):
+            cells[key].append(idx)
+        self.cells = {key: np.asarray(ids, dtype=np.int64) for key, ids in cells.items()}
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def _candidates(self, x1: float, y1: float, x2: float, y2: float) -> np.ndarray:
+        """Indices OCR (ordre d'origine) des cellules couvrant [x1, x2] × [y1, y2]"""
+        if x2 < x1 or y2 < y1:
+            return _EMPTY
+        gx1, gx2 = int(np.floor(x1 / self.cell_size)), int(np.floor(x2 / self.cell_size))
+        gy1, gy2 = int(np.floor(y1 / self.cell_size)), int(np.floor(y2 / self.cell_size))
+
+        if (gx2 - gx1 + 1) * (gy2 - gy1 + 1) > len(self.cells):
+            # Boîte plus grande que la grille occupée: parcourir les cellules existantes
+            parts = [
+                ids for (gx, gy), ids in self.cells.items()
+                if gx1 <= gx <= gx2 and gy1 <= gy <= gy2
+            ]
+        else:
+            parts = [
+                self.cells[(gx, gy)]
+                for gx in range(gx1, gx2 + 1)
+                for gy in range(gy1, gy2 + 1)
+                if (gx, gy) in self.cells
+            ]
+        if not parts:
+            return _EMPTY
+        return np.sort(np.concatenate(parts))
+
+    def inside(self, bbox: Sequence[float]) -> List[int]:
+        """OCR dont le centre est dans bbox [x, y, w, h], triés de haut en bas"""
+        x, y, w, h = bbox[:4]
+        ids = self._candidates(x, y, x + w, y + h)
+        if not len(ids):
+            return []
+        cx, cy = self.cx[ids], self.cy[ids]
+        ids = ids[(cx >= x) & (cx <= x + w) & (cy >= y) & (cy <= y + h)]
+        # Tri stable: à y égal, l'ordre OCR d'origine est conservé
+        return ids[np.argsort(self.top[ids], kind="stable")].tolist()
+
+    def nearest(self, center: Tuple[float, float], threshold: float) -> Optional[int]:
+        """OCR le plus proche de center à distance < threshold (premier en cas d'égalité)"""
+        cx, cy = center
+        ids = self._candidates(cx - threshold, cy - threshold, cx + threshold, cy + threshold)
+        if not len(ids):
+            return None
+        distances = np.sqrt((cx - self.cx[ids]) ** 2 + (cy - self.cy[ids]) ** 2)
+        best = int(np.argmin(distances))
+        if distances[best] >= threshold:
+            return None
+        return int(ids[best])
+
+    def associate(self, bbox: Sequence[float], center: Tuple[float, float], threshold: float = 50) -> Optional[str]:
+        """Texte OCR associé à un élément (textes dedans fusionnés, sinon le plus proche)"""
+        if not self.texts:
+            return None
+        inside = self.inside(bbox)
+        if inside:
+            return " ".join(self.texts[i] for i in inside)
+        best = self.nearest(center, threshold)
+        return self.texts[best] if best is not None else None
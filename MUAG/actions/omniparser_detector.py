@@ -6,16 +6,21 @@ FIXED: Eager attention forcé pour Windows (pas de flash_attn)
 """
 import cv2
 import numpy as np
+import threading
 import time
-import torch
 from typing import List, Dict, Tuple, Optional
 from pathlib import Path
 
 from config import (
     OMNIPARSER_WEIGHTS_DIR,
-    OMNIPARSER_DEVICE,
-    OMNIPARSER_CONFIDENCE_THRESHOLD
+    OMNIPARSER_CONFIDENCE_THRESHOLD,
+    OMNIPARSER_CAPTION_BATCH_SIZE,
+    OMNIPARSER_CAPTION_NUM_BEAMS,
+    OMNIPARSER_CAPTION_MAX_TOKENS,
+    OMNIPARSER_CAPTION_CROP_SIZE,
 )
+from utils.model_residency import residency_manager
+from .icon_caption_cache import icon_caption_cache
 
 
 class OmniParserDetector:
@@ -28,6 +33,8 @@ class OmniParserDetector:
         """Initialise OmniParser avec icon_detect + icon_caption"""
         print("[OmniParser] Initialisation OmniParser v2.0...")
         
+        # Résolu ici (importe torch): les sessions sans CUA n'initialisent pas CUDA
+        from config import OMNIPARSER_DEVICE
         self.device = OMNIPARSER_DEVICE
         self.confidence_threshold = OMNIPARSER_CONFIDENCE_THRESHOLD
         
@@ -55,6 +62,16 @@ class OmniParserDetector:
             # Charger icon_caption (Florence-2) avec eager attention
             self._load_icon_caption()
             
+            # Résidence VRAM: YOLO est minuscule (épinglé), Florence-2 évictable
+            if self.device == "cuda":
+                residency_manager.register("yolo_icon_detect", pinned=True, resident=True)
+                residency_manager.register(
+                    "florence2",
+                    load_fn=lambda: self._move_caption_model(self.device),
+                    unload_fn=lambda: self._move_caption_model("cpu"),
+                    resident=True,
+                )
+            
             print(f"[OK] OmniParser chargé (device: {self.device})")
             
         except Exception as e:
@@ -67,6 +84,7 @@ class OmniParserDetector:
     
     def _load_icon_detect(self):
         """Charge le modèle YOLOv8 pour détection d'icônes"""
+        import torch
         from ultralytics import YOLO
         
         model_path = Path("OmniParser/weights/icon_detect/model.pt")
@@ -86,6 +104,7 @@ class OmniParserDetector:
     
     def _load_icon_caption(self):
         """Charge le modèle Florence-2 pour caption d'icônes (Windows compatible)"""
+        import torch
         from transformers import AutoModelForCausalLM, AutoProcessor
         
         model_path = Path("OmniParser/weights/icon_caption_florence")
@@ -153,6 +172,13 @@ class OmniParserDetector:
         
         print(f"[OK] icon_caption chargé (eager attention)")
 
+    def _move_caption_model(self, device: str):
+        """Déplace Florence-2 entre GPU et CPU (appelé par le gestionnaire de résidence)"""
+        import torch
+        self.caption_model = self.caption_model.to(device)
+        if device == "cpu" and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
     def detect_ui_elements(self, image: np.ndarray) -> List[Dict]:
         """
         Détecte tous les éléments UI avec captions sémantiques
@@ -180,6 +206,10 @@ class OmniParserDetector:
         start_time = time.time()
         print(f"[OmniParser] 🔍 Démarrage détection... (image shape: {image.shape})")
         
+        # Florence-2 réservé pendant toute la détection (pas d'éviction en cours de caption)
+        if self.device == "cuda":
+            residency_manager.acquire("florence2", reason="caption OmniParser")
+        
         try:
             # 1. DÉTECTION avec YOLOv8
             image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
@@ -200,36 +230,23 @@ class OmniParserDetector:
             
             # 2. EXTRACTION DES BBOXES
             boxes = results[0].boxes
-            detections = []
+            xyxy = boxes.xyxy.cpu().numpy().astype(int)
+            confidences = boxes.conf.cpu().numpy()
             
             caption_start = time.time()
             
-            for idx, box in enumerate(boxes):
-                # Extraire bbox [x1, y1, x2, y2]
-                x1, y1, x2, y2 = [int(v) for v in box.xyxy[0].cpu().numpy()]
-                
+            # 3. CAPTION SÉMANTIQUE avec Florence-2 (tous les crops, par lots)
+            crops = [image_rgb[y1:y2, x1:x2] for x1, y1, x2, y2 in xyxy]
+            captions = self._generate_captions(crops)
+            
+            detections = []
+            for idx, ((x1, y1, x2, y2), confidence, (caption, label)) in enumerate(
+                zip(xyxy, confidences, captions)
+            ):
                 # Convertir en [x, y, w, h]
-                x, y, w, h = x1, y1, x2 - x1, y2 - y1
-                
-                # Confiance
-                confidence = float(box.conf[0].cpu().numpy())
-                
-                # Centre
+                x, y, w, h = int(x1), int(y1), int(x2 - x1), int(y2 - y1)
                 center = (x + w // 2, y + h // 2)
                 
-                # Area
-                area = w * h
-                
-                # 3. CAPTION SÉMANTIQUE avec Florence-2
-                # Crop l'élément pour le caption
-                crop = image_rgb[y:y+h, x:x+w]
-                
-                if crop.size == 0:
-                    caption = f"Element {idx}"
-                    label = f"elem_{idx}"
-                else:
-                    caption, label = self._generate_caption(crop)
-                
                 # Construction de la détection
                 detection = {
                     'id': idx,
@@ -237,8 +254,8 @@ class OmniParserDetector:
                     'description': caption,
                     'bbox': [x, y, w, h],
                     'center': center,
-                    'confidence': confidence,
-                    'area': area,
+                    'confidence': float(confidence),
+                    'area': w * h,
                     'type': 'ui_element',
                     'has_text': True  # OmniParser génère toujours une description
                 }
@@ -250,7 +267,17 @@ class OmniParserDetector:
             caption_time = time.time() - caption_start
             total_time = time.time() - start_time
             
-            print(f"[OmniParser] ⏱️ Temps caption: {caption_time:.2f}s")
+            print(
+                f"[OmniParser] ⏱️ Temps caption: {caption_time:.2f}s "
+                f"({caption_time / max(len(crops), 1) * 1000:.0f}ms/élément, "
+                f"lots de {OMNIPARSER_CAPTION_BATCH_SIZE}, beams={OMNIPARSER_CAPTION_NUM_BEAMS})"
+            )
+            cache_stats = icon_caption_cache.get_stats()
+            print(
+                f"[OmniParser] 🗂️ Cache captions: {cache_stats['hit_rate']:.0%} hits "
+                f"({cache_stats['hits']}/{cache_stats['hits'] + cache_stats['misses']}, "
+                f"{cache_stats['entries']} icônes connues)"
+            )
             print(f"[OmniParser] ⏱️ Temps total: {total_time:.2f}s")
             print(f"[OmniParser] 📊 Résultats: {len(detections)} éléments UI avec captions\n")
             
@@ -261,71 +288,123 @@ class OmniParserDetector:
             import traceback
             traceback.print_exc()
             return []
+        finally:
+            if self.device == "cuda":
+                residency_manager.release("florence2")
     
-    def _generate_caption(self, crop_image: np.ndarray) -> Tuple[str, str]:
+    def _generate_captions(self, crops: List[np.ndarray]) -> List[Tuple[str, str]]:
         """
-        Génère une caption sémantique pour un élément UI avec Florence-2.
-        Version Windows compatible (sans flash_attn).
+        Génère les captions de tous les crops par lots (un generate() par lot).
+        Crops redimensionnés à OMNIPARSER_CAPTION_CROP_SIZE comme dans
+        OmniParser/util/utils.get_parsed_content_icon. Les icônes déjà vues
+        (hash perceptuel proche) sont servies par icon_caption_cache.
+        
+        Returns:
+            Liste (caption, label) alignée sur crops
         """
-        try:
-            # 1) Sanity checks sur le crop
-            if crop_image is None or not isinstance(crop_image, np.ndarray):
-                return "UI Element", "element"
-            
-            h, w = crop_image.shape[:2]
+        results: List[Tuple[str, str]] = [None] * len(crops)
+        
+        # 1) Sanity checks: les crops vides ou minuscules ne passent pas par le modèle
+        from PIL import Image
+        valid = []
+        for idx, crop in enumerate(crops):
+            if crop is None or not isinstance(crop, np.ndarray) or crop.size == 0:
+                results[idx] = (f"Element {idx}", f"elem_{idx}")
+                continue
+            h, w = crop.shape[:2]
             if h <= 4 or w <= 4 or (h * w) < 16:
-                return "UI Element (too small)", "element_small"
-
-            # 2) Convert to PIL RGB
-            from PIL import Image
-            pil_image = Image.fromarray(crop_image).convert("RGB")
-
-            # 3) Tâche Florence-2 prédéfinie
-            task_prompt = "<CAPTION>"
-            
-            # 4) Préparation des inputs
-            inputs = self.caption_processor(
-                text=task_prompt,
-                images=pil_image,
-                return_tensors="pt"
+                results[idx] = ("UI Element (too small)", "element_small")
+                continue
+            # Empreinte sur le crop d'origine (format et couleur font partie de la clé)
+            fingerprint = icon_caption_cache.fingerprint(crop)
+            cached = icon_caption_cache.get(fingerprint)
+            if cached is not None:
+                results[idx] = cached
+                continue
+            if OMNIPARSER_CAPTION_CROP_SIZE:
+                size = OMNIPARSER_CAPTION_CROP_SIZE
+                crop = cv2.resize(crop, (size, size), interpolation=cv2.INTER_AREA)
+            valid.append((idx, fingerprint, Image.fromarray(crop).convert("RGB")))
+        
+        # 2) Génération par lots
+        task_prompt = "<CAPTION>"
+        batch_size = max(1, OMNIPARSER_CAPTION_BATCH_SIZE)
+        for i in range(0, len(valid), batch_size):
+            batch = valid[i:i + batch_size]
+            try:
+                texts = self._caption_batch([img for _, _, img in batch], task_prompt)
+            except Exception as e:
+                print(f"[WARN] Erreur caption par lot ({len(batch)} crops): {e}")
+                texts = [None] * len(batch)
+            for (idx, fingerprint, _), text in zip(batch, texts):
+                results[idx] = self._format_caption(text, task_prompt)
+                if text is not None:
+                    icon_caption_cache.put(fingerprint, *results[idx])
+        
+        if valid:
+            icon_caption_cache.save()
+        return results
+    
+    def _caption_batch(self, images: List, task_prompt: str) -> List[str]:
+        """Un appel generate() Florence-2 pour un lot d'images PIL"""
+        import torch
+        inputs = self.caption_processor(
+            text=[task_prompt] * len(images),
+            images=images,
+            return_tensors="pt"
+        )
+        
+        device = torch.device(self.device)
+        with torch.no_grad():
+            generated_ids = self.caption_model.generate(
+                input_ids=inputs["input_ids"].to(device),
+                pixel_values=inputs["pixel_values"].to(device),
+                max_new_tokens=OMNIPARSER_CAPTION_MAX_TOKENS,
+                num_beams=OMNIPARSER_CAPTION_NUM_BEAMS,
+                do_sample=False
             )
-
-            # 5) Move tensors to device (float32 pour Windows)
-            device = torch.device(self.device)
-            
-            for k, v in list(inputs.items()):
-                if isinstance(v, torch.Tensor):
-                    inputs[k] = v.to(device=device)
-
-            # 6) Génération avec eager attention
-            with torch.no_grad():
-                generated_ids = self.caption_model.generate(
-                    **inputs,
-                    max_new_tokens=50,
-                    num_beams=3,
-                    do_sample=False
-                )
-
-            # 7) Décodage
-            generated_text = self.caption_processor.batch_decode(
-                generated_ids, 
-                skip_special_tokens=True
-            )[0]
-
-            # 8) Post-traitement
-            caption = generated_text.replace(task_prompt, "").strip()
-            
-            if not caption or len(caption) < 3:
-                caption = "UI Element"
-
-            # Label court (5 premiers mots)
-            label = ' '.join(caption.split()[:5])
-            
-            return caption, label
-
-        except Exception as e:
-            print(f"[WARN] Erreur caption: {e}")
+        
+        return self.caption_processor.batch_decode(generated_ids, skip_special_tokens=True)
+    
+    @staticmethod
+    def _format_caption(generated_text: Optional[str], task_prompt: str) -> Tuple[str, str]:
+        """Post-traitement: caption nettoyée + label court (5 premiers mots)"""
+        if generated_text is None:
             return "UI Element", "element"
+        
+        caption = generated_text.replace(task_prompt, "").strip()
+        if not caption or len(caption) < 3:
+            caption = "UI Element"
+        
+        label = ' '.join(caption.split()[:5])
+        return caption, label
+    
+    def _generate_caption(self, crop_image: np.ndarray) -> Tuple[str, str]:
+        """Caption d'un seul élément UI (lot de taille 1)"""
+        return self._generate_captions([crop_image])[0]
+    
+    def warmup(self) -> bool:
+        """Inférence factice (YOLO + une caption) pour initialiser les kernels"""
+        if self.icon_detect is None or self.caption_model is None:
+            return False
+        
+        start = time.time()
+        dummy = np.full((640, 640, 3), 255, dtype=np.uint8)
+        cv2.rectangle(dummy, (200, 280), (440, 360), (60, 60, 60), -1)
+        self.icon_detect.predict(dummy, conf=self.confidence_threshold, device=self.device, verbose=False)
+        
+        from PIL import Image
+        size = OMNIPARSER_CAPTION_CROP_SIZE or 64
+        crop = cv2.resize(dummy[260:380, 180:460], (size, size))
+        if self.device == "cuda":
+            residency_manager.acquire("florence2", reason="warmup OmniParser")
+        try:
+            self._caption_batch([Image.fromarray(crop)], "<CAPTION>")
+        finally:
+            if self.device == "cuda":
+                residency_manager.release("florence2")
+        print(f"[OmniParser] Warmup terminé en {time.time() - start:.2f}s")
+        return True
     
     def detect_from_path(self, image_path: Path) -> List[Dict]:
         """Détecte éléments UI depuis un fichier image"""
@@ -364,5 +443,27 @@ class OmniParserDetector:
         return "\n".join(lines)
 
 
-# Instance globale
-omniparser = OmniParserDetector()
\ No newline at end of file
+# Instance globale, chargée au premier usage (get_omniparser)
+_omniparser: Optional[OmniParserDetector] = None
+_omniparser_lock = threading.Lock()
+
+
+def get_omniparser() -> OmniParserDetector:
+    """Retourne le détecteur OmniParser (charge YOLO + Florence-2 au premier appel)"""
+    global _omniparser
+    if _omniparser is None:
+        with _omniparser_lock:
+            if _omniparser is None:
+                _omniparser = OmniParserDetector()
+    return _omniparser
+
+
+def is_omniparser_loaded() -> bool:
+    return _omniparser is not None
+
+
+def __getattr__(name):
+    # Compatibilité: `from actions.omniparser_detector import omniparser`
+    if name == "omniparser":
+        return get_omniparser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
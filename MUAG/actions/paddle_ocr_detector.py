@@ -4,6 +4,7 @@ Detection de texte avec coordonnees precises en utilisant PaddleOCR
 """
 import cv2
 import numpy as np
+import threading
 import time
 from typing import List, Dict, Tuple, Optional
 from pathlib import Path
@@ -69,6 +70,11 @@ class PaddleOCRDetector:
             self.ocr = PaddleOCR(**ocr_kwargs)
             self.conf_threshold = PADDLE_OCR_CONFIDENCE_THRESHOLD
             
+            # PaddlePaddle ne libère pas sa VRAM: épinglé
+            if PADDLE_OCR_USE_GPU:
+                from utils.model_residency import residency_manager
+                residency_manager.register("paddleocr", pinned=True, resident=True)
+            
             # Log des options réellement utilisées (utile pour debug)
             used_opts = ", ".join(f"{k}={v}" for k, v in ocr_kwargs.items() if k != "lang")
             print(
@@ -246,6 +252,18 @@ class PaddleOCRDetector:
             traceback.print_exc()
             return []
     
+    def warmup(self) -> bool:
+        """OCR factice sur un texte synthétique pour initialiser les modèles"""
+        if self.ocr is None:
+            return False
+        
+        start = time.time()
+        dummy = np.full((96, 480, 3), 255, dtype=np.uint8)
+        cv2.putText(dummy, "Warmup OCR 123", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+        self.detect_text(dummy)
+        print(f"[OCR] Warmup terminé en {time.time() - start:.2f}s")
+        return True
+    
     def detect_from_path(self, image_path: Path) -> List[Dict]:
         """Detecte texte depuis un fichier image"""
         image = cv2.imread(str(image_path))
@@ -278,5 +296,27 @@ class PaddleOCRDetector:
         return (x + w // 2, y + h // 2)
 
 
-# Instance globale
-paddle_ocr = PaddleOCRDetector()
\ No newline at end of file
+# Instance globale, chargée au premier usage (get_paddle_ocr)
+_paddle_ocr: Optional[PaddleOCRDetector] = None
+_paddle_ocr_lock = threading.Lock()
+
+
+def get_paddle_ocr() -> PaddleOCRDetector:
+    """Retourne le détecteur PaddleOCR (charge les modèles au premier appel)"""
+    global _paddle_ocr
+    if _paddle_ocr is None:
+        with _paddle_ocr_lock:
+            if _paddle_ocr is None:
+                _paddle_ocr = PaddleOCRDetector()
+    return _paddle_ocr
+
+
+def is_paddle_ocr_loaded() -> bool:
+    return _paddle_ocr is not None
+
+
+def __getattr__(name):
+    # Compatibilité: `from actions.paddle_ocr_detector import paddle_ocr`
+    if name == "paddle_ocr":
+        return get_paddle_ocr()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -25,7 +25,7 @@ class PlaywrightRouter:
             web_helper: Instance de WebHelper (doit être connectée)
         """
         self.web = web_helper
-        self.llm = OllamaClient()  # LLM local pour parsing rapide
+        self.llm = OllamaClient(component="playwright")  # LLM local pour parsing rapide
     
     def _format_elements_for_llm(self, elements: list) -> str:
         """
@@ -220,7 +220,7 @@ Analyse et réponds en JSON:"""
                         if element_handle:
                             try:
                                 element_handle.scroll_into_view_if_needed()
-                                element_handle.click(timeout=3000)
+                                self.web.act_and_settle(lambda: element_handle.click(timeout=3000), timeout_s=2.0)
                                 print(f"[PlaywrightRouter] ✓ Clic direct sur élément #{element_index}")
                                 return True
                             except Exception as e:
@@ -251,9 +251,9 @@ Analyse et réponds en JSON:"""
                                 # ✅ NOUVEAU : Appuyer sur Enter si demandé
                                 if press_enter:
                                     time.sleep(0.3)  # Petit délai
-                                    element_handle.press("Enter")
+                                    # Attendre la navigation déclenchée puis le chargement
+                                    self.web.act_and_settle(lambda: element_handle.press("Enter"))
                                     print(f"[PlaywrightRouter] ✓ Enter pressé")
-                                    time.sleep(1)  # Attendre chargement
                                 
                                 return True
                             except Exception as e:
@@ -266,17 +266,15 @@ Analyse et réponds en JSON:"""
                 if success and press_enter:
                     time.sleep(0.3)
                     if self.web.page:
-                        self.web.page.keyboard.press("Enter")
+                        self.web.act_and_settle(lambda: self.web.page.keyboard.press("Enter"))
                         print(f"[PlaywrightRouter] ✓ Enter pressé")
-                        time.sleep(1)
                 
                 return success
             
             elif action == "enter":
                 # Appuyer sur Entrée
                 if self.web.page:
-                    self.web.page.keyboard.press("Enter")
-                    time.sleep(0.5)
+                    self.web.act_and_settle(lambda: self.web.page.keyboard.press("Enter"))
                     return True
                 return False
             
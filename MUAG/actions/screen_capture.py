@@ -0,0 +1,214 @@
+"""
+Screen Capture - Backends de capture d'écran vers numpy BGR
+Sans passer par PIL ni par un PNG: le buffer capturé est exposé directement
+à OpenCV / OmniParser / ScreenMonitor.
+
+Backends (SCREEN_CAPTURE_BACKEND = "auto" → premier disponible):
+- dxcam     : Windows, Desktop Duplication (DXGI), le plus rapide
+- mss       : Windows / Linux (X11, Xvfb) / macOS
+- pyautogui : fallback universel (PIL, plus lent)
+"""
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config import SCREEN_CAPTURE_BACKEND, SCREEN_CAPTURE_GRAB_TIMEOUT_S
+
+# region = (x, y, width, height) comme pyautogui
+Region = Optional[Tuple[int, int, int, int]]
+
+
+class PyAutoGUIBackend:
+    """Fallback: pyautogui.screenshot() (PIL RGB) converti en BGR"""
+    name = "pyautogui"
+
+    def __init__(self):
+        import pyautogui
+        self.pyautogui = pyautogui
+
+    def grab(self, region: Region = None) -> np.ndarray:
+        shot = self.pyautogui.screenshot(region=region) if region else self.pyautogui.screenshot()
+        return cv2.cvtColor(np.asarray(shot), cv2.COLOR_RGB2BGR)
+
+
+class MSSBackend:
+    """mss: capture native (XShm/XGetImage sous X11, GDI sous Windows), BGRA sans copie"""
+    name = "mss"
+
+    def __init__(self):
+        import mss
+        self.mss = mss
+        self.local = threading.local()  # Une instance mss par thread (non thread-safe)
+        with mss.mss() as sct:
+            self.full = dict(sct.monitors[1])
+
+    def _sct(self):
+        if not hasattr(self.local, "sct"):
+            self.local.sct = self.mss.mss()
+        return self.local.sct
+
+    def grab(self, region: Region = None) -> np.ndarray:
+        if region:
+            x, y, w, h = region
+            box = {"left": self.full["left"] + x, "top": self.full["top"] + y, "width": w, "height": h}
+        else:
+            box = self.full
+        shot = self._sct().grab(box)
+        # Vue BGR sur le buffer BGRA (pas de conversion couleur)
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)[:, :, :3]
+
+
+class DXCamBackend:
+    """
+    dxcam: Desktop Duplication API (Windows uniquement)
+    camera.grab() renvoie None tant que l'écran n'a pas changé depuis la capture
+    précédente, quelle que soit la région demandée: la dernière frame plein écran
+    est gardée pour recadrer une autre région sur un écran figé.
+    """
+    name = "dxcam"
+
+    def __init__(self):
+        if sys.platform != "win32":
+            raise RuntimeError("dxcam disponible uniquement sous Windows")
+        import dxcam
+        self.camera = dxcam.create(output_color="BGR")
+        self.last = None
+        self.last_full = None
+        self.fallback = None
+
+    def grab(self, region: Region = None) -> np.ndarray:
+        box = None
+        if region:
+            x, y, w, h = region
+            box = (x, y, x + w, y + h)
+        frame = self.camera.grab(region=box)
+        if frame is None:
+            # Écran inchangé depuis la dernière capture: dxcam ne renvoie rien
+            if self.last is not None and self.last[0] == box:
+                return self.last[1]
+            frame = self._wait_frame(box)
+            if frame is None:
+                frame = self._grab_full_cropped(box)
+        self.last = (box, frame)
+        if box is None:
+            self.last_full = frame
+        return frame
+
+    def _wait_frame(self, box) -> Optional[np.ndarray]:
+        """Attend une nouvelle frame jusqu'à SCREEN_CAPTURE_GRAB_TIMEOUT_S (None sinon)"""
+        deadline = time.time() + SCREEN_CAPTURE_GRAB_TIMEOUT_S
+        while time.time() < deadline:
+            time.sleep(0.005)
+            frame = self.camera.grab(region=box)
+            if frame is not None:
+                return frame
+        return None
+
+    def _grab_full_cropped(self, box) -> np.ndarray:
+        """Écran figé sur une autre région: une capture plein écran recadrée"""
+        full = self.camera.grab()
+        if full is None:
+            full = self.last_full
+        if full is None:
+            # Aucune frame plein écran connue: capture ponctuelle hors DXGI
+            if self.fallback is None:
+                self.fallback = PyAutoGUIBackend()
+            full = self.fallback.grab()
+            print("[Capture] dxcam sans nouvelle frame → capture pyautogui")
+        self.last_full = full
+        if box is None:
+            return full
+        x1, y1, x2, y2 = box
+        return full[y1:y2, x1:x2]
+
+
+BACKENDS = {
+    "dxcam": DXCamBackend,
+    "mss": MSSBackend,
+    "pyautogui": PyAutoGUIBackend,
+}
+AUTO_ORDER = ["dxcam", "mss", "pyautogui"]
+
+
+class ScreenCapture:
+    """Capture d'écran via le backend configuré (chargé à la première capture)"""
+
+    def __init__(self, backend: Optional[str] = None):
+        self.requested = backend or SCREEN_CAPTURE_BACKEND
+        self.backend = None
+        self.lock = threading.Lock()
+
+    def _load(self):
+        with self.lock:
+            if self.backend is not None:
+                return self.backend
+            order = AUTO_ORDER if self.requested == "auto" else [self.requested, "pyautogui"]
+            for name in order:
+                try:
+                    self.backend = BACKENDS[name]()
+                    print(f"[Capture] Backend: {name}")
+                    break
+                except Exception as e:
+                    print(f"[Capture] Backend {name} indisponible: {e}")
+            if self.backend is None:
+                raise RuntimeError("Aucun backend de capture d'écran disponible")
+            return self.backend
+
+    @property
+    def name(self) -> str:
+        return self._load().name
+
+    def grab(self, region: Region = None) -> np.ndarray:
+        """
+        Capture l'écran (ou une région) en BGR
+        Args:
+            region: (x, y, width, height) ou None pour tout l'écran
+        """
+        return self._load().grab(region)
+
+    def grab_small(self, scale: float = 0.25, region: Region = None) -> np.ndarray:
+        """Capture réduite (comparaisons rapides de frames)"""
+        image = self.grab(region)
+        return cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+def available_backends() -> List[str]:
+    """Backends importables sur cette machine"""
+    names = []
+    for name, cls in BACKENDS.items():
+        try:
+            cls()
+            names.append(name)
+        except Exception:
+            pass
+    return names
+
+
+def benchmark(backend: str, frames: int = 100, region: Region = None) -> Dict:
+    """Mesure débit et latence d'un backend"""
+    capture = ScreenCapture(backend)
+    capture.grab(region)  # Initialisation hors mesure
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(frames):
+        t0 = time.perf_counter()
+        image = capture.grab(region)
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "backend": capture.name,
+        "frames": frames,
+        "shape": image.shape,
+        "fps": frames / total if total else 0.0,
+        "avg_ms": sum(latencies) / frames * 1000,
+        "p95_ms": latencies[min(frames - 1, int(frames * 0.95))] * 1000,
+    }
+
+
+# Instance globale
+screen_capture = ScreenCapture()
@@ -6,6 +6,7 @@ Détecte les changements visuels entre frames :
 - Nouvelles fenêtres
 Utile pour savoir si une action a eu un effet
 """
+import time
 import cv2
 import numpy as np
 from typing import List, Dict, Optional, Tuple
@@ -14,8 +15,15 @@ from collections import deque
 from config import (
     ENABLE_SCREEN_MONITORING,
     MONITOR_DIFF_THRESHOLD,
-    MONITOR_HISTORY_SIZE
+    MONITOR_HISTORY_SIZE,
+    STABLE_MAX_WAIT_S,
+    STABLE_MIN_WAIT_S,
+    STABLE_QUIET_S,
+    STABLE_POLL_S,
+    STABLE_SAMPLE_SCALE,
+    STABLE_DIFF_THRESHOLD,
 )
+from .screen_capture import screen_capture
 
 
 class ScreenMonitor:
@@ -81,18 +89,10 @@ class ScreenMonitor:
         """
         Détecte les changements entre deux frames
         """
-        # Convertir en niveaux de gris
-        gray1 = cv2.cvtColor(frame1, cv2.COLOR_BGR2GRAY)
-        gray2 = cv2.cvtColor(frame2, cv2.COLOR_BGR2GRAY)
-        
-        # Différence absolue
-        diff = cv2.absdiff(gray1, gray2)
-        
-        # Seuil binaire
-        _, thresh = cv2.threshold(diff, 30, 255, cv2.THRESH_BINARY)
+        thresh = self._diff_mask(frame1, frame2)
         
         # Calculer pourcentage de changement
-        total_pixels = diff.shape[0] * diff.shape[1]
+        total_pixels = thresh.shape[0] * thresh.shape[1]
         changed_pixels = np.count_nonzero(thresh)
         change_percent = changed_pixels / total_pixels
         
@@ -112,6 +112,65 @@ class ScreenMonitor:
             'change_areas': change_areas
         }
     
+    def _diff_mask(self, frame1: np.ndarray, frame2: np.ndarray) -> np.ndarray:
+        """Masque binaire des pixels qui ont changé (niveaux de gris, seuil 30)"""
+        gray1 = frame1 if frame1.ndim == 2 else cv2.cvtColor(frame1, cv2.COLOR_BGR2GRAY)
+        gray2 = frame2 if frame2.ndim == 2 else cv2.cvtColor(frame2, cv2.COLOR_BGR2GRAY)
+        diff = cv2.absdiff(gray1, gray2)
+        _, thresh = cv2.threshold(diff, 30, 255, cv2.THRESH_BINARY)
+        return thresh
+    
+    def dirty_regions(
+        self,
+        frame1: np.ndarray,
+        frame2: np.ndarray,
+        padding: int = 0,
+        min_area: int = 20
+    ) -> List[List[int]]:
+        """
+        Rectangles à re-analyser entre deux frames (même les petits changements:
+        survol, caractère tapé), élargis de `padding` puis fusionnés
+        
+        Returns:
+            Liste de [x, y, width, height] disjoints
+        """
+        thresh = self._diff_mask(frame1, frame2)
+        if not np.count_nonzero(thresh):
+            return []
+        
+        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        h, w = thresh.shape
+        rects = []
+        for contour in contours:
+            x, y, cw, ch = cv2.boundingRect(contour)
+            if cw * ch < min_area:
+                continue
+            x1, y1 = max(0, x - padding), max(0, y - padding)
+            x2, y2 = min(w, x + cw + padding), min(h, y + ch + padding)
+            rects.append([x1, y1, x2, y2])
+        
+        return [[x1, y1, x2 - x1, y2 - y1] for x1, y1, x2, y2 in self._merge_rects(rects)]
+    
+    @staticmethod
+    def _merge_rects(rects: List[List[int]]) -> List[List[int]]:
+        """Fusionne les rectangles [x1, y1, x2, y2] qui se chevauchent ou se touchent"""
+        merged = True
+        while merged:
+            merged = False
+            result = []
+            for rect in rects:
+                for other in result:
+                    if (rect[0] <= other[2] and other[0] <= rect[2]
+                            and rect[1] <= other[3] and other[1] <= rect[3]):
+                        other[0], other[1] = min(other[0], rect[0]), min(other[1], rect[1])
+                        other[2], other[3] = max(other[2], rect[2]), max(other[3], rect[3])
+                        merged = True
+                        break
+                else:
+                    result.append(list(rect))
+            rects = result
+        return rects
+    
     def _classify_change(self, diff_thresh: np.ndarray, percent: float) -> str:
         """
         Classifie le type de changement
@@ -172,6 +231,71 @@ class ScreenMonitor:
         
         return areas
     
+    def wait_for_stable(
+        self,
+        timeout: Optional[float] = None,
+        quiet_s: Optional[float] = None,
+        min_wait: Optional[float] = None,
+        region: Optional[Tuple[int, int, int, int]] = None
+    ) -> Dict:
+        """
+        Attend que l'écran arrête de changer (au plus `timeout` secondes)
+        Compare des captures réduites successives: retourne dès que rien n'a
+        bougé pendant `quiet_s`.
+        
+        Returns:
+            {'stable': bool, 'waited_s': float, 'frames': int}
+        """
+        timeout = STABLE_MAX_WAIT_S if timeout is None else timeout
+        quiet_s = STABLE_QUIET_S if quiet_s is None else quiet_s
+        min_wait = STABLE_MIN_WAIT_S if min_wait is None else min_wait
+        
+        start = time.time()
+        deadline = start + timeout
+        if min_wait > 0:
+            time.sleep(min(min_wait, timeout))
+        
+        try:
+            previous = self._sample(region)
+        except Exception as e:
+            # Capture impossible: comportement d'avant (attente fixe)
+            print(f"[Monitor] Capture indisponible ({e}), attente fixe {timeout:.1f}s")
+            time.sleep(max(0.0, deadline - time.time()))
+            return {'stable': False, 'waited_s': time.time() - start, 'frames': 0}
+        
+        frames = 1
+        last_change = time.time()
+        stable = False
+        while True:
+            now = time.time()
+            if now - last_change >= quiet_s:
+                stable = True
+                break
+            if now >= deadline:
+                break
+            time.sleep(STABLE_POLL_S)
+            try:
+                current = self._sample(region)
+            except Exception as e:
+                # Capture perdue en cours d'attente: finir l'attente sans comparer
+                print(f"[Monitor] Capture indisponible ({e}), fin d'attente sans comparaison")
+                time.sleep(max(0.0, deadline - time.time()))
+                break
+            frames += 1
+            diff = cv2.absdiff(previous, current)
+            if np.count_nonzero(diff > 30) / diff.size > STABLE_DIFF_THRESHOLD:
+                last_change = time.time()
+            previous = current
+        
+        waited = time.time() - start
+        print(f"[Monitor] Écran {'stable' if stable else 'encore en mouvement'} après {waited:.2f}s ({frames} captures)")
+        return {'stable': stable, 'waited_s': waited, 'frames': frames}
+    
+    def _sample(self, region=None) -> np.ndarray:
+        """Capture réduite en niveaux de gris"""
+        small = screen_capture.grab_small(STABLE_SAMPLE_SCALE, region)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    
     def get_change_summary(self) -> str:
         """
         Résumé des changements récents pour le LLM
@@ -0,0 +1,251 @@
+"""
+Screen State Cache - Résultats vision mémorisés par écran
+Les mêmes workflows (titres likés Spotify, boîte Gmail, recherche Google...)
+reviennent sur des écrans identiques: la vision complète (OmniParser + OCR +
+SemanticEnricher) est reprise du cache au lieu d'être recalculée.
+
+Clé  = fenêtre active (URL via WebHelper, sinon titre de fenêtre) + zone parsée
+       + pHash 64 bits de l'image (IconCaptionCache.phash)
+Hit  = même clé, hash à SCREEN_CACHE_MAX_DISTANCE bits ou moins, puis validation
+       pleine résolution: aucune zone modifiée (ScreenMonitor.dirty_regions, même
+       seuil que le re-parse incrémental) entre l'image de référence et l'écran
+Persistance JSON (SCREEN_CACHE_FILE), éviction LRU (SCREEN_CACHE_MAX_ENTRIES) et
+expiration (SCREEN_CACHE_TTL_S).
+"""
+import base64
+import copy
+import itertools
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+from config import (
+    SCREEN_CACHE_ENABLED,
+    SCREEN_CACHE_FILE,
+    SCREEN_CACHE_MAX_ENTRIES,
+    SCREEN_CACHE_MAX_DISTANCE,
+    SCREEN_CACHE_TTL_S,
+    INCREMENTAL_PARSE_MIN_AREA,
+)
+from .icon_caption_cache import IconCaptionCache
+from .screen_monitor import screen_monitor
+
+
+def _jsonable(value):
+    """Résultats vision → types JSON (numpy, tuples)"""
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class ScreenStateCache:
+    """Cache LRU persistant {(fenêtre, zone, pHash) → résultats vision}"""
+
+    def __init__(self, path=None, max_entries=None, max_distance=None, ttl_s=None, enabled=None):
+        self.path = path or SCREEN_CACHE_FILE
+        self.max_entries = max_entries or SCREEN_CACHE_MAX_ENTRIES
+        self.max_distance = SCREEN_CACHE_MAX_DISTANCE if max_distance is None else max_distance
+        self.ttl_s = SCREEN_CACHE_TTL_S if ttl_s is None else ttl_s
+        self.enabled = SCREEN_CACHE_ENABLED if enabled is None else enabled
+        self.entries: "OrderedDict[int, Dict]" = OrderedDict()
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.stats = {"hits": 0, "misses": 0, "rejected": 0, "stores": 0, "evictions": 0, "expired": 0}
+        if self.enabled:
+            self.load()
+
+    # ============================================
+    # EMPREINTE D'UN ÉCRAN
+    # ============================================
+
+    @staticmethod
+    def _gray(image: np.ndarray) -> np.ndarray:
+        return image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    @staticmethod
+    def _dirty_regions(ref_png: bytes, gray: np.ndarray) -> list:
+        """Zones modifiées entre l'image de référence (PNG) et l'écran courant"""
+        ref = cv2.imdecode(np.frombuffer(ref_png, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        if ref is None or ref.shape != gray.shape:
+            return [[0, 0, gray.shape[1], gray.shape[0]]]
+        return screen_monitor.dirty_regions(ref, gray, min_area=INCREMENTAL_PARSE_MIN_AREA)
+
+    # ============================================
+    # LECTURE / ÉCRITURE
+    # ============================================
+
+    def get(self, state_key: str, zone: str, image: np.ndarray) -> Optional[Dict]:
+        """
+        Résultats vision mémorisés pour cet écran (copie), None si absent ou invalide
+        """
+        if not self.enabled or not state_key:
+            return None
+        gray = self._gray(image)
+        phash = IconCaptionCache.phash(gray)
+        shape = list(gray.shape[:2])
+        now = time.time()
+        with self.lock:
+            self._expire(now)
+            best_id, best_distance = None, self.max_distance + 1
+            for entry_id, entry in self.entries.items():
+                if entry["key"] != state_key or entry["zone"] != zone or entry["shape"] != shape:
+                    continue
+                distance = bin(entry["phash"] ^ phash).count("1")
+                if distance < best_distance:
+                    best_id, best_distance = entry_id, distance
+
+            if best_id is None:
+                self.stats["misses"] += 1
+                return None
+            ref_png = self.entries[best_id]["ref"]
+
+        # Validation hors verrou (décodage + diff pleine résolution)
+        regions = self._dirty_regions(ref_png, gray)
+
+        with self.lock:
+            entry = self.entries.get(best_id)
+            if entry is None or regions:
+                # Même empreinte mais contenu différent (caractère tapé, compteur...)
+                self.stats["rejected"] += 1
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(best_id)
+            entry["last_used"] = now
+            entry["hits"] += 1
+            self.stats["hits"] += 1
+            print(
+                f"[ScreenCache] Hit '{state_key}' ({zone}): distance {best_distance}, "
+                f"aucune zone modifiée, {entry['hits']} réutilisation(s)"
+            )
+            return copy.deepcopy(entry["vision"])
+
+    def put(self, state_key: str, zone: str, image: np.ndarray, vision: Dict):
+        """Mémorise les résultats vision de cet écran (remplace l'entrée quasi identique)"""
+        if not self.enabled or not state_key:
+            return
+        gray = self._gray(image)
+        ok, png = cv2.imencode(".png", gray)
+        if not ok:
+            return
+        now = time.time()
+        entry = {
+            "key": state_key,
+            "zone": zone,
+            "shape": list(gray.shape[:2]),
+            "phash": IconCaptionCache.phash(gray),
+            "ref": png.tobytes(),
+            "vision": _jsonable(vision),
+            "created": now,
+            "last_used": now,
+            "hits": 0,
+        }
+        with self.lock:
+            # Une seule entrée par écran: l'ancienne version est remplacée
+            for entry_id, old in list(self.entries.items()):
+                if (
+                    old["key"] == state_key
+                    and old["zone"] == zone
+                    and old["shape"] == entry["shape"]
+                    and bin(old["phash"] ^ entry["phash"]).count("1") <= self.max_distance
+                ):
+                    del self.entries[entry_id]
+            self.entries[next(self.ids)] = entry
+            self.stats["stores"] += 1
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+            self.dirty = True
+
+    def invalidate(self, state_key: str):
+        """Oublie tous les écrans d'une fenêtre / URL"""
+        with self.lock:
+            for entry_id in [i for i, e in self.entries.items() if e["key"] == state_key]:
+                del self.entries[entry_id]
+                self.dirty = True
+
+    def _expire(self, now: float):
+        """Retire les entrées non utilisées depuis SCREEN_CACHE_TTL_S, appelé sous verrou"""
+        if not self.ttl_s:
+            return
+        for entry_id in [i for i, e in self.entries.items() if now - e["last_used"] > self.ttl_s]:
+            del self.entries[entry_id]
+            self.stats["expired"] += 1
+            self.dirty = True
+
+    # ============================================
+    # PERSISTANCE
+    # ============================================
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for item in data.get("entries", []):
+                self.entries[next(self.ids)] = {
+                    "key": item["key"],
+                    "zone": item["zone"],
+                    "shape": item["shape"],
+                    "phash": int(item["phash"], 16),
+                    "ref": base64.b64decode(item["ref"]),
+                    "vision": item["vision"],
+                    "created": item["created"],
+                    "last_used": item["last_used"],
+                    "hits": item.get("hits", 0),
+                }
+            self._expire(time.time())
+            self.dirty = False
+            print(f"[ScreenCache] {len(self.entries)} écrans chargés")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[ScreenCache] Erreur chargement: {e}")
+
+    def save(self):
+        """Sauvegarde si le cache a changé (ordre LRU conservé)"""
+        with self.lock:
+            if not self.dirty:
+                return
+            entries = [
+                {
+                    "key": e["key"],
+                    "zone": e["zone"],
+                    "shape": e["shape"],
+                    "phash": f"{e['phash']:016x}",
+                    "ref": base64.b64encode(e["ref"]).decode("ascii"),
+                    "vision": e["vision"],
+                    "created": e["created"],
+                    "last_used": e["last_used"],
+                    "hits": e["hits"],
+                }
+                for e in self.entries.values()
+            ]
+            self.dirty = False
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({"entries": entries}, f, ensure_ascii=False)
+        except Exception as e:
+            print(f"[ScreenCache] Erreur sauvegarde: {e}")
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self.entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+# Instance globale
+screen_state_cache = ScreenStateCache()
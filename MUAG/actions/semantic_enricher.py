@@ -3,10 +3,11 @@ Semantic Enricher Module
 Fusionne OCR + OmniParser pour enrichir les descriptions UI
 Approche : OCR proche + patterns visuels essentiels + contexte spatial
 """
-import numpy as np
 from typing import List, Dict, Tuple, Optional
 import re
 
+from .ocr_index import OCRSpatialIndex
+
 
 class SemanticEnricher:
     """
@@ -117,6 +118,9 @@ class SemanticEnricher:
 
         enriched: List[Dict] = []
 
+        # Grille OCR construite une fois pour toute la frame
+        ocr_index = OCRSpatialIndex(ocr_results)
+
         for elem_idx, elem in enumerate(clickable_elements):
             elem_id = elem.get("id", elem_idx)
 
@@ -129,7 +133,7 @@ class SemanticEnricher:
             confidence = float(elem.get("confidence", 0.0))
 
             # 1. Texte OCR à proximité
-            ocr_nearby = self._find_nearby_ocr(bbox, center, ocr_results)
+            ocr_nearby = self._find_nearby_ocr(bbox, center, ocr_results, index=ocr_index)
 
             # 2. Contexte spatial
             spatial_context = self._get_spatial_context(center, image_shape, context)
@@ -249,71 +253,20 @@ class SemanticEnricher:
         center: Tuple[int, int],
         ocr_results: List[Dict],
         threshold: int = 50,
+        index: Optional[OCRSpatialIndex] = None,
     ) -> Optional[str]:
         """
         Fusionne TOUS les textes OCR dont le centre est dans la bbox OmniParser
         Stratégie inspirée d'OmniParser (Microsoft Research)
+        Sinon, texte OCR le plus proche (centre à centre, < threshold px)
+
+        index: grille OCR de la frame (construite une fois dans enrich)
         """
         if not ocr_results:
             return None
-
-        x, y, w, h = bbox
-        cx, cy = center
-
-        # Collecte TOUS les textes OCR dont le centre est dans la bbox
-        texts_inside = []
-
-        for ocr in ocr_results:
-            ocr_text = ocr.get("text", "").strip()
-            if not ocr_text:
-                continue
-
-            ocr_bbox = ocr.get("bbox", [])
-            if len(ocr_bbox) < 4:
-                continue
-
-            ox, oy, ow, oh = ocr_bbox
-            
-            # Calculer le centre de la bbox OCR
-            ocr_cx = ox + ow // 2
-            ocr_cy = oy + oh // 2
-
-            # Si le CENTRE de l'OCR est dans la bbox OmniParser
-            if x <= ocr_cx <= (x + w) and y <= ocr_cy <= (y + h):
-                texts_inside.append((oy, ocr_text))
-
-        # Si on a trouvé du texte dedans, fusionner tous les textes
-        if texts_inside:
-            # Trier par position Y (haut en bas)
-            texts_inside.sort(key=lambda t: t[0])
-            # Fusionner avec espace
-            return " ".join([t[1] for t in texts_inside])
-
-        # Sinon, chercher le plus proche (fallback)
-        best_text = None
-        min_distance = float("inf")
-
-        for ocr in ocr_results:
-            ocr_text = ocr.get("text", "").strip()
-            if not ocr_text:
-                continue
-
-            ocr_bbox = ocr.get("bbox", [])
-            if len(ocr_bbox) < 4:
-                continue
-
-            ox, oy, ow, oh = ocr_bbox
-            ocr_cx = ox + ow // 2
-            ocr_cy = oy + oh // 2
-
-            # Distance centre-centre
-            distance = np.sqrt((cx - ocr_cx) ** 2 + (cy - ocr_cy) ** 2)
-
-            if distance < min_distance and distance < threshold:
-                min_distance = distance
-                best_text = ocr_text
-
-        return best_text
+        if index is None:
+            index = OCRSpatialIndex(ocr_results)
+        return index.associate(bbox, center, threshold)
 
     def _classify_by_pattern(self, visual_desc: str) -> Tuple[str, str]:
         """
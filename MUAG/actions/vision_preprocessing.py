@@ -108,6 +108,12 @@ class VisionPreprocessor:
         x, y, w, h = bbox
         return image[y:y+h, x:x+w]
     
+    def preprocess_frame(self, frame, name: Optional[str] = None):
+        """
+        Preprocess une Frame en memoire (echelle vers la capture conservee)
+        """
+        return frame.derive(self.preprocess(frame.image), name or f"preprocessed_{frame.name}")
+    
     def preprocess_from_path(self, image_path: Path) -> np.ndarray:
         """
         Charge et preprocess une image depuis un fichier
@@ -8,10 +8,26 @@ import numpy as np
 from pathlib import Path
 from typing import List, Dict, Tuple
 
+from .label_layout import LabelLayout
+
 
 class VisualAnnotator:
     """Annotateur visuel pour le Set-of-Mark prompting"""
     
+    # Palette de couleurs rotatives pour distinguer éléments voisins
+    COLOR_PALETTE = [
+        ((150, 30, 150), (100, 20, 100)),   # 1. Violet/Magenta foncé
+        ((0, 70, 150), (0, 50, 120)),       # 2. Orange très foncé
+        ((150, 70, 30), (120, 50, 20)),     # 3. Bleu/Cyan très foncé
+        ((30, 100, 30), (20, 80, 20)),      # 4. Vert très foncé
+        ((70, 30, 150), (50, 20, 120)),     # 5. Rouge-violet foncé
+        ((100, 100, 0), (80, 80, 0)),       # 6. Cyan foncé
+        ((0, 100, 100), (0, 80, 80)),       # 7. Jaune/Or foncé
+        ((100, 0, 100), (80, 0, 80)),       # 8. Magenta foncé
+        ((50, 100, 150), (40, 80, 120)),    # 9. Orange-brun foncé
+        ((150, 50, 100), (120, 40, 80)),    # 10. Rose-violet foncé
+    ]
+    
     def __init__(self):
         """Initialise l'annotateur avec les paramètres de style"""
         # Couleurs
@@ -48,62 +64,55 @@ class VisualAnnotator:
         if img is None:
             raise ValueError(f"Impossible de charger l'image: {screenshot_path}")
         
-        # Créer une copie pour l'annotation
-        annotated = img.copy()
+        annotated = self.draw_marks(img, clickable_elements)
         
-        # Fonction helper pour détecter collision entre rectangles
-        def rectangles_overlap(rect1, rect2, tolerance=2):
-            """Vérifie si 2 rectangles se chevauchent (avec tolérance)"""
-            x1, y1, w1, h1 = rect1
-            x2, y2, w2, h2 = rect2
-            
-            # Ajouter tolérance (permet petit chevauchement acceptable)
-            if (x1 + w1 < x2 - tolerance or
-                x2 + w2 < x1 - tolerance or
-                y1 + h1 < y2 - tolerance or
-                y2 + h2 < y1 - tolerance):
-                return False
-            return True
+        # Sauvegarder l'image annotée
+        if output_path is None:
+            output_path = screenshot_path.parent / f"annotated_{screenshot_path.name}"
+        
+        cv2.imwrite(str(output_path), annotated)
+        print(f"📝 Image annotée avec {len(clickable_elements)} éléments: {output_path}")
+        
+        return output_path
+    
+    def annotate_frame(self, frame, clickable_elements: List[Dict], name: str = None):
+        """
+        Annote une Frame en mémoire (pas de relecture ni d'écriture PNG)
         
-        # Extraire toutes les bboxes pour vérification collision
+        Returns:
+            Frame annotée (même repère que la Frame source)
+        """
+        annotated = self.prepare_frame(frame, clickable_elements).render(name=name)
+        print(f"📝 Image annotée avec {len(clickable_elements)} éléments (mémoire)")
+        return annotated
+    
+    def prepare_frame(self, frame, clickable_elements: List[Dict]) -> "MarkedFrame":
+        """
+        Place les étiquettes sans dessiner: le rendu (image entière ou seulement
+        la zone envoyée au VLM #2) est fait plus tard par MarkedFrame.render
+        """
+        marks = self.layout_marks(frame.shape, clickable_elements)
+        return MarkedFrame(self, frame, marks)
+    
+    def layout_marks(self, image_shape: Tuple[int, ...], clickable_elements: List[Dict]) -> List[Dict]:
+        """
+        Calcule couleur et position de l'étiquette de chaque élément
+        
+        Returns:
+            Liste de marques {id_text, bbox, color, text_x, text_y, text_w, text_h, baseline}
+        """
+        height, width = image_shape[:2]
+        
+        # Extraire toutes les bboxes pour vérification collision (index spatial)
         all_bboxes = [elem.get('bbox', [0, 0, 0, 0]) for elem in clickable_elements]
+        layout = LabelLayout(all_bboxes)
         
-        # Annoter chaque élément
-        for idx, elem in enumerate(clickable_elements):
-            # Extraire les informations
-            bbox = elem.get('bbox', [0, 0, 0, 0])  # [x, y, w, h]
-            center = elem.get('center', (0, 0))
+        marks = []
+        for idx, bbox in enumerate(all_bboxes):
+            bbox_color, _ = self.COLOR_PALETTE[idx % len(self.COLOR_PALETTE)]
             
-            # Palette de couleurs rotatives pour distinguer éléments voisins
-            color_palette = [
-                ((150, 30, 150), (100, 20, 100)),   # 1. Violet/Magenta foncé
-                ((0, 70, 150), (0, 50, 120)),       # 2. Orange très foncé
-                ((150, 70, 30), (120, 50, 20)),     # 3. Bleu/Cyan très foncé
-                ((30, 100, 30), (20, 80, 20)),      # 4. Vert très foncé
-                ((70, 30, 150), (50, 20, 120)),     # 5. Rouge-violet foncé
-                ((100, 100, 0), (80, 80, 0)),       # 6. Cyan foncé
-                ((0, 100, 100), (0, 80, 80)),       # 7. Jaune/Or foncé
-                ((100, 0, 100), (80, 0, 80)),       # 8. Magenta foncé
-                ((50, 100, 150), (40, 80, 120)),    # 9. Orange-brun foncé
-                ((150, 50, 100), (120, 40, 80)),    # 10. Rose-violet foncé
-            ]
-            bbox_color, _ = color_palette[idx % len(color_palette)]
-            text_bg_color = bbox_color  # Même couleur pour box et étiquette            
-            
-            # Dessiner la bounding box
-            x, y, w, h = bbox
-            cv2.rectangle(
-                annotated, 
-                (x, y), 
-                (x + w, y + h),
-                bbox_color, 
-                self.bbox_thickness
-            )
-            
-            # Préparer le texte de l'ID
+            # Préparer le texte de l'ID et calculer sa taille
             id_text = str(idx)
-            
-            # Calculer la taille du texte
             (text_w, text_h), baseline = cv2.getTextSize(
                 id_text, 
                 self.font, 
@@ -112,97 +121,134 @@ class VisualAnnotator:
             )
             
             # Positionnement intelligent pour éviter collisions
-            text_x = x + (w - text_w) // 2  # Centré par défaut
-            
-            # Essayer plusieurs positions dans l'ordre de priorité
-            positions = [
-                ('top', x + (w - text_w) // 2, y - 5 - text_h),              # Au-dessus
-                ('bottom', x + (w - text_w) // 2, y + h + 2),                 # En dessous
-                ('left', x - text_w - 2, y + (h - text_h) // 2),              # À gauche
-                ('right', x + w + 2, y + (h - text_h) // 2),                  # À droite
-            ]
-            
-            # Tester chaque position
-            best_pos = positions[0]  # Par défaut : au-dessus
-            for pos_name, px, py in positions:
-                # Rectangle de l'étiquette à cette position
-                label_rect = [px, py, text_w, text_h + 5]
-                
-                # Vérifier collision avec toutes les autres bboxes
-                has_collision = False
-                for j, other_bbox in enumerate(all_bboxes):
-                    if j != idx and rectangles_overlap(label_rect, other_bbox):
-                        has_collision = True
-                        break
-                
-                # Si pas de collision, utiliser cette position
-                if not has_collision:
-                    text_x, text_y = px, py + text_h  # Ajuster pour baseline
-                    break
-            else:
-                # Si toutes les positions ont collision, garder au-dessus
-                text_x = x + (w - text_w) // 2
-                text_y = y - 5
+            text_x, text_y = layout.place(idx, text_w, text_h)
             
             # S'assurer que le texte ne dépasse pas
-            text_x = max(2, min(text_x, img.shape[1] - text_w - 2))
-            text_y = max(text_h + 2, min(text_y, img.shape[0] - 2))
-            
-            # Bordure blanche autour de l'étiquette
-            padding = 2
-            white_padding = padding + 1
+            text_x = max(2, min(text_x, width - text_w - 2))
+            text_y = max(text_h + 2, min(text_y, height - 2))
             
-            # Dessiner bordure blanche
-            cv2.rectangle(
-                annotated,
-                (text_x - white_padding, text_y - text_h - white_padding),
-                (text_x + text_w + white_padding, text_y + baseline + white_padding),
-                (255, 255, 255),  # Blanc
-                -1
-            )
-            
-            # Dessiner le fond coloré
-            cv2.rectangle(
-                annotated,
-                (text_x - padding, text_y - text_h - padding),
-                (text_x + text_w + padding, text_y + baseline + padding),
-                text_bg_color,  # Couleur de la palette
-                -1
-            )
-            
-            # Dessiner l'ID
-            cv2.putText(
+            marks.append({
+                'id_text': id_text,
+                'bbox': bbox,
+                'color': bbox_color,
+                'text_x': text_x,
+                'text_y': text_y,
+                'text_w': text_w,
+                'text_h': text_h,
+                'baseline': baseline,
+            })
+        return marks
+    
+    def draw_marks(
+        self,
+        img: np.ndarray,
+        clickable_elements: List[Dict],
+        region: Tuple[int, int, int, int] = None,
+        marks: List[Dict] = None,
+    ) -> np.ndarray:
+        """
+        Dessine les bbox + IDs (Set-of-Mark) sur une copie de l'image
+        
+        Args:
+            region: (x1, y1, x2, y2) pour ne rendre que cette zone (image croppée)
+            marks: marques déjà placées (layout_marks), recalculées sinon
+        
+        Returns:
+            Image annotée (BGR)
+        """
+        if marks is None:
+            marks = self.layout_marks(img.shape, clickable_elements)
+        
+        if region is None:
+            # Créer une copie pour l'annotation
+            annotated = img.copy()
+            dx, dy = 0, 0
+        else:
+            x1, y1, x2, y2 = region
+            annotated = img[y1:y2, x1:x2].copy()
+            dx, dy = x1, y1
+        
+        for mark in marks:
+            if region is not None and not self._mark_in_region(mark, region):
+                continue
+            self._draw_mark(annotated, mark, dx, dy)
+        
+        return annotated
+    
+    @staticmethod
+    def _mark_in_region(mark: Dict, region: Tuple[int, int, int, int], margin: int = 4) -> bool:
+        """La bbox ou l'étiquette de la marque touche-t-elle la zone"""
+        x1, y1, x2, y2 = region
+        x, y, w, h = mark['bbox']
+        tx, ty = mark['text_x'], mark['text_y']
+        left = min(x, x + w, tx) - margin
+        right = max(x, x + w, tx + mark['text_w']) + margin
+        top = min(y, y + h, ty - mark['text_h']) - margin
+        bottom = max(y, y + h, ty + mark['baseline']) + margin
+        return left < x2 and right >= x1 and top < y2 and bottom >= y1
+    
+    def _draw_mark(self, annotated: np.ndarray, mark: Dict, dx: int = 0, dy: int = 0):
+        """Dessine une marque (bbox + étiquette), décalée de (dx, dy) pour un rendu de zone"""
+        x, y, w, h = mark['bbox']
+        x, y = x - dx, y - dy
+        text_x, text_y = mark['text_x'] - dx, mark['text_y'] - dy
+        text_w, text_h, baseline = mark['text_w'], mark['text_h'], mark['baseline']
+        color = mark['color']  # Même couleur pour box et étiquette
+        
+        # Dessiner la bounding box
+        cv2.rectangle(
+            annotated, 
+            (x, y), 
+            (x + w, y + h),
+            color, 
+            self.bbox_thickness
+        )
+        
+        # Bordure blanche autour de l'étiquette
+        padding = 2
+        white_padding = padding + 1
+        
+        # Dessiner bordure blanche
+        cv2.rectangle(
+            annotated,
+            (text_x - white_padding, text_y - text_h - white_padding),
+            (text_x + text_w + white_padding, text_y + baseline + white_padding),
+            (255, 255, 255),  # Blanc
+            -1
+        )
+        
+        # Dessiner le fond coloré
+        cv2.rectangle(
             annotated,
-            id_text,
+            (text_x - padding, text_y - text_h - padding),
+            (text_x + text_w + padding, text_y + baseline + padding),
+            color,  # Couleur de la palette
+            -1
+        )
+        
+        # Dessiner l'ID
+        cv2.putText(
+            annotated,
+            mark['id_text'],
             (text_x, text_y),
             self.font,
             self.font_scale,
             (0, 0, 0),  # Noir
             3,  # Plus épais pour le contour
             cv2.LINE_AA
-            )
+        )
 
-            # Texte blanc par-dessus
-            cv2.putText(
-                annotated,
-                id_text,
-                (text_x, text_y),
-                self.font,
-                self.font_scale,
-                self.text_color,  # Blanc
-                self.text_thickness,
-                cv2.LINE_AA
-            )
-        
-        
-        # Sauvegarder l'image annotée
-        if output_path is None:
-            output_path = screenshot_path.parent / f"annotated_{screenshot_path.name}"
-        
-        cv2.imwrite(str(output_path), annotated)
-        print(f"📝 Image annotée avec {len(clickable_elements)} éléments: {output_path}")
-        
-        return output_path
+        # Texte blanc par-dessus
+        cv2.putText(
+            annotated,
+            mark['id_text'],
+            (text_x, text_y),
+            self.font,
+            self.font_scale,
+            self.text_color,  # Blanc
+            self.text_thickness,
+            cv2.LINE_AA
+        )
     
     def annotate_with_highlights(
         self,
@@ -294,5 +340,35 @@ class VisualAnnotator:
         return output_path
 
 
+class MarkedFrame:
+    """Frame + marques SoM déjà placées, dessinées à la demande"""
+    
+    def __init__(self, annotator: VisualAnnotator, frame, marks: List[Dict]):
+        self.annotator = annotator
+        self.frame = frame
+        self.marks = marks
+    
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.frame.shape
+    
+    @property
+    def name(self) -> str:
+        return f"annotated_{self.frame.name}"
+    
+    def render(self, region: Tuple[int, int, int, int] = None, name: str = None):
+        """
+        Dessine les marques sur la Frame entière ou sur la zone (x1, y1, x2, y2)
+        
+        Returns:
+            Frame annotée (croppée dans le repère de la capture si region)
+        """
+        image = self.annotator.draw_marks(self.frame.image, [], region=region, marks=self.marks)
+        if region is None:
+            return self.frame.derive(image, name or self.name)
+        x1, y1, x2, y2 = region
+        return self.frame.crop(x1, y1, x2, y2).derive(image, name or f"cropped_{self.name}")
+
+
 # Instance globale
 annotator = VisualAnnotator()
\ No newline at end of file
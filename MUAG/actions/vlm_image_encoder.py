@@ -0,0 +1,163 @@
+"""
+VLM Image Encoder - Images compactes pour les appels VLM
+Redimensionne selon le profil du modèle (VLM_IMAGE_PROFILES), encode en JPEG/WebP,
+accepte un fichier ou une Frame en mémoire, met en cache les octets encodés par frame et mesure les octets / tokens image économisés
+"""
+import base64
+import math
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Tuple, Union
+
+import cv2
+
+from .frame import Frame
+from config import (
+    VLM_IMAGE_PROFILES,
+    VLM_IMAGE_DEFAULT_PROFILE,
+    VLM_IMAGE_CACHE_SIZE,
+)
+
+ENCODE_PARAMS = {
+    "jpeg": (".jpg", cv2.IMWRITE_JPEG_QUALITY),
+    "webp": (".webp", cv2.IMWRITE_WEBP_QUALITY),
+    "png": (".png", None),
+}
+
+
+class VLMImageEncoder:
+    """
+    Encodage des captures pour les VLM
+
+    encode() retourne l'image base64 et la correspondance de coordonnées:
+    un point (x, y) dans l'image encodée correspond à
+    (x * scale_x, y * scale_y) dans l'image d'origine.
+    """
+
+    def __init__(self):
+        self.cache: "OrderedDict[Tuple, Tuple[str, Dict]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {
+            "frames": 0,
+            "cache_hits": 0,
+            "bytes_original": 0,   # Fichiers encodés (PNG d'origine): base des octets économisés
+            "bytes_sent": 0,
+            "bytes_sent_files": 0,
+            "bytes_raw": 0,        # Frames en mémoire: taille BGR brute, pas un PNG (non comparable)
+            "tokens_original": 0,
+            "tokens_sent": 0,
+        }
+
+    def get_profile(self, model: str) -> Dict:
+        profile = dict(VLM_IMAGE_DEFAULT_PROFILE)
+        profile.update(VLM_IMAGE_PROFILES.get(model, {}))
+        return profile
+
+    def encode(self, image: Union[Path, Frame], model: str) -> Tuple[str, Dict]:
+        """
+        Encode une image (fichier ou Frame en mémoire) pour un modèle donné
+        Returns:
+            (image_base64, info) avec info = {width, height, scale_x, scale_y,
+            bytes, tokens, format}
+        """
+        profile = self.get_profile(model)
+        profile_key = tuple(sorted(profile.items()))
+
+        if isinstance(image, Frame):
+            key = (image.key, profile_key)
+            name = image.name
+            source_bytes = image.image.nbytes  # Taille brute BGR (pas de PNG intermédiaire)
+        else:
+            image_path = Path(image)
+            stat = image_path.stat()
+            key = (str(image_path), stat.st_mtime_ns, stat.st_size, profile_key)
+            name = image_path.name
+            source_bytes = stat.st_size
+
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                return self.cache[key]
+
+        in_memory = isinstance(image, Frame)
+        if in_memory:
+            image = image.image
+        else:
+            image = cv2.imread(str(image_path))
+            if image is None:
+                # Illisible par OpenCV: envoyer le fichier tel quel
+                with open(image_path, "rb") as f:
+                    data = f.read()
+                return base64.b64encode(data).decode(), {"scale_x": 1.0, "scale_y": 1.0, "bytes": len(data)}
+
+        h, w = image.shape[:2]
+        scale = min(1.0, profile["max_side"] / max(h, w))
+        if scale < 1.0:
+            new_w, new_h = max(1, round(w * scale)), max(1, round(h * scale))
+            image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_AREA)
+        else:
+            new_w, new_h = w, h
+
+        ext, quality_flag = ENCODE_PARAMS.get(profile["format"], ENCODE_PARAMS["jpeg"])
+        params = [quality_flag, int(profile["quality"])] if quality_flag is not None else []
+        ok, buffer = cv2.imencode(ext, image, params)
+        if not ok:
+            raise ValueError(f"Encodage {profile['format']} impossible: {name}")
+        data = buffer.tobytes()
+
+        patch = profile["patch_px"]
+        info = {
+            "width": new_w,
+            "height": new_h,
+            "scale_x": w / new_w,
+            "scale_y": h / new_h,
+            "bytes": len(data),
+            "tokens": self.estimate_tokens(new_w, new_h, patch),
+            "format": profile["format"],
+        }
+        result = (base64.b64encode(data).decode(), info)
+
+        with self.lock:
+            self.stats["frames"] += 1
+            self.stats["bytes_sent"] += len(data)
+            if in_memory:
+                self.stats["bytes_raw"] += source_bytes
+            else:
+                self.stats["bytes_original"] += source_bytes
+                self.stats["bytes_sent_files"] += len(data)
+            self.stats["tokens_original"] += self.estimate_tokens(w, h, patch)
+            self.stats["tokens_sent"] += info["tokens"]
+            self.cache[key] = result
+            while len(self.cache) > VLM_IMAGE_CACHE_SIZE:
+                self.cache.popitem(last=False)
+
+        print(
+            f"[VLMEncoder] {name}: {w}x{h} → {new_w}x{new_h} {profile['format']} "
+            f"({source_bytes // 1024}KB{' brut' if in_memory else ''} → {len(data) // 1024}KB, "
+            f"~{info['tokens']} tokens image)"
+        )
+        return result
+
+    @staticmethod
+    def estimate_tokens(width: int, height: int, patch_px: int) -> int:
+        """Tokens image estimés (un token par bloc patch_px x patch_px, style Qwen-VL)"""
+        return math.ceil(width / patch_px) * math.ceil(height / patch_px)
+
+    @staticmethod
+    def to_original(x: float, y: float, info: Dict) -> Tuple[int, int]:
+        """Convertit un point de l'image encodée vers l'image d'origine"""
+        return int(round(x * info["scale_x"])), int(round(y * info["scale_y"]))
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            stats = dict(self.stats)
+        # Seulement face aux fichiers encodés: la taille brute d'une Frame n'est pas ce qui était envoyé
+        stats["bytes_saved"] = stats["bytes_original"] - stats["bytes_sent_files"]
+        stats["tokens_saved"] = stats["tokens_original"] - stats["tokens_sent"]
+        return stats
+
+
+# Instance globale
+vlm_image_encoder = VLMImageEncoder()
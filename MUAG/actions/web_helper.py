@@ -5,9 +5,16 @@ Capacités: Shadow DOM, iframes, matching intelligent, popup handling, fallback
 import time
 import logging
 import threading
-from typing import Optional, Dict, List, Tuple
+from typing import Callable, Optional, Dict, List, Tuple
 from playwright.sync_api import sync_playwright, Page, ElementHandle, TimeoutError as PlaywrightTimeout
 
+from config import (
+    PAGE_SETTLE_TIMEOUT_S,
+    PAGE_SETTLE_NETWORK_IDLE,
+    PAGE_SETTLE_IDLE_CAP_S,
+    PAGE_SETTLE_NAV_WAIT_S,
+)
+
 logging.basicConfig(level=logging.INFO)
 
 class WebHelper:
@@ -90,6 +97,62 @@ class WebHelper:
     
     # ========== EXTRACTION TEXTE ENRICHIE ==========
     
+    def wait_for_page_settled(self, timeout_s: float = None, network_idle: bool = None) -> bool:
+        """
+        Attend que la page ait fini de charger (DOMContentLoaded, puis réseau au repos
+        si network_idle, PAGE_SETTLE_NETWORK_IDLE par défaut)
+        Retourne dès que les événements arrivent, au plus timeout_s secondes; l'attente
+        networkidle est plafonnée à PAGE_SETTLE_IDLE_CAP_S (pages en streaming).
+        
+        Returns:
+            True si la page est stabilisée avant le timeout
+        """
+        if not self.connected or not self.page:
+            return False
+        
+        timeout_ms = int((PAGE_SETTLE_TIMEOUT_S if timeout_s is None else timeout_s) * 1000)
+        network_idle = PAGE_SETTLE_NETWORK_IDLE if network_idle is None else network_idle
+        start = time.time()
+        try:
+            self.page.wait_for_load_state("domcontentloaded", timeout=timeout_ms)
+            if network_idle:
+                remaining = max(1, timeout_ms - int((time.time() - start) * 1000))
+                remaining = min(remaining, int(PAGE_SETTLE_IDLE_CAP_S * 1000))
+                self.page.wait_for_load_state("networkidle", timeout=remaining)
+            return True
+        except PlaywrightTimeout:
+            logging.info(f"[WebHelper] Page pas encore stabilisée après {time.time() - start:.1f}s")
+            return False
+        except Exception as e:
+            logging.warning(f"[WebHelper] Erreur attente chargement: {e}")
+            return False
+    
+    def act_and_settle(self, action: Callable[[], object], timeout_s: float = None, nav_wait_s: float = None) -> bool:
+        """
+        Exécute une action qui peut déclencher une navigation (Enter, clic) puis attend
+        la nouvelle page. Juste après l'action, l'ancienne page est encore chargée:
+        wait_for_page_settled retournerait immédiatement. On attend donc d'abord que
+        l'URL change (navigation ou pushState, au plus nav_wait_s), puis son chargement.
+        Sans navigation (menu, popup), nav_wait_s sert de plancher pour le rendu.
+        
+        Returns:
+            True si la page est stabilisée (ou sans navigation) avant le timeout
+        """
+        if not self.connected or not self.page:
+            action()
+            return False
+        
+        before = self.page.url
+        action()
+        nav_wait_ms = int((PAGE_SETTLE_NAV_WAIT_S if nav_wait_s is None else nav_wait_s) * 1000)
+        try:
+            self.page.wait_for_url(lambda url: url != before, wait_until="commit", timeout=nav_wait_ms)
+        except PlaywrightTimeout:
+            return True
+        except Exception as e:
+            logging.warning(f"[WebHelper] Erreur attente navigation: {e}")
+        return self.wait_for_page_settled(timeout_s=timeout_s)
+    
     def get_full_text(self, element: ElementHandle) -> str:
         """
         Extrait TOUT le texte, même fragmenté dans les enfants.
@@ -143,7 +206,7 @@ class WebHelper:
             return []
         
         results = []
-        time.sleep(0.3)  # Stabilisation DOM
+        self.wait_for_page_settled(timeout_s=1.0, network_idle=False)  # Stabilisation DOM
         
         # 1. CLICKABLES (boutons, liens, etc.)
         clickables = self.page.query_selector_all(
@@ -383,8 +446,7 @@ class WebHelper:
         
         try:
             element.scroll_into_view_if_needed()
-            element.click(timeout=3000)
-            time.sleep(0.5)
+            self.act_and_settle(lambda: element.click(timeout=3000), timeout_s=2.0)
             logging.info(f"[WebHelper] ✓ Cliqué: {description}")
             return True
         except PlaywrightTimeout:
@@ -450,7 +512,7 @@ class WebHelper:
                             btn.click(timeout=1000)
                             closed = True
                             logging.info(f"[WebHelper] Popup fermé: '{text[:30]}'")
-                            time.sleep(0.3)
+                            self.wait_for_page_settled(timeout_s=1.0, network_idle=False)
                             break  # Un seul popup à la fois
                 except:
                     continue
@@ -20,7 +20,7 @@ class Coordinateur:
         self.memory = MemoryManager()
         self.interface_utilisateur = InterfaceUtilisateur()
         self.intention_analyzer = IntentionAnalyzer()
-        self.ollama_client = OllamaClient()
+        self.ollama_client = OllamaClient(component="conversation", priority="interactive")
     
     def traiter_requete(self, requete_utilisateur):
         """
@@ -4,7 +4,7 @@ from utils.ollama_client import OllamaClient
 
 class Decomposeur:
     def __init__(self):
-        self.client = OllamaClient()
+        self.client = OllamaClient(component="decomposeur")
     
     def analyser_dependances(self, plan):
         # Détection automatique de la complexité
@@ -2,7 +2,7 @@ from utils.ollama_client import OllamaClient
 
 class AgentDiagnostic:
     def __init__(self):
-        self.client = OllamaClient()
+        self.client = OllamaClient(component="diagnostic")
     
     def analyser_erreur_systeme(self, tache, erreur):
         prompt = f"""
@@ -1,8 +1,11 @@
 import subprocess
 import json
+import threading
 from .diagnostic import AgentDiagnostic
 from .verificateur import Verificateur
-from utils.ollama_client import OllamaClient
+from utils.ollama_client import OllamaClient, run_concurrently, to_async
+from utils.inference_telemetry import inference_telemetry
+from utils.llm_dispatcher import llm_dispatcher
 from utils.interaction_utilisateur import InterfaceUtilisateur
 from .memory_manager import MemoryManager
 from .user_profile import UserProfile
@@ -22,7 +25,7 @@ except ImportError as e:
 
 class Executeur:
     def __init__(self):
-        self.client = OllamaClient()
+        self.client = OllamaClient(component="executeur", priority="interactive")
         self.diagnostic = AgentDiagnostic()
         self.verificateur = Verificateur()
         self.interface = InterfaceUtilisateur()
@@ -30,10 +33,13 @@ class Executeur:
         self.memory = MemoryManager()
 
         # Profil utilisateur intelligent  
-        self.user_profile = UserProfile(self.client)
+        self.user_profile = UserProfile(OllamaClient(component="profile", priority="interactive"))
 
         # Lier profil à mémoire
         self.memory.user_profile = self.user_profile
+        # Interactions en attente d'analyse profil (fusionnées en tâche de fond)
+        self._profil_en_attente = []
+        self._profil_lock = threading.Lock()
         
         # Initialize action modules
         self.gui = GUIController() if GUIController else None
@@ -260,9 +266,11 @@ Pour SYSTEM_CONTROL, identifie l'action précise parmi:
     def _generer_reponse_conversationnelle(self, description: str):
         """Génère une réponse conversationnelle avec contexte"""
         
-        # Récupérer contexte et profil
-        context = self.memory.get_contexte_recent(description)
-        profile_info = self.user_profile.get_contextual_information(description)
+        # Récupérer contexte et profil (deux prompts indépendants, en parallèle)
+        context, profile_info = run_concurrently(
+            to_async(self.memory.get_contexte_recent, description),
+            to_async(self.user_profile.get_contextual_information, description),
+        )
         
         reponse_prompt = f"""Question: {description}
 
@@ -277,22 +285,37 @@ Pour SYSTEM_CONTROL, identifie l'action précise parmi:
         try:
             reponse = self.client.generate(reponse_prompt, max_tokens=300)
             
-            # Sauvegarder interaction
+            # Sauvegarder interaction (moment marquant + profil en tâche de fond)
             self.memory.sauvegarder_interaction(description, reponse)
-            self.user_profile.update_from_interaction(description, reponse)
+            self._planifier_maj_profil(description, reponse)
             
             return reponse
         except Exception as e:
             print(f"[Executeur] Erreur réponse: {e}")
             return self.client.generate(f"Question: {description}\nRéponds de manière concise.")
 
+    def _planifier_maj_profil(self, requete, reponse):
+        """Mise à jour du profil en tâche de fond (les interactions en attente sont fusionnées)"""
+        with self._profil_lock:
+            self._profil_en_attente.append((requete, reponse))
+        llm_dispatcher.submit_background(self._maj_profil_en_attente, key="profile_update")
+
+    def _maj_profil_en_attente(self):
+        with self._profil_lock:
+            en_attente, self._profil_en_attente = self._profil_en_attente, []
+        if not en_attente:
+            return
+        requete = "\n".join(r for r, _ in en_attente)
+        reponse = "\n".join(str(a) for _, a in en_attente)
+        self.user_profile.update_from_interaction(requete, reponse)
+
     def execute_with_orchestrator(self, description: str) -> str:
         """Délègue à l'orchestrateur pour tâches complexes multi-skills"""
         
         # Lazy load orchestrateur
         if not hasattr(self, 'orchestrator'):
             from .task_orchestrator import TaskOrchestrator
-            self.orchestrator = TaskOrchestrator(self.client)
+            self.orchestrator = TaskOrchestrator(OllamaClient(component="orchestrator"))
             print("[Executeur] Orchestrateur chargé")
         
         # Exécuter la tâche
@@ -319,9 +342,9 @@ Pour SYSTEM_CONTROL, identifie l'action précise parmi:
             try:
                 response = self.client.generate(prompt, max_tokens=150, temperature=0.5)
 
-                # Sauvegarder interaction
+                # Sauvegarder interaction (moment marquant + profil en tâche de fond)
                 self.memory.sauvegarder_interaction(description, response)
-                self.user_profile.update_from_interaction(description, response)
+                self._planifier_maj_profil(description, response)
 
                 return response.strip()
             except Exception as e:
@@ -334,12 +357,23 @@ Pour SYSTEM_CONTROL, identifie l'action précise parmi:
     def shutdown(self):
         """Appelé à la fermeture - consolide la session"""
         
+        # Terminer les mises à jour mémoire/profil en attente
+        if not llm_dispatcher.flush(timeout=60):
+            print("[Session] Tâches de fond non terminées, consolidation quand même")
+        print(llm_dispatcher.format_status())
+        
         print("\n[Session] Consolidation en cours...")
         summary = self.memory.consolidate_session()
         
         if summary:
             print(f"[Session] Résumé: {summary}")
         
+        # Rapport latence / tokens par composant
+        print(inference_telemetry.format_report())
+        report_path = inference_telemetry.save_report()
+        if report_path:
+            print(f"[Session] Rapport d'inférence: {report_path}")
+        
         print("[Session] Session sauvegardée.")
     
     def analyse_necessite_utilisateur(self, diagnostic):
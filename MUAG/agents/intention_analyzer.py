@@ -17,7 +17,7 @@ class IntentionType(Enum):
 
 class IntentionAnalyzer:
     def __init__(self):
-        self.client = OllamaClient()
+        self.client = OllamaClient(component="intent", priority="interactive")
     
     def analyser(self, requete_utilisateur, contexte=""):
         """
@@ -71,19 +71,10 @@ Exemples:
 """
         
         try:
-            response = self.client.generate(prompt)
-            
-            # Extraire le JSON de la réponse
-            import json
-            import re
-            
-            # Chercher le JSON dans la réponse
-            json_match = re.search(r'\{[^}]+\}', response)
-            if json_match:
-                result = json.loads(json_match.group())
-            else:
-                # Parser directement si c'est du JSON pur
-                result = json.loads(response)
+            # Streaming: coupure dès que l'objet JSON est complet
+            result = self.client.generate_json(prompt)
+            if result is None:
+                raise ValueError(self.client.last_error)
             
             # Valider et structurer le résultat
             intention_type = result.get('type', 'conversation')
@@ -155,14 +146,7 @@ Format JSON uniquement.
 """
         
         try:
-            response = self.client.generate(prompt)
-            import json
-            import re
-            
-            json_match = re.search(r'\{[^}]+\}', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            return {}
+            return self.client.generate_json(prompt) or {}
             
         except Exception as e:
             print(f"⚠️ Erreur extraction paramètres: {e}")
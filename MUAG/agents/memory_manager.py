@@ -3,6 +3,7 @@ Memory Manager - Gestion avancée de la mémoire avec moments marquants
 """
 import json
 import os
+import threading
 from datetime import datetime
 from pathlib import Path
 from config import (
@@ -14,11 +15,13 @@ from config import (
     IMPORTANT_MOMENT_KEYWORDS
 )
 from utils.ollama_client import OllamaClient
+from utils.llm_dispatcher import llm_dispatcher
 
 
 class MemoryManager:
     def __init__(self):
-        self.client = OllamaClient()
+        self.client = OllamaClient(component="memory", priority="interactive")
+        self.lock = threading.RLock()  # Moments marquants détectés en tâche de fond
         self.memory_file = Path(MEMORY_FILE)
         self.preferences_file = Path(PREFERENCES_FILE)
         self.memoire = self.charger_memoire()
@@ -63,7 +66,7 @@ class MemoryManager:
     
     def sauvegarder_memoire(self):
         """Sauvegarde la mémoire"""
-        with open(self.memory_file, 'w', encoding='utf-8') as f:
+        with self.lock, open(self.memory_file, 'w', encoding='utf-8') as f:
             json.dump(self.memoire, f, ensure_ascii=False, indent=2)
     
     def sauvegarder_preferences(self):
@@ -78,19 +81,26 @@ class MemoryManager:
             "resultats": resultats,
             "timestamp": datetime.now().isoformat()
         }
-        self.memoire["interactions"].append(interaction)
-        
-        if DETECT_IMPORTANT_MOMENTS:
-            moment_data = self.detect_important_moment_llm(requete, resultats)
-            if moment_data.get("important", False):
-                self.ajouter_moment_marquant(requete, resultats, moment_data)
-        
+        with self.lock:
+            self.memoire["interactions"].append(interaction)
 
-        # Limiter la taille de la mémoire
-        if len(self.memoire["interactions"]) > MAX_MEMORY_INTERACTIONS:
-            self.memoire["interactions"] = self.memoire["interactions"][-MAX_MEMORY_INTERACTIONS:]
+            # Limiter la taille de la mémoire
+            if len(self.memoire["interactions"]) > MAX_MEMORY_INTERACTIONS:
+                self.memoire["interactions"] = self.memoire["interactions"][-MAX_MEMORY_INTERACTIONS:]
         
         self.sauvegarder_memoire()
+        
+        # Détection LLM en tâche de fond (ne retarde pas la réponse)
+        if DETECT_IMPORTANT_MOMENTS:
+            llm_dispatcher.submit_background(self._detecter_moment, requete, resultats)
+    
+    def _detecter_moment(self, requete, resultats):
+        """Tâche de fond: détecte et enregistre un moment marquant"""
+        moment_data = self.detect_important_moment_llm(requete, resultats)
+        if moment_data.get("important", False):
+            with self.lock:
+                self.ajouter_moment_marquant(requete, resultats, moment_data)
+            self.sauvegarder_memoire()
 
         
     def detect_important_moment_llm(self, requete: str, resultats: dict) -> dict:
@@ -120,11 +130,9 @@ Retourne UNIQUEMENT JSON:
 """
         
         try:
-            response = self.client.generate(prompt, max_tokens=200, temperature=0.3)
-            import re
-            match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', response, re.DOTALL)
-            if match:
-                return json.loads(match.group())
+            result = self.client.generate_json(prompt, max_tokens=200, temperature=0.3)
+            if result is not None:
+                return result
         except Exception as e:
             pass
         
@@ -167,11 +175,8 @@ Génère résumé structuré JSON:
 """
         
         try:
-            response = self.client.generate(prompt, max_tokens=600, temperature=0.3)
-            import re
-            match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', response, re.DOTALL)
-            if match:
-                consolidation = json.loads(match.group())
+            consolidation = self.client.generate_json(prompt, max_tokens=600, temperature=0.3)
+            if consolidation is not None:
                 
                 # Sauvegarder
                 if "consolidations" not in self.memoire:
@@ -210,7 +215,7 @@ Génère résumé structuré JSON:
         # Profil (si disponible)
         profile_info = ""
         if hasattr(self, 'user_profile'):
-            profile_info = json.dumps(self.user_profile.profile, ensure_ascii=False)[:500]
+            profile_info = json.dumps(self.user_profile.snapshot(), ensure_ascii=False)[:500]
         
         prompt = f"""Génère CONTEXTE PERTINENT pour cette requête.
 
@@ -2,7 +2,7 @@ from utils.ollama_client import OllamaClient
 
 class Planificateur:
     def __init__(self):
-        self.client = OllamaClient()
+        self.client = OllamaClient(component="planificateur")
     
     def generer_plan(self, requete, contexte_historique):
         prompt = f"""
@@ -6,7 +6,7 @@ from utils.ollama_client import OllamaClient
 
 class SkillManager:
     def __init__(self):
-        self.client = OllamaClient()
+        self.client = OllamaClient(component="skills")
         self.skills_file = SKILLS_FILE
         self.skills = self.charger_skills()
         print(f"📚 {len(self.skills)} skills chargés")
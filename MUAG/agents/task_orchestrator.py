@@ -610,27 +610,9 @@ Exemples:
 """
             
             # Générer décision
-            response = self.llm.generate(prompt, max_tokens=300, temperature=0.1)
-            
-            # Parser JSON
-            import json
-            import re
-            
-            # Nettoyer réponse
-            response = response.strip()
-            if response.startswith("```json"):
-                response = response[7:]
-            if response.startswith("```"):
-                response = response[3:]
-            if response.endswith("```"):
-                response = response[:-3]
-            response = response.strip()
-            
-            # Extraire JSON
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                decision = json.loads(json_match.group())
-            else:
+            # Streaming: coupure dès que l'objet JSON est complet
+            decision = self.llm.generate_json(prompt, max_tokens=300, temperature=0.1)
+            if decision is None:
                 return {"success": False, "error": "LLM response invalid"}
             
             print(f"[WebHelper] LLM décision: {decision.get('action')} - {decision.get('reason')}")
@@ -865,27 +847,11 @@ Exemples:
     """
             
             # Générer décision
-            response = self.llm.generate(prompt, max_tokens=200, temperature=0.1)
-            # just after: response = self.llm.generate(...)
+            decision = self.llm.generate_json(prompt, max_tokens=200, temperature=0.1)
+            response = self.llm.last_response
             print(f"[FORCED-TRACE] raw LLM response (len={len(response)}): {response!r}")
 
-            # Parser JSON
-            import json
-            import re
-            
-            response = response.strip()
-            if response.startswith("```json"):
-                response = response[7:]
-            if response.startswith("```"):
-                response = response[3:]
-            if response.endswith("```"):
-                response = response[:-3]
-            response = response.strip()
-            
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                decision = json.loads(json_match.group())
-            else:
+            if decision is None:
                 return {"success": False, "error": "LLM response invalid"}
             
             print(f"[FileManager] LLM décision: {decision.get('action')} - {decision.get('reason')}")
@@ -1,8 +1,10 @@
 """
 User Profile - Profil utilisateur intelligent construit par LLM
 """
+import copy
 import json
 import re
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any
@@ -44,7 +46,13 @@ class UserProfile:
         """
         self.llm = llm_client
         self.profile_file = Path("data/user_profile.json")
+        self.lock = threading.RLock()
         self.profile = self.load_profile()
+
+    def snapshot(self) -> Dict:
+        """Copie du profil cohérente (pendant une mise à jour concurrente)"""
+        with self.lock:
+            return copy.deepcopy(self.profile)
     
     def load_profile(self) -> Dict:
         """Charge le profil depuis le fichier"""
@@ -88,11 +96,13 @@ class UserProfile:
     def save_profile(self):
         """Sauvegarde le profil"""
         try:
-            self.profile["last_updated"] = datetime.now().isoformat()
+            with self.lock:
+                self.profile["last_updated"] = datetime.now().isoformat()
+                data = json.dumps(self.profile, ensure_ascii=False, indent=2)
             self.profile_file.parent.mkdir(parents=True, exist_ok=True)
             
             with open(self.profile_file, 'w', encoding='utf-8') as f:
-                json.dump(self.profile, f, ensure_ascii=False, indent=2)
+                f.write(data)
         except Exception as e:
             print(f"[Profile] Erreur sauvegarde: {e}")
     
@@ -113,7 +123,7 @@ User: {requete}
 Agent: {reponse[:500]}
 
 PROFIL ACTUEL:
-{json.dumps(self.profile, ensure_ascii=False, indent=2)[:1500]}
+{json.dumps(self.snapshot(), ensure_ascii=False, indent=2)[:1500]}
 
 Extrais et mets à jour:
 1. Préférences (ton préféré, style interaction, favoris)
@@ -159,7 +169,7 @@ Si aucune mise à jour nécessaire, retourne {{}}.
         prompt = f"""Requête utilisateur: {current_request}
 
 PROFIL USER:
-{json.dumps(self.profile, ensure_ascii=False, indent=2)[:1000]}
+{json.dumps(self.snapshot(), ensure_ascii=False, indent=2)[:1000]}
 
 Quelle information du profil est PERTINENTE pour cette requête?
 
@@ -192,22 +202,25 @@ Si rien pertinent, retourne {{"relevant": false}}.
     
     def get_tone_preference(self) -> str:
         """Obtient le ton préféré de l'utilisateur"""
-        return self.profile["preferences"].get("tone", "friendly")
+        with self.lock:
+            return self.profile["preferences"].get("tone", "friendly")
     
     def get_interaction_style(self) -> str:
         """Obtient le style d'interaction préféré"""
-        return self.profile["preferences"].get("interaction_style", "balanced")
+        with self.lock:
+            return self.profile["preferences"].get("interaction_style", "balanced")
     
     def add_recent_activity(self, activity: str):
         """Ajoute une activité récente"""
-        activities = self.profile["context"]["recent_activities"]
-        activities.append({
-            "activity": activity,
-            "timestamp": datetime.now().isoformat()
-        })
-        
-        # Garder seulement les 20 dernières
-        self.profile["context"]["recent_activities"] = activities[-20:]
+        with self.lock:
+            activities = self.profile["context"]["recent_activities"]
+            activities.append({
+                "activity": activity,
+                "timestamp": datetime.now().isoformat()
+            })
+            
+            # Garder seulement les 20 dernières
+            self.profile["context"]["recent_activities"] = activities[-20:]
         self.save_profile()
     
     def _extract_json(self, text: str) -> str:
@@ -232,16 +245,17 @@ Si rien pertinent, retourne {{"relevant": false}}.
     def _merge_updates(self, updates: Dict):
         """Fusionne les mises à jour dans le profil"""
         
-        for key, value in updates.items():
-            if key in self.profile:
-                if isinstance(value, dict) and isinstance(self.profile[key], dict):
-                    # Fusion dict
-                    self.profile[key].update(value)
-                elif isinstance(value, list) and isinstance(self.profile[key], list):
-                    # Ajout liste (éviter doublons)
-                    for item in value:
-                        if item not in self.profile[key]:
-                            self.profile[key].append(item)
-                else:
-                    # Remplacement direct
-                    self.profile[key] = value
+        with self.lock:
+            for key, value in updates.items():
+                if key in self.profile:
+                    if isinstance(value, dict) and isinstance(self.profile[key], dict):
+                        # Fusion dict
+                        self.profile[key].update(value)
+                    elif isinstance(value, list) and isinstance(self.profile[key], list):
+                        # Ajout liste (éviter doublons)
+                        for item in value:
+                            if item not in self.profile[key]:
+                                self.profile[key].append(item)
+                    else:
+                        # Remplacement direct
+                        self.profile[key] = value
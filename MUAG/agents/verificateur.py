@@ -2,7 +2,7 @@ from utils.ollama_client import OllamaClient
 
 class Verificateur:
     def __init__(self):
-        self.client = OllamaClient()
+        self.client = OllamaClient(component="verificateur")
     
     def verifier(self, tache, resultat):
         # 🔥 DÉTECTION AUTOMATIQUE DES SUCCÈS
@@ -0,0 +1,48 @@
+"""
+Benchmark des backends de capture d'écran (actions/screen_capture.py)
+
+Usage:
+    python benchmark_capture.py                      # tous les backends disponibles
+    python benchmark_capture.py --backend mss --frames 300
+    python benchmark_capture.py --region 0,0,800,600
+
+Sous Linux sans écran (CI / serveur):
+    Xvfb :99 -screen 0 1920x1080x24 &
+    DISPLAY=:99 python benchmark_capture.py
+"""
+import argparse
+
+from actions.screen_capture import available_backends, benchmark
+
+
+def parse_region(value):
+    if not value:
+        return None
+    x, y, w, h = (int(v) for v in value.split(","))
+    return (x, y, w, h)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark capture d'écran")
+    parser.add_argument("--backend", help="dxcam, mss ou pyautogui (défaut: tous les disponibles)")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--region", help="x,y,largeur,hauteur")
+    args = parser.parse_args()
+
+    backends = [args.backend] if args.backend else available_backends()
+    region = parse_region(args.region)
+    print(f"Backends: {', '.join(backends) or 'aucun'} | {args.frames} frames | région: {region or 'plein écran'}\n")
+
+    print(f"{'backend':<12}{'taille':>16}{'fps':>9}{'moy (ms)':>11}{'p95 (ms)':>11}")
+    for name in backends:
+        try:
+            r = benchmark(name, frames=args.frames, region=region)
+        except Exception as e:
+            print(f"{name:<12} erreur: {e}")
+            continue
+        size = f"{r['shape'][1]}x{r['shape'][0]}"
+        print(f"{r['backend']:<12}{size:>16}{r['fps']:>9.1f}{r['avg_ms']:>11.1f}{r['p95_ms']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,25 @@ from pathlib import Path
 
 # OLLAMA LLM
 OLLAMA_MODEL = "qwen2.5:7b-instruct-q4_K_M"
-OLLAMA_URL = "http://localhost:11434/api/generate"
+# Surchargeable pour pointer vers un autre serveur (ex: mock_ollama_server.py)
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434/api/generate")
 TIMEOUT_OLLAMA = 90
 
+# Résidence des modèles Ollama en VRAM
+# "pin"      : modèle gardé chargé indéfiniment (keep_alive=-1)
+# "ttl"      : modèle gardé chargé OLLAMA_KEEP_ALIVE après le dernier appel
+# "pressure" : modèle gardé chargé, éviction LRU si GPU_VRAM_BUDGET_MB est dépassé
+# "evict"    : ancien comportement, déchargé après chaque appel (keep_alive=0)
+OLLAMA_RESIDENCY_POLICY = "ttl"
+OLLAMA_RESIDENCY_OVERRIDES = {}  # Par modèle, ex: {"qwen2.5vl": "pin"}
+OLLAMA_KEEP_ALIVE = "10m"
+OLLAMA_POOL_SIZE = 4  # Connexions HTTP keep-alive partagées par tous les clients
+# Prompts VLM du CUA: préfixe stable de la tâche en tête (False = étape en tête, pour comparer
+# prompt_eval_count / durée par étape dans les logs [CUA] avec et sans découpage)
+CUA_PROMPT_PREFIX_FIRST = True
+LLM_MAX_CONCURRENT = 2  # Requêtes simultanées vers Ollama (aligné sur OLLAMA_NUM_PARALLEL)
+BACKGROUND_IDLE_DELAY_S = 2.0  # Calme requis avant de lancer une requête de fond (mémoire, profil)
+
 # DIRECTORIES
 BASE_DIR = Path(__file__).parent.absolute()
 DATA_DIR = BASE_DIR / "data"
@@ -19,6 +35,33 @@ MEMORY_FILE = DATA_DIR / "memory.json"
 PREFERENCES_FILE = DATA_DIR / "preferences.json"
 CREDENTIALS_FILE = DATA_DIR / "credentials.json"
 
+# Cache des réponses déterministes (temperature 0) d'Ollama
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_FILE = DATA_DIR / "response_cache.sqlite"
+RESPONSE_CACHE_MAX_ENTRIES = 2000
+RESPONSE_CACHE_TTL_S = 7 * 24 * 3600  # 0 = pas d'expiration
+
+# Télémétrie d'inférence (durées/tokens Ollama par composant)
+TELEMETRY_DIR = DATA_DIR / "telemetry"
+TELEMETRY_MAX_RECORDS = 5000
+
+# Cache des captions d'icônes (hash perceptuel des crops OmniParser)
+CAPTION_CACHE_ENABLED = True
+CAPTION_CACHE_FILE = DATA_DIR / "caption_cache.json"
+CAPTION_CACHE_MAX_ENTRIES = 5000
+CAPTION_CACHE_MAX_DISTANCE = 4  # Distance de Hamming max (sur 64 bits) pour un candidat
+CAPTION_CACHE_TEXT_ASPECT = 2.0  # Crop au moins 2x plus large que haut → bouton texte
+CAPTION_CACHE_TEXT_MAX_DISTANCE = 1  # Distance max pour les boutons texte
+CAPTION_CACHE_MAX_PIXEL_DIFF = 0.005  # Fraction max de pixels différents (référence 64x64) pour un hit
+
+# Cache des résultats vision CUA par écran (fenêtre/URL + hash perceptuel)
+SCREEN_CACHE_ENABLED = True
+SCREEN_CACHE_FILE = DATA_DIR / "screen_state_cache.json"
+SCREEN_CACHE_MAX_ENTRIES = 200
+SCREEN_CACHE_MAX_DISTANCE = 2  # Distance de Hamming max (sur 64 bits) avant validation
+# Validation d'un hit: aucune zone modifiée (seuil INCREMENTAL_PARSE_MIN_AREA) vs l'image de référence
+SCREEN_CACHE_TTL_S = 7 * 24 * 3600  # 0 = pas d'expiration
+
 # VOICE
 WHISPER_MODEL = "medium"
 WHISPER_DEVICE = "auto"
@@ -48,9 +91,13 @@ TIMEOUT_FILE_ACTION = 15
 TIMEOUT_EMAIL_ACTION = 20
 
 WEB_SCREENSHOTS_DIR = DATA_DIR / "screenshots"
+SAVE_DEBUG_FRAMES = True  # Dumps PNG des frames CUA (écrits en arrière-plan)
 
 PYAUTOGUI_PAUSE = 0.5
 PYAUTOGUI_FAILSAFE = True
+# Capture d'écran: "auto" (dxcam → mss → pyautogui), "dxcam", "mss" ou "pyautogui"
+SCREEN_CAPTURE_BACKEND = os.environ.get("SCREEN_CAPTURE_BACKEND", "auto")
+SCREEN_CAPTURE_GRAB_TIMEOUT_S = 0.1  # dxcam: attente max d'une nouvelle frame avant repli plein écran
 
 REQUIRE_CONFIRMATION_EMAIL = True
 REQUIRE_CONFIRMATION_PURCHASE = True
@@ -81,15 +128,53 @@ USER_INTERVENTION_KEYWORDS_PASSWORD = ["password", "mot de passe", "login", "sig
 TARS_MODEL_NAME = "qwen3-vl:4b"
 FALLBACK_VLM_MODEL = "qwen2.5vl"
 
+# Encodage des images envoyées aux VLM (redimensionnement + compression par modèle)
+# patch_px: taille du bloc de pixels par token image (28 pour Qwen2.5-VL, 32 pour Qwen3-VL)
+VLM_IMAGE_DEFAULT_PROFILE = {"max_side": 1280, "format": "jpeg", "quality": 85, "patch_px": 28}
+VLM_IMAGE_PROFILES = {
+    FALLBACK_VLM_MODEL: {"max_side": 1024, "quality": 80},  # Planification: vue d'ensemble
+    TARS_MODEL_NAME: {"max_side": 1280, "quality": 90, "patch_px": 32},  # Numéros verts lisibles
+}
+VLM_IMAGE_CACHE_SIZE = 16  # Frames encodées gardées en mémoire
+
+# =========================
+# RÉSIDENCE VRAM (tous les modèles)
+# =========================
+GPU_VRAM_BUDGET_MB = 7500
+DEFAULT_MODEL_FOOTPRINT_MB = 4000
+MODEL_VRAM_FOOTPRINTS_MB = {
+    OLLAMA_MODEL: 5200,
+    FALLBACK_VLM_MODEL: 6000,
+    TARS_MODEL_NAME: 3800,
+    "florence2": 1100,
+    "yolo_icon_detect": 150,
+    "paddleocr": 600,
+    "whisper": 1600,
+    "xtts": 2200,
+}
+# Modèles à précharger pour chaque étape du pipeline
+PIPELINE_STAGE_MODELS = {
+    "conversation": [OLLAMA_MODEL, "xtts"],
+    "cua_planning": [FALLBACK_VLM_MODEL],
+    "cua_vision": ["florence2", "paddleocr"],
+    # TARS seul: avec OLLAMA_MODEL (5200MB) le préchargement évinçait Florence-2 avant OmniParser
+    "cua_execution": [TARS_MODEL_NAME],
+}
+RESIDENCY_LOG_SIZE = 200
+
 # =========================
 # VISION PIPELINE
 # =========================
 
 # VISION - OmniParser v2.0 (Icon Detection + Semantic Caption)
-import torch
 OMNIPARSER_WEIGHTS_DIR = BASE_DIR / "OmniParser" / "weights"
-OMNIPARSER_DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+# OMNIPARSER_DEVICE: calculé au premier accès (voir __getattr__ en fin de fichier)
 OMNIPARSER_CONFIDENCE_THRESHOLD = 0.25  # Seuil de confiance minimum pour YOLOv8
+# Caption Florence-2 par lots (crops redimensionnés comme get_parsed_content_icon)
+OMNIPARSER_CAPTION_BATCH_SIZE = 32    # Crops par appel generate()
+OMNIPARSER_CAPTION_NUM_BEAMS = 1      # 1 = greedy (rapide), >1 = beam search
+OMNIPARSER_CAPTION_MAX_TOKENS = 20    # Tokens max par caption
+OMNIPARSER_CAPTION_CROP_SIZE = 64     # Côté des crops redimensionnés (0 = taille d'origine)
 
 # LEGACY - PaddleOCR (deprecated, keeping for reference)
 PADDLE_OCR_LANG = ["fr", "en"]
@@ -115,8 +200,54 @@ ENABLE_SCREEN_MONITORING = True
 MONITOR_DIFF_THRESHOLD = 0.05
 MONITOR_HISTORY_SIZE = 3
 
+# Attente "écran stable" après une action (remplace les sleeps fixes)
+STABLE_MAX_WAIT_S = 2.0        # Attente maximale (= ancien sleep fixe: vidéo, streaming ne se stabilisent jamais)
+STABLE_MIN_WAIT_S = 0.1        # Laisser l'action commencer à s'afficher
+STABLE_QUIET_S = 0.3           # Durée sans changement pour déclarer l'écran stable
+STABLE_POLL_S = 0.05           # Intervalle entre deux échantillons
+STABLE_SAMPLE_SCALE = 0.25     # Échantillons réduits (diff rapide)
+STABLE_DIFF_THRESHOLD = 0.002  # Fraction de pixels changés tolérée (curseur clignotant...)
+PAGE_SETTLE_TIMEOUT_S = 5.0    # Attente max de DOMContentLoaded Playwright
+PAGE_SETTLE_NETWORK_IDLE = False  # Attendre aussi networkidle (jamais atteint sur YouTube, médias en streaming)
+PAGE_SETTLE_IDLE_CAP_S = 1.0   # Plafond de l'attente networkidle quand elle est demandée
+PAGE_SETTLE_NAV_WAIT_S = 1.0   # Après Enter / clic: attente max du début de navigation (plancher si aucune)
+
+# Parsing incrémental: seules les zones modifiées depuis l'étape précédente
+# sont re-détectées (OmniParser + OCR), le reste est repris tel quel
+INCREMENTAL_PARSE_ENABLED = True
+INCREMENTAL_PARSE_PADDING = 24       # Marge autour des zones modifiées (px)
+INCREMENTAL_PARSE_MIN_AREA = 20      # Surface min d'un changement (px², filtre le bruit)
+INCREMENTAL_PARSE_MAX_DIRTY = 0.35   # Au-delà de cette fraction d'écran modifiée → parse complet
+INCREMENTAL_PARSE_MATCH_IOU = 0.5    # IoU min pour conserver l'identité d'un élément
+
+# Association OCR ↔ éléments (SemanticEnricher): grille des centres OCR
+OCR_INDEX_CELL_SIZE = 50  # Côté d'une cellule (px), ~ seuil de proximité de _find_nearby_ocr
+
+# Placement des étiquettes Set-of-Mark (VisualAnnotator): grille des bbox
+LABEL_LAYOUT_CELL_SIZE = 64  # Côté d'une cellule du hachage spatial (px)
+
+# Zone d'abord: la zone (choisie par VLM #1 ou par mots-clés) est connue avant la
+# vision, OmniParser + OCR ne tournent que dans cette zone (repli plein écran si vide)
+CUA_ZONE_FIRST = True
+CUA_ZONE_LLM_FALLBACK = False  # Appel LLM si ni VLM #1 ni les mots-clés ne tranchent
+# Zones en fractions de l'écran (x1, y1, x2, y2)
+CUA_ZONES = {
+    "browser_toolbar": (0.0, 0.0, 1.0, 0.15),
+    "content": (0.0, 0.10, 1.0, 0.90),
+    "footer": (0.0, 0.90, 1.0, 1.0),
+}
+CUA_DEFAULT_ZONE = "content"
+CUA_ZONE_KEYWORDS = {
+    "browser_toolbar": [
+        "onglet", "nouvel onglet", "barre d'adresse", "url", "extension",
+        "page précédente", "actualiser", "recharger", "favoris",
+    ],
+    "footer": ["pagination", "bas de page", "footer", "page suivante", "pied de page"],
+}
+
 # Vision Pipeline
 VISION_TIMEOUT = 10
+VISION_CANCEL_POLL_S = 0.05  # Vérification de l'annulation pendant l'attente des détecteurs
 FUSION_NMS_THRESHOLD = 0.3  # Legacy from detection fusion (not used with OmniParser)
 
 # =========================
@@ -147,6 +278,29 @@ ENABLE_VISUAL_VERIFICATION = True
 AGENT_NAME = "Assistant"
 AGENT_PERSONALITY = "helpful"
 
+# =========================
+# STARTUP
+# =========================
+STARTUP_MAX_WORKERS = 6        # Composants chargés en parallèle au démarrage
+STARTUP_WARMUP = True          # Inférence factice après chargement (kernels chauds)
+STARTUP_PRELOAD_LLM = True     # Précharge OLLAMA_MODEL dans Ollama (optionnel)
+# Charge OmniParser + PaddleOCR en arrière-plan (sessions vocales seulement; sinon au 1er usage du CUA).
+# Désactivé par défaut: ~3 Go de VRAM pris au LLM pour des sessions souvent sans CUA
+STARTUP_WARMUP_VISION = False
+
+# =========================
+# LAZY CONSTANTS
+# =========================
+# Valeurs coûteuses (import de torch) résolues au premier accès seulement:
+# importer config ne charge pas CUDA.
+def __getattr__(name):
+    if name == "OMNIPARSER_DEVICE":
+        import torch
+        value = "cuda" if torch.cuda.is_available() else "cpu"
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # CREATE DIRECTORIES
-for directory in [DATA_DIR, MODELS_DIR, WEB_SCREENSHOTS_DIR]:
+for directory in [DATA_DIR, MODELS_DIR, WEB_SCREENSHOTS_DIR, TELEMETRY_DIR]:
     directory.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
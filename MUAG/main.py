@@ -8,9 +8,9 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from voice import VoiceManager
 from agents.coordinateur import Coordinateur
-from config import AGENT_NAME
+from config import AGENT_NAME, OLLAMA_MODEL, STARTUP_PRELOAD_LLM, STARTUP_WARMUP_VISION
+from utils.startup import StartupOrchestrator
 import traceback
 
 
@@ -30,6 +30,47 @@ def banner():
     """)
 
 
+def preload_llm(client):
+    """
+    Précharge le LLM via le gestionnaire VRAM (budget, évictions et comptabilité à jour)
+    au lieu d'un chargement Ollama direct
+    """
+    from utils.model_residency import residency_manager
+    
+    thread = residency_manager.prefetch(client.model, reason="démarrage")
+    if thread is not None:
+        thread.join()
+    if not residency_manager.is_resident(client.model):
+        raise RuntimeError(f"préchargement de {client.model} échoué")
+
+
+def build_startup(voice_manager=None, warmup_vision=False):
+    """
+    Composants chargés en parallèle au démarrage
+    Requis (ensemble minimal pour répondre): voix + coordinateur
+    Optionnels (finissent en arrière-plan): LLM préchargé, vision CUA
+    warmup_vision: précharger la vision CUA (jamais en mode texte)
+    """
+    startup = StartupOrchestrator()
+    
+    if voice_manager is not None:
+        startup.add("whisper", voice_manager.load_stt, lambda stt: stt.warmup())
+        startup.add("xtts", voice_manager.load_tts, lambda tts: tts.warmup())
+        startup.add("micro", voice_manager.calibrate)
+    
+    startup.add("coordinateur", Coordinateur)
+    
+    if STARTUP_PRELOAD_LLM:
+        from utils.ollama_client import OllamaClient
+        startup.add("llm", lambda: OllamaClient(OLLAMA_MODEL), preload_llm, required=False)
+    
+    if warmup_vision:
+        from actions import warmup_vision as load_vision
+        startup.add("vision", load_vision, required=False)
+    
+    return startup.start()
+
+
 def main():
     """Point d'entree principal avec interface vocale"""
     banner()
@@ -37,19 +78,20 @@ def main():
     try:
         print("\\n[*] Initialisation du systeme...\\n")
         
-        # Initialiser le gestionnaire vocal
+        # Initialiser le gestionnaire vocal (import ici: le mode texte n'en a pas besoin)
+        from voice import VoiceManager
         voice_manager = VoiceManager()
         
-        print("[*] Chargement des modeles (cela peut prendre un moment)...")
-        if not voice_manager.initialize(calibrate_mic=True):
-            print("\\n[ERROR] Echec de l'initialisation")
+        print("[*] Chargement des modeles en parallele (cela peut prendre un moment)...")
+        startup = build_startup(voice_manager, warmup_vision=STARTUP_WARMUP_VISION)
+        if not startup.wait_required() or not voice_manager.mark_ready():
+            print("\\n[ERROR] Echec de l'initialisation: " + ", ".join(startup.failed()))
             print("   Verifiez que les modeles sont installes:")
             print("   - Whisper: faster-whisper")
             print("   - TTS: Coqui TTS")
             return 1
         
-        # Initialiser le coordinateur
-        coordinateur = Coordinateur()
+        coordinateur = startup.get("coordinateur")
         
         # Test optionnel du systeme
         test_voice = input("\\n[?] Tester le systeme vocal avant de commencer? (o/n): ").strip().lower()
@@ -99,6 +141,11 @@ def main():
         # Nettoyage
         print("\n[*] Nettoyage...")
         
+        try:
+            startup.shutdown()
+        except Exception:
+            pass
+        
         # ✅ AJOUTER ICI
         try:
             coordinateur.executeur.shutdown()
@@ -119,7 +166,11 @@ def mode_texte():
     banner()
     print("\\n[Text Mode] Mode Texte (sans voix)\\n")
     
-    coordinateur = Coordinateur()
+    startup = build_startup()
+    if not startup.wait_required():
+        print("\\n[ERROR] Echec de l'initialisation: " + ", ".join(startup.failed()))
+        return
+    coordinateur = startup.get("coordinateur")
     
     print("[i] Tapez 'quit' pour quitter\\n")
     
@@ -143,6 +194,8 @@ def mode_texte():
             print(f"\\n[ERROR] Erreur: {e}")
             traceback.print_exc()
             
+    startup.shutdown()
+    
     # Consolidation session avant de quitter
     try:
         coordinateur.executeur.shutdown()
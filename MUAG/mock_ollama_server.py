@@ -0,0 +1,446 @@
+"""
+Mock Ollama Server - Serveur local compatible /api/generate pour benchmarks hors-ligne
+Permet de faire tourner Coordinateur, TaskOrchestrator et CUAAgent sans démon Ollama
+ni GPU, avec des latences simulées reproductibles.
+
+Usage:
+    python mock_ollama_server.py --port 11500 --config mock_ollama.json --seed 42
+    OLLAMA_URL=http://localhost:11500/api/generate python main.py --text
+
+Modes de réponse (par ordre de priorité):
+    1. rejeu d'un enregistrement (--replay fichier.jsonl)
+    2. règles scriptées du fichier de config ("rules": regex sur le prompt)
+    3. proxy vers un vrai Ollama avec enregistrement (--upstream URL --record fichier.jsonl)
+    4. réponse par défaut (JSON générique si le prompt demande du JSON)
+
+Config JSON (toutes les clés sont optionnelles):
+{
+    "time_scale": 1.0,
+    "models": {
+        "qwen2.5vl": {
+            "load_ms": 4000,
+            "prompt_tps": 900,
+            "eval_tps": 35,
+            "image_tokens": 1200,
+            "jitter": {"dist": "lognormal", "sigma": 0.25}
+        }
+    },
+    "default_model": {"load_ms": 2000, "prompt_tps": 1500, "eval_tps": 60, "image_tokens": 800},
+    "rules": [
+        {"match": "ZONES DISPONIBLES", "response": "content"},
+        {"match": "planificateur", "images": true,
+         "response": "{\\"description\\": \\"Page\\", \\"suggestion\\": \\"Continuer\\", \\"task_complete\\": true}"}
+    ],
+    "default_response": "OK"
+}
+Distributions de jitter: fixed, uniform (low/high), normal (sigma), lognormal (sigma).
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import urllib.request
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_MODEL_PROFILE = {
+    "load_ms": 2000,
+    "prompt_tps": 1500,
+    "eval_tps": 60,
+    "image_tokens": 800,
+    "jitter": {"dist": "fixed"},
+}
+
+DEFAULT_JSON_RESPONSE = json.dumps({
+    "description": "Écran simulé (mock Ollama)",
+    "suggestion": "Continuer",
+    "task_complete": True,
+    "action": "wait",
+    "params": {"seconds": 1},
+    "type": "conversation",
+    "confiance": 0.9,
+    "action_requise": False,
+}, ensure_ascii=False)
+
+
+def request_key(payload):
+    """Clé d'un appel pour l'enregistrement / rejeu (modèle + prompt + system + images)"""
+    images = [hashlib.sha256(img.encode()).hexdigest() for img in payload.get("images") or []]
+    material = json.dumps(
+        {
+            "model": payload.get("model"),
+            "prompt": payload.get("prompt"),
+            "system": payload.get("system"),
+            "images": images,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def estimate_tokens(text):
+    """Approximation ~4 caractères par token"""
+    return max(1, math.ceil(len(text or "") / 4))
+
+
+def split_tokens(text):
+    """Découpe une réponse en pseudo-tokens pour le streaming (espaces conservés)"""
+    return re.findall(r"\s*\S+|\s+", text) or [""]
+
+
+class MockOllama:
+    """État du serveur: profils de latence, règles, enregistrements, modèles chargés"""
+
+    def __init__(self, config=None, seed=None, replay=None, record=None, upstream=None):
+        config = config or {}
+        self.time_scale = float(config.get("time_scale", 1.0))
+        self.models = config.get("models", {})
+        self.default_model = dict(DEFAULT_MODEL_PROFILE, **config.get("default_model", {}))
+        self.rules = [
+            dict(rule, pattern=re.compile(rule["match"], re.IGNORECASE | re.DOTALL))
+            for rule in config.get("rules", [])
+        ]
+        self.default_response = config.get("default_response")
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.loaded = {}  # modèle → expiration (None = indéfini)
+        self.recordings = self._load_recordings(replay) if replay else {}
+        self.record_path = record
+        self.upstream = upstream
+        self.stats = {"requests": 0, "streamed": 0, "aborted": 0, "replayed": 0, "scripted": 0, "proxied": 0}
+
+    # ============================================
+    # RÉPONSES
+    # ============================================
+
+    def respond(self, payload):
+        """
+        Choisit le texte de la réponse
+        Returns:
+            (texte, source)
+        """
+        key = request_key(payload)
+        if key in self.recordings:
+            return self.recordings[key], "replayed"
+
+        prompt = payload.get("prompt") or ""
+        has_images = bool(payload.get("images"))
+        for rule in self.rules:
+            if rule.get("model") and rule["model"] != payload.get("model"):
+                continue
+            if "images" in rule and rule["images"] != has_images:
+                continue
+            if rule["pattern"].search(prompt):
+                return rule["response"], "scripted"
+
+        if self.upstream:
+            text = self._proxy(payload)
+            if self.record_path:
+                self._record(key, payload, text)
+            return text, "proxied"
+
+        if self.default_response is not None:
+            return self.default_response, "default"
+        if "json" in prompt.lower():
+            return DEFAULT_JSON_RESPONSE, "default"
+        return "Réponse simulée.", "default"
+
+    def _proxy(self, payload):
+        body = dict(payload, stream=False)
+        request = urllib.request.Request(
+            self.upstream,
+            data=json.dumps(body).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=600) as response:
+            return json.loads(response.read())["response"]
+
+    def _record(self, key, payload, text):
+        entry = {
+            "key": key,
+            "model": payload.get("model"),
+            "prompt": (payload.get("prompt") or "")[:200],
+            "images": len(payload.get("images") or []),
+            "response": text,
+        }
+        with self.lock, open(self.record_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    @staticmethod
+    def _load_recordings(path):
+        recordings = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    recordings[entry["key"]] = entry["response"]
+        print(f"[MockOllama] {len(recordings)} réponses enregistrées chargées ({path})")
+        return recordings
+
+    # ============================================
+    # LATENCES
+    # ============================================
+
+    def profile(self, model):
+        return dict(self.default_model, **self.models.get(model, {}))
+
+    def jitter(self, profile):
+        """Facteur multiplicatif tiré selon la distribution du profil"""
+        spec = profile.get("jitter") or {"dist": "fixed"}
+        dist = spec.get("dist", "fixed")
+        with self.lock:
+            if dist == "uniform":
+                return self.rng.uniform(spec.get("low", 0.8), spec.get("high", 1.2))
+            if dist == "normal":
+                return max(0.05, self.rng.gauss(1.0, spec.get("sigma", 0.1)))
+            if dist == "lognormal":
+                return self.rng.lognormvariate(0.0, spec.get("sigma", 0.25))
+        return 1.0
+
+    def plan_timings(self, payload, response_text):
+        """
+        Durées simulées (secondes) d'un appel
+        Returns:
+            dict: load_s, prompt_eval_count, prompt_eval_s, eval_count, eval_s
+        """
+        model = payload.get("model")
+        profile = self.profile(model)
+        factor = self.jitter(profile)
+
+        with self.lock:
+            expires = self.loaded.get(model, 0)
+            cold = model not in self.loaded or (expires is not None and expires < time.time())
+        load_s = profile["load_ms"] / 1000 if cold else 0.0
+
+        prompt_tokens = estimate_tokens(payload.get("prompt")) + estimate_tokens(payload.get("system"))
+        if not payload.get("context"):
+            # Avec un contexte KV réutilisé, l'image fait partie du préfixe déjà évalué
+            prompt_tokens += profile["image_tokens"] * len(payload.get("images") or [])
+        eval_tokens = len(split_tokens(response_text)) if payload.get("prompt") else 0
+        num_predict = (payload.get("options") or {}).get("num_predict")
+        if num_predict is not None:
+            eval_tokens = min(eval_tokens, num_predict)
+
+        return {
+            "load_s": load_s * factor,
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_s": prompt_tokens / profile["prompt_tps"] * factor,
+            "eval_count": eval_tokens,
+            "eval_s": eval_tokens / profile["eval_tps"] * factor,
+        }
+
+    def sleep(self, seconds):
+        if seconds > 0 and self.time_scale > 0:
+            time.sleep(seconds * self.time_scale)
+
+    def touch(self, model, keep_alive):
+        """Met à jour l'état chargé selon keep_alive (0 = déchargé, -1 = indéfini)"""
+        seconds = parse_keep_alive(keep_alive)
+        with self.lock:
+            if seconds == 0:
+                self.loaded.pop(model, None)
+            else:
+                self.loaded[model] = None if seconds < 0 else time.time() + seconds
+
+    def loaded_models(self):
+        now = time.time()
+        with self.lock:
+            return [
+                {
+                    "name": model,
+                    "model": model,
+                    "size_vram": 4 * 1024 ** 3,
+                    "expires_at": "" if expires is None
+                    else datetime.fromtimestamp(expires, timezone.utc).isoformat(),
+                }
+                for model, expires in self.loaded.items()
+                if expires is None or expires > now
+            ]
+
+
+def parse_keep_alive(value):
+    """'10m' / '30s' / '1h' / nombre → secondes (5 min par défaut comme Ollama)"""
+    if value is None:
+        return 300
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = str(value).strip()
+    units = {"s": 1, "m": 60, "h": 3600}
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+    server_version = "MockOllama/1.0"
+    mock: MockOllama = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith("/api/ps"):
+            self._send_json({"models": self.mock.loaded_models()})
+        elif self.path.startswith("/api/tags"):
+            self._send_json({"models": [{"name": name} for name in self.mock.models]})
+        elif self.path.startswith("/api/stats"):
+            self._send_json(self.mock.stats)
+        else:
+            self._send_json({"status": "Ollama is running (mock)"})
+
+    def do_POST(self):
+        if not self.path.startswith("/api/generate"):
+            self._send_json({"error": f"endpoint non simulé: {self.path}"}, status=404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        mock = self.mock
+        model = payload.get("model", "")
+        with mock.lock:
+            mock.stats["requests"] += 1
+
+        # Préchargement / déchargement (pas de prompt)
+        if not payload.get("prompt"):
+            timings = mock.plan_timings(payload, "")
+            mock.sleep(timings["load_s"])
+            mock.touch(model, payload.get("keep_alive"))
+            self._send_json({
+                "model": model,
+                "created_at": _now(),
+                "response": "",
+                "done": True,
+                "done_reason": "unload" if payload.get("keep_alive") == 0 else "load",
+            })
+            return
+
+        text, source = mock.respond(payload)
+        with mock.lock:
+            if source in mock.stats:
+                mock.stats[source] += 1
+        timings = mock.plan_timings(payload, text)
+        tokens = split_tokens(text)[: timings["eval_count"] or None]
+        start = time.time()
+
+        # Chargement + évaluation du prompt avant le premier token
+        mock.sleep(timings["load_s"] + timings["prompt_eval_s"])
+        mock.touch(model, payload.get("keep_alive"))
+
+        final = {
+            "model": model,
+            "created_at": _now(),
+            "done": True,
+            "done_reason": "stop",
+            "context": _fake_context(payload, text),
+            "total_duration": 0,
+            "load_duration": int(timings["load_s"] * 1e9),
+            "prompt_eval_count": timings["prompt_eval_count"],
+            "prompt_eval_duration": int(timings["prompt_eval_s"] * 1e9),
+            "eval_count": len(tokens),
+            "eval_duration": int(timings["eval_s"] * 1e9),
+        }
+
+        if payload.get("stream", True):
+            with mock.lock:
+                mock.stats["streamed"] += 1
+            per_token = timings["eval_s"] / max(len(tokens), 1)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                for token in tokens:
+                    self._send_chunk({"model": model, "created_at": _now(), "response": token, "done": False})
+                    mock.sleep(per_token)
+                final["response"] = ""
+                final["total_duration"] = int((time.time() - start) * 1e9)
+                self._send_chunk(final)
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                # Le client a coupé le flux (ex: JSON complet reçu): génération annulée
+                with mock.lock:
+                    mock.stats["aborted"] += 1
+            return
+
+        mock.sleep(timings["eval_s"])
+        final["response"] = "".join(tokens)
+        final["total_duration"] = int((time.time() - start) * 1e9)
+        self._send_json(final)
+
+    def _send_chunk(self, data):
+        body = (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(body):X}\r\n".encode() + body + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _fake_context(payload, text):
+    """Jetons de contexte factices mais stables (longueur ~ prompt + réponse)"""
+    previous = payload.get("context") or []
+    digest = hashlib.sha256(((payload.get("prompt") or "") + text).encode("utf-8")).digest()
+    count = estimate_tokens(payload.get("prompt")) + estimate_tokens(text)
+    return previous + [digest[i % len(digest)] for i in range(count)]
+
+
+def create_server(host="127.0.0.1", port=11500, **mock_kwargs):
+    """Crée le serveur (sans le démarrer) - utile pour les tests et benchmarks"""
+    handler = type("Handler", (MockOllamaHandler,), {"mock": MockOllama(**mock_kwargs)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur Ollama simulé (benchmarks hors-ligne)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--config", help="Fichier JSON: profils de latence, règles, réponse par défaut")
+    parser.add_argument("--seed", type=int, default=None, help="Graine des latences aléatoires")
+    parser.add_argument("--time-scale", type=float, default=None, help="Multiplicateur des latences (0 = instantané)")
+    parser.add_argument("--replay", help="Rejouer les réponses d'un enregistrement JSONL")
+    parser.add_argument("--upstream", help="Vrai Ollama à interroger si aucune règle ne correspond")
+    parser.add_argument("--record", help="Enregistrer les réponses du vrai Ollama (JSONL)")
+    args = parser.parse_args()
+
+    config = {}
+    if args.config:
+        with open(args.config, encoding="utf-8") as f:
+            config = json.load(f)
+    if args.time_scale is not None:
+        config["time_scale"] = args.time_scale
+
+    server = create_server(
+        args.host,
+        args.port,
+        config=config,
+        seed=args.seed,
+        replay=args.replay,
+        record=args.record,
+        upstream=args.upstream,
+    )
+    print(f"[MockOllama] Écoute sur http://{args.host}:{args.port}/api/generate")
+    print(f"[MockOllama] OLLAMA_URL=http://{args.host}:{args.port}/api/generate")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n[MockOllama] Arrêt - {server.RequestHandlerClass.mock.stats}")
+
+
+if __name__ == "__main__":
+    main()
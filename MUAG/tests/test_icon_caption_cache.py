@@ -0,0 +1,86 @@
+"""
+Tests du cache de captions d'icônes (actions/icon_caption_cache.py)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from actions.icon_caption_cache import IconCaptionCache
+
+
+def word(text, w=80, h=32, scale=0.7):
+    crop = np.full((h, w, 3), 240, dtype=np.uint8)
+    cv2.putText(crop, text, (8, h - 10), cv2.FONT_HERSHEY_SIMPLEX, scale, (20, 20, 20), 2)
+    return crop
+
+
+def icon(color=(30, 30, 30)):
+    crop = np.full((40, 40, 3), 240, dtype=np.uint8)
+    cv2.circle(crop, (20, 20), 12, color, 3)
+    cv2.line(crop, (28, 28), (37, 37), color, 3)
+    return crop
+
+
+def badge(text):
+    crop = np.full((48, 48, 3), 240, dtype=np.uint8)
+    cv2.circle(crop, (24, 24), 20, (200, 60, 60), -1)
+    cv2.putText(crop, text, (16, 32), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    return crop
+
+
+def make_cache(tmp_path, **kwargs):
+    return IconCaptionCache(path=tmp_path / "caption_cache.json", enabled=True, **kwargs)
+
+
+def test_same_icon_hits_and_survives_reload(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put(cache.fingerprint(icon()), "Search icon", "search")
+    assert cache.get(cache.fingerprint(icon())) == ("Search icon", "search")
+
+    cache.save()
+    reloaded = make_cache(tmp_path)
+    assert reloaded.get(reloaded.fingerprint(icon())) == ("Search icon", "search")
+
+
+def test_close_words_do_not_share_captions(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put(cache.fingerprint(word("Save")), "Save button", "save")
+    assert cache.get(cache.fingerprint(word("Sane"))) is None
+
+
+def test_same_phash_different_pixels_is_rejected(tmp_path):
+    cache = make_cache(tmp_path)
+    zero, eight = cache.fingerprint(badge("0")), cache.fingerprint(badge("8"))
+    assert zero["key"] == eight["key"]  # Même pHash: seule la vérification pixel les sépare
+    cache.put(zero, "Notification badge 0", "badge_0")
+    assert cache.get(eight) is None
+    assert cache.get_stats()["rejected"] == 1
+
+
+def test_flat_light_and_dark_crops_differ(tmp_path):
+    cache = make_cache(tmp_path)
+    light = np.full((30, 30, 3), 250, dtype=np.uint8)
+    dark = np.full((30, 30, 3), 10, dtype=np.uint8)
+    assert cache.fingerprint(light)["key"][1] == cache.fingerprint(dark)["key"][1]
+    cache.put(cache.fingerprint(light), "Blank area", "blank")
+    assert cache.get(cache.fingerprint(dark)) is None
+
+
+def test_aspect_ratio_is_part_of_the_key(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put(cache.fingerprint(icon()), "Search icon", "search")
+    stretched = cv2.resize(icon(), (120, 40), interpolation=cv2.INTER_AREA)
+    assert cache.get(cache.fingerprint(stretched)) is None
+
+
+def test_lru_eviction(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2)
+    colors = [(200, 30, 30), (30, 200, 30), (30, 30, 200)]
+    for i, color in enumerate(colors):
+        cache.put(cache.fingerprint(icon(color)), f"icon {i}", f"icon_{i}")
+    assert cache.get(cache.fingerprint(icon(colors[0]))) is None
+    assert cache.get(cache.fingerprint(icon(colors[2]))) == ("icon 2", "icon_2")
+    assert cache.get_stats()["evictions"] == 1
@@ -0,0 +1,102 @@
+"""
+Tests du re-parse incrémental (actions/incremental_parser.py)
+"""
+import sys
+import os
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from actions.incremental_parser import IncrementalParser
+
+
+def fake_detect(image):
+    """Détecteur factice: une ligne OCR par bloc de caractères sombres (espacement < 15 px)"""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    _, mask = cv2.threshold(gray, 128, 255, cv2.THRESH_BINARY_INV)
+    mask = cv2.dilate(mask, np.ones((1, 15), np.uint8))
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    ocr = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        # Dilatation retirée du bord droit (7 px de chaque côté)
+        x, w = x + 7, w - 14
+        ocr.append({"text": "ligne", "bbox": [x, y, w, h], "center": (x + w // 2, y + h // 2)})
+    return [], ocr
+
+
+def type_chars(frame, x, count, y=100):
+    for i in range(count):
+        cx = x + i * 12
+        cv2.rectangle(frame, (cx, y), (cx + 8, y + 20), (0, 0, 0), -1)
+    return frame
+
+
+def test_typing_in_wide_field_keeps_whole_line():
+    parser = IncrementalParser()
+    parser.enabled = True
+    frame1 = np.full((720, 1280, 3), 255, dtype=np.uint8)
+    type_chars(frame1, 80, 50)  # Ligne de 596 px
+    omni, ocr, info = parser.parse(frame1, fake_detect)
+    assert info["mode"] == "full"
+    assert len(ocr) == 1 and ocr[0]["bbox"][2] >= 590
+
+    frame2 = type_chars(frame1.copy(), 80, 51)  # Un caractère tapé en bout de ligne
+    omni, ocr, info = parser.parse(frame2, fake_detect)
+    assert info["mode"] == "incremental"
+    assert len(ocr) == 1
+    x, y, w, h = ocr[0]["bbox"]
+    assert x == 80 and w >= 600
+
+
+def test_unchanged_elements_are_reused():
+    parser = IncrementalParser()
+    parser.enabled = True
+    frame1 = np.full((720, 1280, 3), 255, dtype=np.uint8)
+    type_chars(frame1, 80, 10)
+    type_chars(frame1, 80, 10, y=400)
+    parser.parse(frame1, fake_detect)
+
+    frame2 = type_chars(frame1.copy(), 80, 11, y=400)
+    omni, ocr, info = parser.parse(frame2, fake_detect)
+    assert info["mode"] == "incremental"
+    assert info["reused"] == 1
+    assert sorted(o["bbox"][1] for o in ocr) == [100, 400]
+
+
+def test_identical_frame_reuses_everything():
+    parser = IncrementalParser()
+    parser.enabled = True
+    frame = type_chars(np.full((720, 1280, 3), 255, dtype=np.uint8), 80, 5)
+    parser.parse(frame, fake_detect)
+    omni, ocr, info = parser.parse(frame.copy(), fake_detect)
+    assert info["mode"] == "reuse"
+    assert len(ocr) == 1
+
+
+def test_cancelled_parse_keeps_previous_reference():
+    parser = IncrementalParser()
+    parser.enabled = True
+    frame1 = np.full((720, 1280, 3), 255, dtype=np.uint8)
+    type_chars(frame1, 80, 10)
+    type_chars(frame1, 80, 10, y=400)
+    parser.parse(frame1, fake_detect)
+
+    cancel = threading.Event()
+    calls = []
+
+    def cancelling_detect(image):
+        calls.append(image.shape)
+        cancel.set()  # Vision abandonnée pendant la première zone
+        return fake_detect(image)
+
+    frame2 = type_chars(type_chars(frame1.copy(), 80, 11), 80, 11, y=400)
+    omni, ocr, info = parser.parse(frame2, cancelling_detect, cancel_event=cancel)
+    assert info["cancelled"] and not info["complete"]
+    assert len(calls) == 1  # Zone suivante non détectée
+    assert parser.prev_frame is not None and np.array_equal(parser.prev_frame, frame1)
+
+    omni, ocr, info = parser.parse(frame2, fake_detect)
+    assert info["mode"] == "incremental"
@@ -0,0 +1,68 @@
+"""
+Tests du placement des étiquettes Set-of-Mark (actions/label_layout.py)
+contre l'ancien parcours de toutes les bbox
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+
+import pytest
+
+from actions.label_layout import LabelLayout, SpatialHash, rectangles_overlap
+
+
+def place_loop(bboxes, idx, text_w, text_h, tolerance=2):
+    """Ancienne implémentation (collision testée contre toutes les autres bbox)"""
+    x, y, w, h = bboxes[idx]
+    positions = [
+        (x + (w - text_w) // 2, y - 5 - text_h),
+        (x + (w - text_w) // 2, y + h + 2),
+        (x - text_w - 2, y + (h - text_h) // 2),
+        (x + w + 2, y + (h - text_h) // 2),
+    ]
+    for px, py in positions:
+        rect = [px, py, text_w, text_h + 5]
+        if not any(
+            j != idx and rectangles_overlap(rect, other, tolerance)
+            for j, other in enumerate(bboxes)
+        ):
+            return px, py + text_h
+    return x + (w - text_w) // 2, y - 5
+
+
+def random_bboxes(rng, count, width=1920, height=1080):
+    bboxes = []
+    for _ in range(count):
+        w, h = rng.randint(4, 300), rng.randint(4, 120)
+        bboxes.append([rng.randint(-20, width), rng.randint(-20, height), w, h])
+    bboxes.append(list(bboxes[0]))  # Doublon exact
+    bboxes.append([100, 100, -5, 10])  # bbox dégénérée
+    bboxes.append([0, 0, width, height])  # Plein écran
+    return bboxes
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("cell_size", [16, 64, 2048])
+def test_layout_matches_loop(seed, cell_size):
+    rng = random.Random(seed)
+    bboxes = random_bboxes(rng, 150)
+    layout = LabelLayout(bboxes, cell_size=cell_size)
+    for idx in range(len(bboxes)):
+        text_w, text_h = rng.randint(8, 40), rng.randint(8, 16)
+        assert layout.place(idx, text_w, text_h) == place_loop(bboxes, idx, text_w, text_h)
+
+
+def test_label_goes_below_when_above_is_taken():
+    bboxes = [[100, 100, 50, 20], [100, 70, 50, 20]]
+    layout = LabelLayout(bboxes)
+    assert layout.place(0, 20, 10) == (115, 132)  # En dessous, ligne de base incluse
+
+
+def test_spatial_hash_returns_degenerate_rects_everywhere():
+    index = SpatialHash(cell_size=10)
+    index.insert(0, 0, 0, 5, 5)
+    index.insert(1, 50, 50, 40, 60)  # x2 < x1
+    assert index.query(0, 0, 1, 1) == [0, 1]
+    assert index.query(200, 200, 210, 210) == [1]
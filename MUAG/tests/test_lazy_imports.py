@@ -0,0 +1,51 @@
+"""
+Sessions texte / voix: importer l'exécuteur ne doit pas charger torch (ni CUDA)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import subprocess
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Processus neuf: enregistre toute tentative d'import de torch (même si torch est absent)
+CHECK = """
+import sys
+
+attempts = []
+
+class TorchImportRecorder:
+    def find_spec(self, name, path=None, target=None):
+        if name == "torch" or name.startswith("torch."):
+            attempts.append(name)
+        return None
+
+sys.meta_path.insert(0, TorchImportRecorder())
+import {module}
+print("torch" in sys.modules or bool(attempts))
+"""
+
+
+def imports_torch(module: str) -> bool:
+    result = subprocess.run(
+        [sys.executable, "-c", CHECK.format(module=module)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip().splitlines()[-1] == "True"
+
+
+def test_omniparser_detector_import_does_not_load_torch():
+    assert not imports_torch("actions.omniparser_detector")
+
+
+def test_executeur_import_does_not_load_torch():
+    # Sans pyautogui, l'exécuteur n'importe pas le CUA: le test ne prouverait rien
+    pytest.importorskip("pyautogui")
+    assert not imports_torch("agents.executeur")
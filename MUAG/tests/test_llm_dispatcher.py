@@ -0,0 +1,100 @@
+"""
+Tests de la file de priorité LLM (utils/llm_dispatcher.py)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+
+from utils.llm_dispatcher import LLMDispatcher
+
+
+def wait_queued(dispatcher, count, timeout=2.0):
+    deadline = time.time() + timeout
+    while sum(dispatcher.get_status()["queue_depth"].values()) < count:
+        assert time.time() < deadline, "requêtes jamais mises en file"
+        time.sleep(0.01)
+
+
+def test_slots_are_granted_by_priority():
+    dispatcher = LLMDispatcher(max_concurrent=1, idle_delay_s=0)
+    order = []
+
+    def call(priority):
+        with dispatcher.slot(priority):
+            order.append(priority)
+
+    with dispatcher.slot("agent_step"):
+        threads = []
+        for priority in ("background", "agent_step", "interactive"):
+            thread = threading.Thread(target=call, args=(priority,))
+            thread.start()
+            threads.append(thread)
+            wait_queued(dispatcher, len(threads))
+    for thread in threads:
+        thread.join(2.0)
+    assert order == ["interactive", "agent_step", "background"]
+
+
+def test_background_waits_for_idle_delay():
+    dispatcher = LLMDispatcher(max_concurrent=2, idle_delay_s=0.3)
+    with dispatcher.slot("interactive"):
+        pass
+    start = time.time()
+    with dispatcher.slot("background") as waited:
+        elapsed = time.time() - start
+    assert elapsed >= 0.25 and waited >= 0.25
+    assert dispatcher.get_status()["jobs"]["deferred"] == 1
+
+
+def test_pending_background_jobs_are_coalesced():
+    dispatcher = LLMDispatcher(max_concurrent=1, idle_delay_s=0)
+    release = threading.Event()
+    started = threading.Event()
+    calls = []
+
+    def blocking():
+        started.set()
+        release.wait(2.0)
+
+    def update(value):
+        calls.append(value)
+        return value
+
+    dispatcher.submit_background(blocking)
+    assert started.wait(2.0)
+    first = dispatcher.submit_background(update, 1, key="profile_update")
+    second = dispatcher.submit_background(update, 2, key="profile_update")
+    release.set()
+
+    assert second.result(2.0) == 2
+    assert first.result(2.0) == 2  # Le Future remplacé reçoit le résultat fusionné
+    assert calls == [2]
+    assert dispatcher.get_status()["jobs"]["coalesced"] == 1
+    assert dispatcher.flush(2.0)
+
+
+def test_calls_inside_background_jobs_use_background_priority():
+    dispatcher = LLMDispatcher(max_concurrent=1, idle_delay_s=0)
+
+    def job():
+        with dispatcher.slot("interactive"):
+            return dispatcher.current_priority()
+
+    assert dispatcher.submit_background(job).result(2.0) == "background"
+    assert dispatcher.get_status()["wait"]["background"]["calls"] == 1
+    assert dispatcher.get_status()["wait"]["interactive"]["calls"] == 0
+
+
+def test_failed_job_propagates_exception():
+    dispatcher = LLMDispatcher(max_concurrent=1, idle_delay_s=0)
+
+    def broken():
+        raise ValueError("json invalide")
+
+    future = dispatcher.submit_background(broken)
+    assert isinstance(future.exception(2.0), ValueError)
+    assert dispatcher.flush(2.0)
+    assert dispatcher.get_status()["jobs"]["failed"] == 1
@@ -0,0 +1,118 @@
+"""
+Tests du gestionnaire de résidence VRAM (utils/model_residency.py)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+
+import pytest
+
+from utils.model_residency import ModelResidencyManager
+
+
+def make_manager(budget_mb=1000):
+    manager = ModelResidencyManager()
+    manager.budget_mb = budget_mb
+    return manager
+
+
+def test_slow_unload_does_not_block_other_acquires():
+    manager = make_manager()
+    unloading = threading.Event()
+
+    def slow_unload():
+        unloading.set()
+        time.sleep(0.5)
+
+    manager.register("old", unload_fn=slow_unload, footprint_mb=600, resident=True)
+    manager.register("warm", footprint_mb=100, resident=True, pinned=True)
+    manager.register("new", load_fn=lambda: None, footprint_mb=600)
+
+    thread = threading.Thread(target=manager.acquire, args=("new",))
+    thread.start()
+    assert unloading.wait(1.0)
+    start = time.time()
+    assert manager.acquire("warm") is True  # Modèle chaud: pas d'attente du déchargement
+    assert time.time() - start < 0.2
+    manager.release("warm")
+    thread.join()
+    assert manager.is_resident("new") and not manager.is_resident("old")
+
+
+def test_failed_load_is_propagated_and_not_resident():
+    manager = make_manager()
+
+    def broken_load():
+        raise RuntimeError("CUDA out of memory")
+
+    manager.register("model", load_fn=broken_load, footprint_mb=100)
+    with pytest.raises(RuntimeError):
+        manager.acquire("model")
+    assert not manager.is_resident("model")
+    assert manager.models["model"]["in_use"] == 0
+
+
+def test_load_returning_false_is_a_failure():
+    manager = make_manager()
+    manager.register("ollama", load_fn=lambda: False, footprint_mb=100)
+    with pytest.raises(RuntimeError):
+        manager.acquire("ollama")
+    assert not manager.is_resident("ollama")
+
+
+def test_lru_model_is_evicted_for_room():
+    manager = make_manager()
+    unloaded = []
+    for name in ("a", "b"):
+        manager.register(name, load_fn=lambda: None, unload_fn=lambda n=name: unloaded.append(n), footprint_mb=400)
+        manager.acquire(name)
+        manager.release(name)
+        time.sleep(0.01)
+    manager.register("c", load_fn=lambda: None, footprint_mb=400)
+    manager.acquire("c")
+    assert unloaded == ["a"]
+    assert manager.used_mb() == 800
+
+
+def test_concurrent_cold_acquires_load_once():
+    manager = make_manager()
+    loads = []
+
+    def slow_load():
+        loads.append(threading.current_thread().name)
+        time.sleep(0.2)
+
+    manager.register("model", load_fn=slow_load, footprint_mb=100)
+    warm = []
+    threads = [
+        threading.Thread(target=lambda: warm.append(manager.acquire("model")))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(loads) == 1
+    assert sorted(warm) == [False, True, True]
+    assert manager.stats["cold_loads"] == 1
+    assert manager.models["model"]["in_use"] == 3
+
+
+def test_acquire_racing_prefetch_loads_once():
+    manager = make_manager()
+    loads = []
+
+    def slow_load():
+        loads.append(1)
+        time.sleep(0.2)
+
+    manager.register("model", load_fn=slow_load, footprint_mb=100)
+    thread = manager.prefetch("model")
+    manager.acquire("model")
+    thread.join()
+    assert len(loads) == 1
+    assert manager.stats["cold_loads"] + manager.stats["prefetches"] == 1
+    assert manager.is_resident("model")
@@ -0,0 +1,107 @@
+"""
+Tests de la grille OCR (actions/ocr_index.py) contre l'ancienne boucle
+de SemanticEnricher._find_nearby_ocr
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+
+import numpy as np
+import pytest
+
+from actions.ocr_index import OCRSpatialIndex
+
+
+def find_nearby_ocr_loop(bbox, center, ocr_results, threshold=50):
+    """Ancienne implémentation (parcours complet de la liste OCR par élément)"""
+    if not ocr_results:
+        return None
+    x, y, w, h = bbox
+    cx, cy = center
+    texts_inside = []
+    for ocr in ocr_results:
+        ocr_text = ocr.get("text", "").strip()
+        if not ocr_text:
+            continue
+        ocr_bbox = ocr.get("bbox", [])
+        if len(ocr_bbox) < 4:
+            continue
+        ox, oy, ow, oh = ocr_bbox
+        ocr_cx = ox + ow // 2
+        ocr_cy = oy + oh // 2
+        if x <= ocr_cx <= (x + w) and y <= ocr_cy <= (y + h):
+            texts_inside.append((oy, ocr_text))
+    if texts_inside:
+        texts_inside.sort(key=lambda t: t[0])
+        return " ".join([t[1] for t in texts_inside])
+
+    best_text = None
+    min_distance = float("inf")
+    for ocr in ocr_results:
+        ocr_text = ocr.get("text", "").strip()
+        if not ocr_text:
+            continue
+        ocr_bbox = ocr.get("bbox", [])
+        if len(ocr_bbox) < 4:
+            continue
+        ox, oy, ow, oh = ocr_bbox
+        ocr_cx = ox + ow // 2
+        ocr_cy = oy + oh // 2
+        distance = np.sqrt((cx - ocr_cx) ** 2 + (cy - ocr_cy) ** 2)
+        if distance < min_distance and distance < threshold:
+            min_distance = distance
+            best_text = ocr_text
+    return best_text
+
+
+def random_ocr(rng, count, width=1920, height=1080):
+    results = []
+    for i in range(count):
+        w, h = rng.randint(10, 300), rng.randint(10, 40)
+        x, y = rng.randint(0, width - w), rng.randint(0, height - h)
+        text = f"texte {i}" if i % 11 else "  "  # Textes vides ignorés
+        results.append({"text": text, "bbox": [x, y, w, h]})
+    results.append({"text": "bbox incomplète", "bbox": [10, 10]})
+    results.append(dict(results[0]))  # Doublon: même centre, égalité de distance
+    results.append({"text": "même ligne", "bbox": list(results[1]["bbox"])})  # Même y: ordre OCR conservé
+    return results
+
+
+def random_elements(rng, count, width=1920, height=1080):
+    elements = []
+    for _ in range(count):
+        w, h = rng.randint(5, 400), rng.randint(5, 200)
+        x, y = rng.randint(0, width - w), rng.randint(0, height - h)
+        elements.append(([x, y, w, h], (x + w // 2, y + h // 2)))
+    elements.append(([0, 0, width, height], (width // 2, height // 2)))  # Boîte plein écran
+    return elements
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("cell_size", [8, 64, 256, 4096])
+def test_index_matches_loop(seed, cell_size):
+    rng = random.Random(seed)
+    ocr_results = random_ocr(rng, 150)
+    index = OCRSpatialIndex(ocr_results, cell_size=cell_size)
+    for bbox, center in random_elements(rng, 120):
+        for threshold in (20, 50, 150):
+            expected = find_nearby_ocr_loop(bbox, center, ocr_results, threshold)
+            assert index.associate(bbox, center, threshold) == expected
+
+
+def test_empty_ocr_gives_none():
+    index = OCRSpatialIndex([])
+    assert index.associate([0, 0, 100, 100], (50, 50)) is None
+    assert find_nearby_ocr_loop([0, 0, 100, 100], (50, 50), []) is None
+
+
+def test_texts_inside_are_merged_top_to_bottom():
+    ocr_results = [
+        {"text": "bas", "bbox": [10, 60, 40, 20]},
+        {"text": "haut", "bbox": [10, 10, 40, 20]},
+        {"text": "dehors", "bbox": [500, 500, 40, 20]},
+    ]
+    index = OCRSpatialIndex(ocr_results)
+    assert index.associate([0, 0, 100, 100], (50, 50)) == "haut bas"
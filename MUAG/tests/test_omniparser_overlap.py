@@ -0,0 +1,87 @@
+"""
+Tests de la suppression des chevauchements OmniParser (OmniParser/util/utils.py):
+versions vectorisées numpy vs boucles de référence
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "OmniParser"))
+
+import random
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+pytest.importorskip("supervision")
+pytest.importorskip("openai")
+pytest.importorskip("matplotlib")
+
+from util.utils import (
+    remove_overlap,
+    remove_overlap_loop,
+    remove_overlap_new,
+    remove_overlap_new_loop,
+)
+
+
+def random_boxes(rng, count, size=1.0):
+    boxes = []
+    for _ in range(count):
+        x, y = rng.uniform(0, size * 0.9), rng.uniform(0, size * 0.9)
+        w, h = rng.uniform(0.005, 0.2) * size, rng.uniform(0.005, 0.1) * size
+        boxes.append([x, y, min(size, x + w), min(size, y + h)])
+    # Cas limites: doublons exacts, boîte imbriquée (pas de boîte d'aire nulle:
+    # la boucle de référence divise par l'aire)
+    boxes.append(list(boxes[0]))
+    x1, y1, x2, y2 = boxes[1]
+    boxes.append([x1 + (x2 - x1) * 0.1, y1 + (y2 - y1) * 0.1, x2 - (x2 - x1) * 0.1, y2 - (y2 - y1) * 0.1])
+    return boxes
+
+
+def ocr_elems(rng, count):
+    elems = []
+    for i, bbox in enumerate(random_boxes(rng, count)):
+        content = None if i % 7 == 3 else f"texte {i}"  # content None: branche try/except
+        elems.append({"type": "text", "bbox": bbox, "interactivity": False, "content": content, "source": "box_ocr_content_ocr"})
+    elems.append(dict(elems[0]))  # Doublon exact (sémantique list.remove)
+    return elems
+
+
+def icon_elems(boxes):
+    return [{"type": "icon", "bbox": b, "interactivity": True, "content": None} for b in boxes]
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("threshold", [0.1, 0.7, 0.9])
+def test_remove_overlap_new_matches_loop(seed, threshold):
+    rng = random.Random(seed)
+    icons = icon_elems(random_boxes(rng, 60))
+    ocr = ocr_elems(rng, 25)
+    expected = remove_overlap_new_loop(icons, threshold, [dict(e) for e in ocr])
+    assert remove_overlap_new(icons, threshold, [dict(e) for e in ocr]) == expected
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_remove_overlap_new_without_ocr_matches_loop(seed):
+    rng = random.Random(seed)
+    icons = icon_elems(random_boxes(rng, 40))
+    assert remove_overlap_new(icons, 0.7, None) == remove_overlap_new_loop(icons, 0.7, None)
+    assert remove_overlap_new([], 0.7, None) == remove_overlap_new_loop([], 0.7, None)
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("with_ocr", [False, True])
+def test_remove_overlap_matches_loop(seed, with_ocr):
+    rng = random.Random(seed)
+    boxes = torch.tensor(random_boxes(rng, 60, size=1000.0))
+    ocr = random_boxes(rng, 20, size=1000.0) if with_ocr else None
+    expected = remove_overlap_loop(boxes, 0.7, ocr)
+    result = remove_overlap(boxes, 0.7, ocr)
+    assert result.tolist() == expected.tolist()
+
+
+def test_large_input_spans_several_blocks():
+    rng = random.Random(0)
+    icons = icon_elems(random_boxes(rng, 1200))
+    assert remove_overlap_new(icons, 0.7, None) == remove_overlap_new_loop(icons, 0.7, None)
@@ -0,0 +1,86 @@
+"""
+Tests du cache disque des réponses LLM/VLM (utils/response_cache.py)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+from utils.response_cache import ResponseCache
+
+
+def make_cache(tmp_path, **kwargs):
+    kwargs.setdefault("ttl_s", 0)
+    return ResponseCache(path=tmp_path / "responses.sqlite", enabled=True, **kwargs)
+
+
+def test_only_deterministic_calls_are_cacheable():
+    assert ResponseCache.is_cacheable({"temperature": 0})
+    assert not ResponseCache.is_cacheable({"temperature": 0.7})
+    assert not ResponseCache.is_cacheable({})
+    assert not ResponseCache.is_cacheable(None)
+
+
+def test_key_depends_on_every_input():
+    base = dict(model="qwen", prompt="Bonjour", system="sys", image_base64="aW1n", options={"temperature": 0})
+    key = ResponseCache.make_key(**base)
+    assert key == ResponseCache.make_key(**dict(base, options={"temperature": 0}))
+    for change in (
+        {"model": "llava"},
+        {"prompt": "Bonsoir"},
+        {"system": None},
+        {"image_base64": "b3RoZXI="},
+        {"options": {"temperature": 0, "num_predict": 10}},
+        {"kind": "chat"},
+    ):
+        assert ResponseCache.make_key(**dict(base, **change)) != key
+
+
+def test_hit_miss_and_persistence(tmp_path):
+    cache = make_cache(tmp_path)
+    key = ResponseCache.make_key("qwen", "Bonjour", options={"temperature": 0})
+    assert cache.get(key) is None
+    cache.put(key, "qwen", "Salut !")
+    assert cache.get(key) == "Salut !"
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["entries"] == 1
+
+    reopened = make_cache(tmp_path)
+    assert reopened.get(key) == "Salut !"
+
+
+def test_empty_response_is_not_stored(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("k", "qwen", "")
+    assert cache.get("k") is None
+    assert cache.get_stats()["stores"] == 0
+
+
+def test_expired_entry_is_dropped(tmp_path):
+    cache = make_cache(tmp_path, ttl_s=0.1)
+    cache.put("k", "qwen", "réponse")
+    time.sleep(0.15)
+    assert cache.get("k") is None
+    stats = cache.get_stats()
+    assert stats["expired"] == 1 and stats["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.put("a", "qwen", "A")
+    time.sleep(0.01)
+    cache.put("b", "qwen", "B")
+    time.sleep(0.01)
+    assert cache.get("a") == "A"  # "a" redevient récent
+    time.sleep(0.01)
+    cache.put("c", "qwen", "C")
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_disabled_cache_is_a_no_op(tmp_path):
+    cache = ResponseCache(path=tmp_path / "responses.sqlite", enabled=False)
+    cache.put("k", "qwen", "réponse")
+    assert cache.get("k") is None
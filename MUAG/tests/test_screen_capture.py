@@ -0,0 +1,67 @@
+"""
+Tests du backend dxcam sur écran figé (actions/screen_capture.py)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+import numpy as np
+
+from actions.screen_capture import DXCamBackend
+
+
+class StaticCamera:
+    """Caméra dxcam factice: une seule frame, puis None (écran inchangé)"""
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.pending = True
+
+    def grab(self, region=None):
+        if not self.pending:
+            return None
+        self.pending = False
+        if region is None:
+            return self.screen
+        x1, y1, x2, y2 = region
+        return self.screen[y1:y2, x1:x2]
+
+
+def make_backend(camera):
+    backend = DXCamBackend.__new__(DXCamBackend)  # Sans dxcam ni Windows
+    backend.camera = camera
+    backend.last = None
+    backend.last_full = None
+    backend.fallback = None
+    return backend
+
+
+def screen():
+    return np.arange(100 * 200 * 3, dtype=np.uint32).reshape(100, 200, 3).astype(np.uint8)
+
+
+def test_other_region_on_static_screen_is_cropped_from_full_frame():
+    image = screen()
+    backend = make_backend(StaticCamera(image))
+    assert np.array_equal(backend.grab(), image)
+
+    start = time.time()
+    frame = backend.grab((10, 20, 50, 30))
+    assert time.time() - start < 1.0
+    assert np.array_equal(frame, image[20:50, 10:60])
+
+
+def test_region_without_full_frame_falls_back():
+    image = screen()
+    backend = make_backend(StaticCamera(image))
+    backend.grab((0, 0, 20, 20))
+
+    class Fallback:
+        def grab(self, region=None):
+            return image
+
+    backend.fallback = Fallback()
+    frame = backend.grab((10, 20, 50, 30))
+    assert np.array_equal(frame, image[20:50, 10:60])
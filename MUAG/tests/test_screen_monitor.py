@@ -0,0 +1,46 @@
+"""
+Tests de l'attente "écran stable" (actions/screen_monitor.py)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from actions.screen_monitor import ScreenMonitor
+
+
+def test_capture_error_during_wait_is_not_raised(monkeypatch):
+    monitor = ScreenMonitor()
+    samples = iter([np.zeros((10, 10), np.uint8), np.full((10, 10), 255, np.uint8)])
+
+    def sample(region=None):
+        frame = next(samples, None)
+        if frame is None:
+            raise RuntimeError("capture perdue")
+        return frame
+
+    monkeypatch.setattr(monitor, "_sample", sample)
+    result = monitor.wait_for_stable(timeout=0.5, quiet_s=0.3, min_wait=0)
+    assert result["stable"] is False
+    assert result["frames"] == 2
+    assert result["waited_s"] < 1.0
+
+
+def test_moving_screen_returns_at_timeout(monkeypatch):
+    monitor = ScreenMonitor()
+    counter = iter(range(10 ** 6))
+    monkeypatch.setattr(
+        monitor, "_sample", lambda region=None: np.full((10, 10), (next(counter) % 2) * 255, np.uint8)
+    )
+    result = monitor.wait_for_stable(timeout=0.4, quiet_s=0.2, min_wait=0)
+    assert result["stable"] is False
+    assert result["waited_s"] < 0.8
+
+
+def test_still_screen_returns_after_quiet_period(monkeypatch):
+    monitor = ScreenMonitor()
+    monkeypatch.setattr(monitor, "_sample", lambda region=None: np.zeros((10, 10), np.uint8))
+    result = monitor.wait_for_stable(timeout=2.0, quiet_s=0.1, min_wait=0)
+    assert result["stable"] is True
+    assert result["waited_s"] < 1.0
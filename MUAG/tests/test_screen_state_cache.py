@@ -0,0 +1,63 @@
+"""
+Tests du cache de résultats vision par écran (actions/screen_state_cache.py)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from actions.screen_state_cache import ScreenStateCache
+
+VISION = {
+    "enriched_clickables": [{"id": 0, "center": (110, 110), "bbox": np.array([100, 100, 20, 20])}],
+    "clickables_text": "[0] bouton",
+    "ocr_results": [],
+    "zone": "content",
+}
+
+
+def screen():
+    frame = np.full((600, 800, 3), 255, dtype=np.uint8)
+    cv2.putText(frame, "Titres likes", (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+    cv2.rectangle(frame, (100, 300), (400, 340), (60, 60, 60), 2)
+    return frame
+
+
+def test_identical_screen_hits_and_survives_reload(tmp_path):
+    path = tmp_path / "screen_cache.json"
+    cache = ScreenStateCache(path=path, enabled=True)
+    cache.put("url:https://example.com", "content", screen(), VISION)
+    cached = cache.get("url:https://example.com", "content", screen())
+    assert cached["clickables_text"] == "[0] bouton"
+    assert cached["enriched_clickables"][0]["bbox"] == [100, 100, 20, 20]
+
+    cache.save()
+    reloaded = ScreenStateCache(path=path, enabled=True)
+    assert reloaded.get("url:https://example.com", "content", screen()) is not None
+
+
+def test_one_typed_character_is_rejected(tmp_path):
+    cache = ScreenStateCache(path=tmp_path / "screen_cache.json", enabled=True)
+    cache.put("window:Notes", "content", screen(), VISION)
+    typed = screen()
+    cv2.putText(typed, "a", (110, 330), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 1)
+    assert cache.get("window:Notes", "content", typed) is None
+    assert cache.get_stats()["rejected"] == 1
+
+
+def test_other_window_or_zone_misses(tmp_path):
+    cache = ScreenStateCache(path=tmp_path / "screen_cache.json", enabled=True)
+    cache.put("window:Notes", "content", screen(), VISION)
+    assert cache.get("window:Autre", "content", screen()) is None
+    assert cache.get("window:Notes", "footer", screen()) is None
+
+
+def test_lru_eviction(tmp_path):
+    cache = ScreenStateCache(path=tmp_path / "screen_cache.json", max_entries=2, enabled=True)
+    for i in range(3):
+        cache.put(f"window:{i}", "content", screen(), VISION)
+    assert cache.get("window:0", "content", screen()) is None
+    assert cache.get("window:2", "content", screen()) is not None
+    assert cache.get_stats()["evictions"] == 1
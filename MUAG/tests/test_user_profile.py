@@ -0,0 +1,50 @@
+"""
+Tests du profil utilisateur partagé entre threads (agents/user_profile.py)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import threading
+
+from agents.user_profile import UserProfile
+
+
+def make_profile(tmp_path):
+    profile = UserProfile(llm_client=None)
+    profile.profile_file = tmp_path / "user_profile.json"
+    return profile
+
+
+def test_snapshot_is_detached_from_profile(tmp_path):
+    profile = make_profile(tmp_path)
+    snapshot = profile.snapshot()
+    profile._merge_updates({"personality_notes": ["Préfère les réponses courtes"]})
+    assert snapshot["personality_notes"] == []
+    assert profile.snapshot()["personality_notes"] == ["Préfère les réponses courtes"]
+
+
+def test_reads_during_background_updates_do_not_fail(tmp_path):
+    profile = make_profile(tmp_path)
+    stop = threading.Event()
+
+    def background_updates():
+        i = 0
+        while not stop.is_set():
+            profile._merge_updates({
+                "preferences": {"favorites": {f"app_{i}": "Chrome"}},
+                "habits": {f"pattern_{i}": i},
+            })
+            profile.add_recent_activity(f"activité {i}")
+            i += 1
+
+    thread = threading.Thread(target=background_updates)
+    thread.start()
+    try:
+        for _ in range(200):
+            json.dumps(profile.snapshot(), ensure_ascii=False)
+    finally:
+        stop.set()
+        thread.join()
+    assert len(profile.snapshot()["context"]["recent_activities"]) <= 20
@@ -0,0 +1,37 @@
+"""
+Tests des statistiques d'encodage VLM (actions/vlm_image_encoder.py)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from actions.frame import Frame
+from actions.vlm_image_encoder import VLMImageEncoder
+
+
+def screenshot():
+    image = np.full((1080, 1920, 3), 245, dtype=np.uint8)
+    cv2.rectangle(image, (100, 100), (900, 160), (30, 30, 30), -1)
+    cv2.putText(image, "Rechercher", (120, 145), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+    return image
+
+
+def test_in_memory_frame_is_not_counted_as_savings():
+    encoder = VLMImageEncoder()
+    encoder.encode(Frame(screenshot(), "step_1.png"), "qwen2.5vl:3b")
+    stats = encoder.get_stats()
+    assert stats["bytes_raw"] == 1920 * 1080 * 3
+    assert stats["bytes_original"] == 0 and stats["bytes_saved"] == 0
+
+
+def test_file_savings_compare_against_the_png_on_disk(tmp_path):
+    path = tmp_path / "step_1.png"
+    cv2.imwrite(str(path), screenshot())
+    encoder = VLMImageEncoder()
+    _, info = encoder.encode(path, "qwen2.5vl:3b")
+    stats = encoder.get_stats()
+    assert stats["bytes_original"] == path.stat().st_size
+    assert stats["bytes_saved"] == path.stat().st_size - info["bytes"]
@@ -0,0 +1,61 @@
+"""
+Tests de l'attente de navigation après une action Playwright (actions/web_helper.py)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from actions.web_helper import WebHelper, PlaywrightTimeout
+
+
+class FakePage:
+    """Page factice: Enter change l'URL après `nav_delay` secondes (None = pas de navigation)"""
+
+    def __init__(self, nav_delay=None):
+        self.url = "https://www.youtube.com/"
+        self.nav_delay = nav_delay
+        self.pressed_at = None
+        self.calls = []
+
+    def press_enter(self):
+        self.pressed_at = time.time()
+
+    def wait_for_url(self, predicate, wait_until=None, timeout=None):
+        self.calls.append(("wait_for_url", wait_until))
+        if self.nav_delay is None or self.nav_delay * 1000 > timeout:
+            time.sleep(timeout / 1000)
+            raise PlaywrightTimeout("pas de navigation")
+        time.sleep(self.nav_delay)
+        self.url = "https://www.youtube.com/results?search_query=chat"
+        assert predicate(self.url)
+
+    def wait_for_load_state(self, state, timeout=None):
+        self.calls.append(("load_state", state))
+
+
+def make_helper(page):
+    helper = WebHelper.__new__(WebHelper)  # Sans connexion CDP
+    helper.page = page
+    helper.connected = True
+    return helper
+
+
+def test_waits_for_navigation_started_by_the_action():
+    page = FakePage(nav_delay=0.2)
+    assert make_helper(page).act_and_settle(page.press_enter, nav_wait_s=1.0)
+    assert page.calls[0] == ("wait_for_url", "commit")
+    assert ("load_state", "domcontentloaded") in page.calls[1:]
+
+
+def test_action_without_navigation_waits_the_floor():
+    page = FakePage(nav_delay=None)
+    start = time.time()
+    assert make_helper(page).act_and_settle(page.press_enter, nav_wait_s=0.2)
+    assert time.time() - start >= 0.2
+    assert ("load_state", "domcontentloaded") not in page.calls
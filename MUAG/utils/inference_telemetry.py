@@ -0,0 +1,162 @@
+"""
+Inference Telemetry - Statistiques par appel Ollama, agrégées par composant
+Chaque appel enregistre les durées renvoyées par Ollama (total, chargement,
+évaluation du prompt, génération) et le nombre de tokens, tagués par le
+composant appelant (intent, vlm1, vlm2, memory, profile, orchestrator...).
+"""
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config import TELEMETRY_DIR, TELEMETRY_MAX_RECORDS
+
+NS_PER_S = 1e9
+
+
+class InferenceTelemetry:
+    """Collecteur de métriques d'inférence pour la session courante"""
+
+    def __init__(self, max_records: Optional[int] = None):
+        self.max_records = max_records or TELEMETRY_MAX_RECORDS
+        self.records: List[Dict] = []
+        self.lock = threading.Lock()
+        self.session_start = time.time()
+
+    def record(
+        self,
+        component: str,
+        model: str,
+        kind: str,
+        wall_s: float,
+        data: Optional[Dict] = None,
+        ttft_s: Optional[float] = None,
+        cached: bool = False,
+        streamed_tokens: int = 0,
+    ) -> Dict:
+        """
+        Enregistre un appel
+        Args:
+            data: réponse Ollama (ou dernier chunk du flux) contenant les durées en ns
+            streamed_tokens: chunks reçus si le flux a été coupé avant les statistiques finales
+        """
+        data = data or {}
+        entry = {
+            "time": time.time(),
+            "component": component,
+            "model": model,
+            "kind": kind,
+            "cached": cached,
+            "wall_s": wall_s,
+            "ttft_s": ttft_s,
+            "total_s": data.get("total_duration", 0) / NS_PER_S,
+            "load_s": data.get("load_duration", 0) / NS_PER_S,
+            "prompt_eval_count": data.get("prompt_eval_count", 0),
+            "prompt_eval_s": data.get("prompt_eval_duration", 0) / NS_PER_S,
+            "eval_count": data.get("eval_count", 0),
+            "eval_s": data.get("eval_duration", 0) / NS_PER_S,
+        }
+        # Flux interrompu (coupure JSON): pas de statistiques finales, estimation côté client
+        if not entry["eval_count"] and streamed_tokens:
+            entry["eval_count"] = streamed_tokens
+            entry["eval_s"] = max(wall_s - (ttft_s or 0.0), 0.0)
+            entry["estimated"] = True
+
+        with self.lock:
+            self.records.append(entry)
+            if len(self.records) > self.max_records:
+                del self.records[: len(self.records) - self.max_records]
+        return entry
+
+    def reset(self):
+        """Démarre une nouvelle session"""
+        with self.lock:
+            self.records = []
+            self.session_start = time.time()
+
+    # ============================================
+    # RAPPORTS
+    # ============================================
+
+    def get_report(self, since: Optional[float] = None) -> Dict:
+        """
+        Agrège les appels par composant
+        Returns:
+            {component: {calls, cached, wall_s, avg_s, p95_s, load_s, prompt_tokens,
+                         prompt_eval_s, gen_tokens, eval_s, prompt_tps, gen_tps}}
+        """
+        with self.lock:
+            records = [r for r in self.records if since is None or r["time"] >= since]
+
+        report = {}
+        for r in records:
+            comp = report.setdefault(r["component"], {
+                "calls": 0, "cached": 0, "wall_s": 0.0, "load_s": 0.0,
+                "prompt_tokens": 0, "prompt_eval_s": 0.0,
+                "gen_tokens": 0, "eval_s": 0.0, "_latencies": [],
+            })
+            comp["calls"] += 1
+            comp["cached"] += int(r["cached"])
+            comp["wall_s"] += r["wall_s"]
+            comp["load_s"] += r["load_s"]
+            comp["prompt_tokens"] += r["prompt_eval_count"]
+            comp["prompt_eval_s"] += r["prompt_eval_s"]
+            comp["gen_tokens"] += r["eval_count"]
+            comp["eval_s"] += r["eval_s"]
+            comp["_latencies"].append(r["wall_s"])
+
+        for comp in report.values():
+            latencies = sorted(comp.pop("_latencies"))
+            comp["avg_s"] = comp["wall_s"] / comp["calls"]
+            comp["p95_s"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            comp["prompt_tps"] = (
+                comp["prompt_tokens"] / comp["prompt_eval_s"] if comp["prompt_eval_s"] else 0.0
+            )
+            comp["gen_tps"] = comp["gen_tokens"] / comp["eval_s"] if comp["eval_s"] else 0.0
+        return report
+
+    def format_report(self, since: Optional[float] = None) -> str:
+        """Tableau lisible (trié par temps total décroissant)"""
+        report = self.get_report(since)
+        if not report:
+            return "[Telemetry] Aucun appel enregistré"
+
+        total = sum(c["wall_s"] for c in report.values())
+        lines = [
+            f"[Telemetry] {sum(c['calls'] for c in report.values())} appels, {total:.1f}s d'inférence",
+            f"  {'composant':<14}{'appels':>7}{'cache':>6}{'total':>9}{'moy':>8}{'p95':>8}"
+            f"{'load':>8}{'prompt tok/s':>14}{'gen tok/s':>11}",
+        ]
+        for name, c in sorted(report.items(), key=lambda item: -item[1]["wall_s"]):
+            lines.append(
+                f"  {name:<14}{c['calls']:>7}{c['cached']:>6}{c['wall_s']:>8.1f}s"
+                f"{c['avg_s']:>7.2f}s{c['p95_s']:>7.2f}s{c['load_s']:>7.1f}s"
+                f"{c['prompt_tps']:>14.0f}{c['gen_tps']:>11.1f}"
+            )
+        return "\n".join(lines)
+
+    def save_report(self, path=None):
+        """Sauvegarde le rapport de session (JSON) dans TELEMETRY_DIR"""
+        if path is None:
+            stamp = datetime.fromtimestamp(self.session_start).strftime("%Y%m%d_%H%M%S")
+            path = TELEMETRY_DIR / f"session_{stamp}.json"
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "session_start": datetime.fromtimestamp(self.session_start).isoformat(),
+                        "report": self.get_report(),
+                    },
+                    f,
+                    ensure_ascii=False,
+                    indent=2,
+                )
+            return path
+        except Exception as e:
+            print(f"[Telemetry] Erreur sauvegarde rapport: {e}")
+            return None
+
+
+# Instance globale (session courante)
+inference_telemetry = InferenceTelemetry()
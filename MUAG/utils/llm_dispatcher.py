@@ -0,0 +1,220 @@
+"""
+LLM Dispatcher - File de priorité devant l'instance Ollama locale
+Trois classes de requêtes:
+- interactive : réponse à l'utilisateur (conversation, intention, commande simple)
+- agent_step  : étapes d'agent (CUA, orchestrateur)
+- background  : mémoire, profil, consolidation (différables et fusionnables)
+
+Les requêtes background ne démarrent que si aucune requête prioritaire n'est en
+cours ou en attente depuis BACKGROUND_IDLE_DELAY_S: elles ne retardent jamais
+la réponse parlée.
+"""
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from config import LLM_MAX_CONCURRENT, BACKGROUND_IDLE_DELAY_S
+
+PRIORITIES = {"interactive": 0, "agent_step": 1, "background": 2}
+
+
+class LLMDispatcher:
+    """Attribue les créneaux d'inférence par priorité et exécute les tâches de fond"""
+
+    def __init__(self, max_concurrent: Optional[int] = None, idle_delay_s: Optional[float] = None):
+        self.max_concurrent = max_concurrent or LLM_MAX_CONCURRENT
+        self.idle_delay_s = BACKGROUND_IDLE_DELAY_S if idle_delay_s is None else idle_delay_s
+        self.cond = threading.Condition()
+        self.waiting = []  # heap de (priorité, séquence)
+        self.seq = itertools.count()
+        self.active = {name: 0 for name in PRIORITIES}
+        self.last_foreground = 0.0
+        self.local = threading.local()
+
+        # Tâches de fond: clé → (fn, args, kwargs, future)
+        self.jobs: "OrderedDict[object, tuple]" = OrderedDict()
+        self.worker = None
+        self.running_job = False
+
+        self.stats = {
+            name: {"calls": 0, "wait_s": 0.0, "max_wait_s": 0.0} for name in PRIORITIES
+        }
+        self.stats["jobs"] = {"submitted": 0, "coalesced": 0, "deferred": 0, "failed": 0}
+
+    # ============================================
+    # CRÉNEAUX D'INFÉRENCE
+    # ============================================
+
+    def current_priority(self) -> Optional[str]:
+        """Priorité imposée au thread courant (ex: 'background' dans une tâche de fond)"""
+        return getattr(self.local, "priority", None)
+
+    @contextmanager
+    def slot(self, priority: str = "agent_step"):
+        """Bloque jusqu'à obtenir un créneau d'inférence pour cette priorité"""
+        priority = self.current_priority() or priority
+        if priority not in PRIORITIES:
+            priority = "agent_step"
+        entry = (PRIORITIES[priority], next(self.seq))
+        start = time.time()
+
+        with self.cond:
+            heapq.heappush(self.waiting, entry)
+            deferred = False
+            while not self._can_start(entry, priority):
+                if priority == "background" and not deferred:
+                    deferred = True
+                    self.stats["jobs"]["deferred"] += 1
+                self.cond.wait(timeout=self.idle_delay_s or 0.5)
+            heapq.heappop(self.waiting)
+            self.active[priority] += 1
+            waited = time.time() - start
+            stats = self.stats[priority]
+            stats["calls"] += 1
+            stats["wait_s"] += waited
+            stats["max_wait_s"] = max(stats["max_wait_s"], waited)
+            self.cond.notify_all()
+
+        try:
+            yield waited
+        finally:
+            with self.cond:
+                self.active[priority] -= 1
+                if priority != "background":
+                    self.last_foreground = time.time()
+                self.cond.notify_all()
+
+    def _can_start(self, entry, priority: str) -> bool:
+        """Appelé sous verrou"""
+        if self.waiting[0] != entry:
+            return False
+        if sum(self.active.values()) >= self.max_concurrent:
+            return False
+        if priority == "background":
+            foreground_active = self.active["interactive"] + self.active["agent_step"]
+            if foreground_active:
+                return False
+            if time.time() - self.last_foreground < self.idle_delay_s:
+                return False
+        return True
+
+    # ============================================
+    # TÂCHES DE FOND
+    # ============================================
+
+    def submit_background(self, fn: Callable, *args, key=None, **kwargs) -> Future:
+        """
+        Planifie une tâche de fond (ses appels LLM passent en priorité background)
+        key: si une tâche de même clé est déjà en attente, elle est remplacée
+             (seule la plus récente est exécutée)
+        """
+        future = Future()
+        with self.cond:
+            self.stats["jobs"]["submitted"] += 1
+            if key is None:
+                key = ("job", next(self.seq))
+            elif key in self.jobs:
+                _, _, _, previous = self.jobs.pop(key)
+                self.stats["jobs"]["coalesced"] += 1
+                # L'appelant précédent reçoit le résultat de la tâche fusionnée
+                future.add_done_callback(lambda f, p=previous: _chain(f, p))
+            self.jobs[key] = (fn, args, kwargs, future)
+            self._ensure_worker()
+            self.cond.notify_all()
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Attend la fin des tâches de fond (ex: avant consolidation à la fermeture)"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self.cond:
+            while self.jobs or self.running_job:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.cond.wait(timeout=remaining)
+        return True
+
+    def _ensure_worker(self):
+        """Appelé sous verrou"""
+        if self.worker is None or not self.worker.is_alive():
+            self.worker = threading.Thread(
+                target=self._worker_loop, name="llm-background", daemon=True
+            )
+            self.worker.start()
+
+    def _worker_loop(self):
+        self.local.priority = "background"
+        while True:
+            with self.cond:
+                while not self.jobs:
+                    self.cond.wait()
+                _, (fn, args, kwargs, future) = self.jobs.popitem(last=False)
+                self.running_job = True
+            try:
+                if future.set_running_or_notify_cancel():
+                    future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                self.stats["jobs"]["failed"] += 1
+                print(f"[Dispatcher] Erreur tâche de fond {getattr(fn, '__name__', fn)}: {e}")
+                future.set_exception(e)
+            finally:
+                with self.cond:
+                    self.running_job = False
+                    self.cond.notify_all()
+
+    # ============================================
+    # OBSERVABILITÉ
+    # ============================================
+
+    def get_status(self) -> Dict:
+        """Profondeur de file, créneaux actifs et temps d'attente par classe"""
+        with self.cond:
+            depth = {name: 0 for name in PRIORITIES}
+            by_level = {level: name for name, level in PRIORITIES.items()}
+            for level, _ in self.waiting:
+                depth[by_level[level]] += 1
+            status = {
+                "queue_depth": depth,
+                "active": dict(self.active),
+                "background_jobs_pending": len(self.jobs),
+                "jobs": dict(self.stats["jobs"]),
+                "wait": {},
+            }
+            for name in PRIORITIES:
+                s = self.stats[name]
+                status["wait"][name] = {
+                    "calls": s["calls"],
+                    "avg_s": s["wait_s"] / s["calls"] if s["calls"] else 0.0,
+                    "max_s": s["max_wait_s"],
+                }
+            return status
+
+    def format_status(self) -> str:
+        status = self.get_status()
+        waits = ", ".join(
+            f"{name} {w['avg_s']:.2f}s moy/{w['max_s']:.2f}s max ({w['calls']})"
+            for name, w in status["wait"].items()
+        )
+        return (
+            f"[Dispatcher] file={status['queue_depth']} actifs={status['active']} "
+            f"fond={status['background_jobs_pending']} {status['jobs']}\n"
+            f"  attente: {waits}"
+        )
+
+
+def _chain(source: Future, target: Future):
+    """Recopie le résultat d'une tâche fusionnée vers le Future remplacé"""
+    if target.set_running_or_notify_cancel():
+        if source.exception() is not None:
+            target.set_exception(source.exception())
+        else:
+            target.set_result(source.result())
+
+
+# Instance globale partagée par tous les clients Ollama
+llm_dispatcher = LLMDispatcher()
@@ -0,0 +1,372 @@
+"""
+Model Residency Manager - Coordination de la VRAM partagée entre tous les modèles
+VLM planificateur, VLM exécuteur, LLM texte, Florence-2, PaddleOCR, Whisper et XTTS
+partagent le même GPU : ce module décide quoi garder, évincer ou précharger
+pour l'étape suivante du pipeline, et journalise chaque décision.
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from config import (
+    GPU_VRAM_BUDGET_MB,
+    MODEL_VRAM_FOOTPRINTS_MB,
+    DEFAULT_MODEL_FOOTPRINT_MB,
+    PIPELINE_STAGE_MODELS,
+    RESIDENCY_LOG_SIZE,
+)
+
+
+class ModelResidencyManager:
+    """
+    Gestionnaire central de résidence des modèles en VRAM
+
+    Chaque modèle est enregistré avec:
+    - son empreinte VRAM (MODEL_VRAM_FOOTPRINTS_MB)
+    - une fonction de chargement / déchargement (optionnelles)
+    - pinned: jamais évincé (ex: Whisper, impossible à déplacer)
+
+    Les propriétaires appellent acquire() avant usage et release() après.
+    Le gestionnaire évince les modèles les moins récemment utilisés si le budget
+    GPU_VRAM_BUDGET_MB est dépassé, et peut précharger les modèles d'une étape
+    (prepare_stage) en arrière-plan.
+
+    Les décisions sont prises sous self.lock; les chargements / déchargements
+    (plusieurs secondes) s'exécutent hors verrou, sérialisés par modèle.
+    load_fn signale un échec en levant une exception ou en retournant False.
+    """
+
+    def __init__(self):
+        self.budget_mb = GPU_VRAM_BUDGET_MB
+        self.models: Dict[str, Dict] = {}
+        self.lock = threading.RLock()
+        self.decision_log = deque(maxlen=RESIDENCY_LOG_SIZE)
+        self.stats = {
+            "cold_loads": 0,
+            "warm_hits": 0,
+            "evictions": 0,
+            "prefetches": 0,
+            "overcommits": 0,
+        }
+
+    # ============================================
+    # ENREGISTREMENT
+    # ============================================
+
+    def register(
+        self,
+        name: str,
+        load_fn: Optional[Callable] = None,
+        unload_fn: Optional[Callable] = None,
+        footprint_mb: Optional[int] = None,
+        pinned: bool = False,
+        resident: bool = False,
+        ttl_s: Optional[float] = None,
+    ):
+        """
+        Enregistre un modèle (idempotent: un second enregistrement ne fait que
+        compléter les callbacks manquants)
+        ttl_s: le modèle est considéré déchargé après ttl_s secondes d'inactivité
+               (keep_alive Ollama)
+        """
+        with self.lock:
+            entry = self.models.get(name)
+            if entry is None:
+                entry = {
+                    "footprint_mb": footprint_mb
+                    or MODEL_VRAM_FOOTPRINTS_MB.get(name, DEFAULT_MODEL_FOOTPRINT_MB),
+                    "load": load_fn,
+                    "unload": unload_fn,
+                    "pinned": pinned,
+                    "resident": resident,
+                    "in_use": 0,
+                    "last_used": time.time() if resident else 0.0,
+                    "ttl_s": ttl_s,
+                    "transition": threading.Lock(),  # Chargement / déchargement en cours
+                }
+                self.models[name] = entry
+                if resident:
+                    self._log("register", name, "déjà chargé")
+            else:
+                entry["load"] = entry["load"] or load_fn
+                entry["unload"] = entry["unload"] or unload_fn
+                entry["pinned"] = entry["pinned"] or pinned
+                if resident:
+                    entry["resident"] = True
+            return entry
+
+    # ============================================
+    # CYCLE DE VIE
+    # ============================================
+
+    def acquire(self, name: str, reason: str = "") -> bool:
+        """
+        Réserve un modèle avant usage (charge si nécessaire, évince si besoin)
+        Returns:
+            bool: True si le modèle était déjà chaud (pas de chargement à froid)
+        Raises:
+            l'erreur de load_fn si le chargement échoue (réservation annulée)
+        """
+        with self.lock:
+            self._expire()
+            entry = self.models.get(name) or self.register(name)
+            entry["in_use"] += 1
+            entry["last_used"] = time.time()
+            if entry["resident"]:
+                self.stats["warm_hits"] += 1
+                self._log("warm_hit", name, reason)
+                return True
+            victims = self._make_room(name, reason)
+            load_fn = entry["load"]
+
+        # Déchargements puis chargement hors verrou (peuvent prendre plusieurs secondes)
+        self._unload(victims)
+        try:
+            loaded = self._load(name, load_fn, reason)
+        except Exception:
+            self.release(name)
+            raise
+        with self.lock:
+            if loaded:
+                self.stats["cold_loads"] += 1
+                self._log("load", name, reason)
+            else:
+                self.stats["warm_hits"] += 1
+                self._log("warm_hit", name, "chargé par un appel concurrent")
+        return not loaded
+
+    def release(self, name: str):
+        """Libère la réservation d'un modèle (il reste chargé jusqu'à éviction)"""
+        with self.lock:
+            entry = self.models.get(name)
+            if entry is None:
+                return
+            entry["in_use"] = max(0, entry["in_use"] - 1)
+            entry["last_used"] = time.time()
+
+    def prefetch(self, name: str, reason: str = "") -> Optional[threading.Thread]:
+        """Précharge un modèle en arrière-plan (ex: VLM #2 pendant OmniParser)"""
+        with self.lock:
+            self._expire()
+            entry = self.models.get(name) or self.register(name)
+            if entry["resident"]:
+                return None
+            # Réserver pendant le chargement pour éviter une éviction concurrente
+            entry["in_use"] += 1
+
+        def _worker():
+            try:
+                with self.lock:
+                    victims = self._make_room(name, reason)
+                    load_fn = entry["load"]
+                self._unload(victims)
+                if self._load(name, load_fn, reason):
+                    with self.lock:
+                        entry["last_used"] = time.time()
+                        self.stats["prefetches"] += 1
+                        self._log("prefetch", name, reason)
+            except Exception:
+                pass  # Déjà journalisé par _load; le prochain acquire() réessaiera
+            finally:
+                self.release(name)
+
+        thread = threading.Thread(target=_worker, name=f"prefetch-{name}", daemon=True)
+        thread.start()
+        return thread
+
+    def prepare_stage(self, stage: str) -> List[threading.Thread]:
+        """Précharge tous les modèles associés à une étape du pipeline"""
+        threads = []
+        for name in PIPELINE_STAGE_MODELS.get(stage, []):
+            thread = self.prefetch(name, reason=f"étape {stage}")
+            if thread:
+                threads.append(thread)
+        return threads
+
+    def evict(self, name: str, reason: str = "") -> bool:
+        """Décharge un modèle de la VRAM (refusé si épinglé ou en cours d'usage)"""
+        with self.lock:
+            victim = self._mark_evicted(name, reason)
+        if victim is None:
+            return False
+        self._unload([victim])
+        return True
+
+    def mark_unloaded(self, name: str):
+        """Signale qu'un modèle a été déchargé par son propriétaire"""
+        with self.lock:
+            entry = self.models.get(name)
+            if entry is not None and entry["resident"]:
+                entry["resident"] = False
+                self._log("unloaded", name, "par le propriétaire")
+
+    def enforce_budget(self, reason: str = "") -> int:
+        """Évince les modèles LRU tant que le budget VRAM est dépassé"""
+        with self.lock:
+            self._expire()
+            victims = self._evict_until(self.budget_mb, exclude=None, reason=reason)
+        self._unload(victims)
+        return len(victims)
+
+    # ============================================
+    # INTERNE
+    # ============================================
+
+    def _make_room(self, name: str, reason: str) -> List:
+        """
+        Choisit les modèles à évincer pour charger `name` (appelé sous verrou)
+        Returns:
+            victimes [(nom, unload_fn)] à décharger par l'appelant hors verrou
+        """
+        needed = self.models[name]["footprint_mb"]
+        victims = self._evict_until(self.budget_mb - needed, exclude=name, reason=f"place pour {name}")
+        if self.used_mb() + needed > self.budget_mb:
+            self.stats["overcommits"] += 1
+            self._log("overcommit", name, reason or "budget insuffisant")
+        return victims
+
+    def _mark_evicted(self, name: str, reason: str):
+        """Marque un modèle évincé (appelé sous verrou), retourne (nom, unload_fn) ou None"""
+        entry = self.models.get(name)
+        if entry is None or not entry["resident"]:
+            return None
+        if entry["pinned"] or entry["in_use"] > 0:
+            self._log("skip_evict", name, reason or "épinglé ou en cours d'usage")
+            return None
+        entry["resident"] = False
+        self.stats["evictions"] += 1
+        self._log("evict", name, reason)
+        return name, entry["unload"]
+
+    def _evict_until(self, target_mb: float, exclude: Optional[str], reason: str) -> List:
+        """Victimes LRU jusqu'à target_mb (appelé sous verrou, déchargement par l'appelant)"""
+        victims = []
+        candidates = sorted(
+            (
+                (entry["last_used"], model)
+                for model, entry in self.models.items()
+                if entry["resident"]
+                and not entry["pinned"]
+                and entry["in_use"] == 0
+                and model != exclude
+            ),
+        )
+        for _, model in candidates:
+            if self.used_mb() <= target_mb:
+                break
+            victim = self._mark_evicted(model, reason)
+            if victim is not None:
+                victims.append(victim)
+        return victims
+
+    def _unload(self, victims: List):
+        """Exécute les unload_fn des victimes (hors verrou)"""
+        for name, unload_fn in victims:
+            if not unload_fn:
+                continue
+            with self.models[name]["transition"]:
+                try:
+                    unload_fn()
+                except Exception as e:
+                    print(f"[Residency] Erreur déchargement {name}: {e}")
+
+    def _expire(self):
+        """Marque déchargés les modèles dont le keep_alive a expiré (appelé sous verrou)"""
+        now = time.time()
+        for model, entry in self.models.items():
+            if (
+                entry["resident"]
+                and entry["ttl_s"] is not None
+                and entry["in_use"] == 0
+                and now - entry["last_used"] > entry["ttl_s"]
+            ):
+                entry["resident"] = False
+                self._log("expired", model, f"inactif > {entry['ttl_s']:.0f}s")
+
+    def _load(self, name: str, load_fn: Optional[Callable], reason: str) -> bool:
+        """
+        Exécute load_fn (hors verrou) et marque le modèle résident; l'échec est
+        propagé, le modèle reste non résident
+        Returns:
+            False si un appel concurrent l'a chargé entre-temps (load_fn non rappelé)
+        """
+        entry = self.models[name]
+        start = time.time()
+        # Attend un déchargement ou un chargement en cours du même modèle
+        with entry["transition"]:
+            with self.lock:
+                if entry["resident"]:
+                    return False
+            if load_fn:
+                try:
+                    if load_fn() is False:
+                        raise RuntimeError("load_fn a retourné False")
+                except Exception as e:
+                    print(f"[Residency] Erreur chargement {name}: {e}")
+                    with self.lock:
+                        self._log("load_failed", name, str(e))
+                    raise
+            # Marqué sous transition: un chargement concurrent en attente le verra
+            with self.lock:
+                entry["resident"] = True
+        elapsed = time.time() - start
+        if elapsed > 0.5:
+            print(f"[Residency] {name} chargé en {elapsed:.1f}s ({reason or 'usage'})")
+        return True
+
+    def _log(self, action: str, name: str, reason: str = ""):
+        self.decision_log.append({
+            "time": time.time(),
+            "action": action,
+            "model": name,
+            "reason": reason,
+            "vram_mb": self.used_mb(),
+        })
+
+    # ============================================
+    # INSPECTION
+    # ============================================
+
+    def used_mb(self) -> float:
+        """VRAM estimée occupée par les modèles résidents"""
+        return sum(e["footprint_mb"] for e in self.models.values() if e["resident"])
+
+    def is_resident(self, name: str) -> bool:
+        entry = self.models.get(name)
+        return bool(entry and entry["resident"])
+
+    def get_status(self) -> Dict:
+        """État courant: modèles résidents, VRAM estimée, compteurs"""
+        with self.lock:
+            self._expire()
+            return {
+                "budget_mb": self.budget_mb,
+                "used_mb": self.used_mb(),
+                "resident": [n for n, e in self.models.items() if e["resident"]],
+                "stats": dict(self.stats),
+            }
+
+    def get_decision_log(self, last: Optional[int] = None) -> List[Dict]:
+        """Retourne les décisions récentes (les plus anciennes d'abord)"""
+        with self.lock:
+            entries = list(self.decision_log)
+        return entries[-last:] if last else entries
+
+    def format_decision_log(self, last: int = 20) -> str:
+        """Journal lisible des dernières décisions"""
+        lines = [
+            f"[Residency] VRAM {self.used_mb():.0f}/{self.budget_mb}MB - {self.stats}"
+        ]
+        for entry in self.get_decision_log(last):
+            stamp = time.strftime("%H:%M:%S", time.localtime(entry["time"]))
+            line = f"  {stamp} {entry['action']:<11} {entry['model']}"
+            if entry["reason"]:
+                line += f" ({entry['reason']})"
+            line += f" → {entry['vram_mb']:.0f}MB"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+# Instance globale partagée par tous les agents
+residency_manager = ModelResidencyManager()
@@ -1,37 +1,270 @@
+import asyncio
+import functools
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from config import OLLAMA_URL, OLLAMA_MODEL, TIMEOUT_OLLAMA
+from requests.adapters import HTTPAdapter
+from config import (
+    OLLAMA_URL,
+    OLLAMA_MODEL,
+    TIMEOUT_OLLAMA,
+    OLLAMA_RESIDENCY_POLICY,
+    OLLAMA_RESIDENCY_OVERRIDES,
+    OLLAMA_KEEP_ALIVE,
+    OLLAMA_POOL_SIZE,
+)
+from utils.model_residency import residency_manager
+from utils.response_cache import response_cache, ResponseCache
+from utils.inference_telemetry import inference_telemetry
+from utils.llm_dispatcher import llm_dispatcher
+
+RESIDENCY_POLICIES = ("pin", "ttl", "pressure", "evict")
+
+# Session HTTP partagée par tous les clients (évite un handshake TCP par appel)
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Retourne la session requests partagée (pool de connexions vers Ollama)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=OLLAMA_POOL_SIZE,
+                    pool_maxsize=OLLAMA_POOL_SIZE,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+# Threads d'exécution des appels asynchrones (un par connexion du pool HTTP)
+_executor = None
+
+
+def get_executor():
+    """Retourne le pool de threads partagé par les appels agenerate*()"""
+    global _executor
+    if _executor is None:
+        with _session_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=OLLAMA_POOL_SIZE,
+                    thread_name_prefix="ollama",
+                )
+    return _executor
+
+
+async def to_async(func, *args, **kwargs):
+    """Exécute une fonction bloquante (ex: méthode d'agent qui appelle le LLM) dans le pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def run_concurrently(*awaitables):
+    """
+    Lance plusieurs appels asynchrones en parallèle depuis du code synchrone
+    Returns:
+        list: les résultats dans l'ordre des arguments
+    """
+    async def _gather():
+        return await asyncio.gather(*awaitables)
+
+    return asyncio.run(_gather())
+
+
+def api_url(endpoint):
+    """Construit l'URL d'un autre endpoint Ollama à partir de OLLAMA_URL (ex: 'ps')"""
+    return OLLAMA_URL.rsplit("/api/", 1)[0] + f"/api/{endpoint}"
+
+
+def _duration_seconds(value):
+    """Convertit une durée keep_alive Ollama ("10m", "30s", "1h", 300) en secondes"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    units = {"s": 1, "m": 60, "h": 3600}
+    value = str(value).strip()
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+class JsonStreamParser:
+    """
+    Détecte le premier objet JSON complet dans un flux de texte
+    Suit l'équilibre des accolades en ignorant celles contenues dans les chaînes
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.start = -1
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+
+    def feed(self, chunk):
+        """
+        Ajoute un fragment de texte
+        Returns:
+            dict | None: l'objet dès qu'il est complet et parseable
+        """
+        offset = len(self.buffer)
+        self.buffer += chunk
+        for i in range(offset, len(self.buffer)):
+            char = self.buffer[i]
+            if self.start == -1:
+                if char == "{":
+                    self.start, self.depth = i, 1
+                continue
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == "{":
+                self.depth += 1
+            elif char == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    try:
+                        result = json.loads(self.buffer[self.start:i + 1])
+                    except json.JSONDecodeError:
+                        result = None
+                    if isinstance(result, dict):
+                        return result
+                    # Objet invalide: chercher le suivant
+                    self.start = -1
+        return None
+
+
+def extract_json(text):
+    """Premier objet JSON parseable d'une réponse complète (ou None)"""
+    return JsonStreamParser().feed(text or "")
+
 
 class OllamaClient:
-    def __init__(self, model=None):
+    def __init__(self, model=None, residency=None, component="llm", priority="agent_step"):
         self.model = model or OLLAMA_MODEL
+        self.component = component  # Tag télémétrie (intent, vlm1, vlm2, memory...)
+        self.priority = priority    # interactive / agent_step / background (llm_dispatcher)
         self.base_url = OLLAMA_URL
-    
+        self.session = get_session()
+        # Texte brut / erreur / métriques du dernier appel (par thread: appels concurrents possibles)
+        self._last = threading.local()
+        self.residency = residency or OLLAMA_RESIDENCY_OVERRIDES.get(
+            self.model, OLLAMA_RESIDENCY_POLICY
+        )
+        if self.residency not in RESIDENCY_POLICIES:
+            print(f"[Ollama] Politique de résidence inconnue '{self.residency}', fallback: ttl")
+            self.residency = "ttl"
+
+        # Enregistrement auprès du gestionnaire VRAM partagé
+        residency_manager.register(
+            self.model,
+            load_fn=self.preload if self.residency != "evict" else None,
+            unload_fn=lambda: self.unload(force=True),
+            pinned=self.residency == "pin",
+            ttl_s=_duration_seconds(OLLAMA_KEEP_ALIVE) if self.residency == "ttl" else None,
+        )
+
+    @property
+    def last_response(self):
+        return getattr(self._last, "response", "")
+
+    @last_response.setter
+    def last_response(self, value):
+        self._last.response = value
+
+    @property
+    def last_error(self):
+        return getattr(self._last, "error", None)
+
+    @last_error.setter
+    def last_error(self, value):
+        self._last.error = value
+
+    @property
+    def last_metrics(self):
+        """Métriques du dernier appel: ttft_s, prompt_eval_count, prompt_eval_s, cached"""
+        return getattr(self._last, "metrics", {})
+
+    def _record_metrics(self, data=None, ttft_s=None, cached=False):
+        data = data or {}
+        metrics = {"cached": cached}
+        if ttft_s is not None:
+            metrics["ttft_s"] = ttft_s
+        if "prompt_eval_count" in data:
+            metrics["prompt_eval_count"] = data["prompt_eval_count"]
+        if "prompt_eval_duration" in data:
+            metrics["prompt_eval_s"] = data["prompt_eval_duration"] / 1e9
+        self._last.metrics = metrics
+
+    def _keep_alive(self):
+        """Valeur keep_alive envoyée à Ollama selon la politique de résidence"""
+        if self.residency == "evict":
+            return 0
+        if self.residency == "ttl":
+            return OLLAMA_KEEP_ALIVE
+        # pin / pressure : le modèle reste chargé, l'éviction est décidée par unload()
+        return -1
+
     def generate(self, prompt, system_prompt=None, max_tokens=None, temperature=None):
         payload = {
             "model": self.model,
             "prompt": prompt,
             "stream": False,
             "system": system_prompt,
-            "keep_alive": 0,
+            "keep_alive": self._keep_alive(),
             "options": {}
         }
-        
+
         # Ajouter options si spécifiées
         if temperature is not None:
             payload["options"]["temperature"] = temperature
         if max_tokens is not None:
             payload["options"]["num_predict"] = max_tokens
-        
+
+        self._record_metrics()
+        cache_key = self._cache_key(payload)
+        if cache_key:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                self._record_metrics(cached=True)
+                inference_telemetry.record(self.component, self.model, "text", 0.0, cached=True)
+                return cached
+
         try:
-            response = requests.post(
+            self._before_call()
+            start = time.time()
+            response = self.session.post(
                 self.base_url,
                 json=payload,
                 timeout=TIMEOUT_OLLAMA
             )
-            return response.json()["response"]
+            data = response.json()
+            self._record_metrics(data)
+            inference_telemetry.record(
+                self.component, self.model, "text", time.time() - start, data
+            )
+            text = data["response"]
+            if cache_key:
+                response_cache.put(cache_key, self.model, text)
+            return text
         except Exception as e:
             return f"Erreur Ollama: {e}"
-    
+        finally:
+            self._after_call()
+
     def generate_with_image(self, prompt, image_base64, system_prompt=None):
         """
         Génère une réponse avec un VLM (Vision-Language Model)
@@ -47,45 +280,282 @@ class OllamaClient:
             "prompt": prompt,
             "stream": False,
             "images": [image_base64],  # Ollama accepte une liste d'images en base64
-            "keep_alive": 0,  # Libère la mémoire immédiatement après
+            "keep_alive": self._keep_alive(),  # Résidence VRAM selon la politique
             "options": {
                 "temperature": 0.0,  # Déterministe (pas d'aléatoire)
                 "seed": 42,          # Reproductibilité
             }
         }
 
-        
+
         if system_prompt:
             payload["system"] = system_prompt
-        
+
+        self._record_metrics()
+        cache_key = self._cache_key(payload)
+        if cache_key:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                self._record_metrics(cached=True)
+                inference_telemetry.record(self.component, self.model, "image", 0.0, cached=True)
+                return cached
+
         try:
-            response = requests.post(
+            self._before_call()
+            start = time.time()
+            response = self.session.post(
                 self.base_url,
                 json=payload,
                 timeout=TIMEOUT_OLLAMA * 2  # VLM prend plus de temps
             )
-            return response.json()["response"]
+            data = response.json()
+            self._record_metrics(data)
+            inference_telemetry.record(
+                self.component, self.model, "image", time.time() - start, data
+            )
+            text = data["response"]
+            if cache_key:
+                response_cache.put(cache_key, self.model, text)
+            return text
         except Exception as e:
             return f"Erreur VLM Ollama: {e}"
-    
-    # Ajouter à la fin de la classe, après la méthode generate_with_image :
+        finally:
+            self._after_call()
+
+    def generate_json(self, prompt, system_prompt=None, max_tokens=None, temperature=None):
+        """
+        Comme generate(), mais en streaming: la requête est interrompue dès qu'un
+        objet JSON complet est reçu (le modèle ne génère pas la prose qui suit)
+        Returns:
+            dict | None: l'objet parsé (None si erreur ou aucun JSON, voir last_error)
+        """
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "system": system_prompt,
+            "keep_alive": self._keep_alive(),
+            "options": {}
+        }
+        if temperature is not None:
+            payload["options"]["temperature"] = temperature
+        if max_tokens is not None:
+            payload["options"]["num_predict"] = max_tokens
+
+        return self._stream_json(payload, TIMEOUT_OLLAMA)
 
-    def unload(self):
+    def generate_with_image_json(self, prompt, image_base64, system_prompt=None):
         """
-        Force le déchargement du modèle de la VRAM
-        Envoie une requête vide avec keep_alive=0
+        Comme generate_with_image(), avec coupure dès le premier objet JSON complet
+        Returns:
+            dict | None: l'objet parsé (None si erreur ou aucun JSON, voir last_error)
         """
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "images": [image_base64],
+            "keep_alive": self._keep_alive(),
+            "options": {
+                "temperature": 0.0,
+                "seed": 42,
+            }
+        }
+        if system_prompt:
+            payload["system"] = system_prompt
+
+        return self._stream_json(payload, TIMEOUT_OLLAMA * 2)
+
+    # ============================================
+    # API ASYNCHRONE (compatible asyncio.gather)
+    # ============================================
+
+    async def agenerate(self, prompt, system_prompt=None, max_tokens=None, temperature=None):
+        """Version asynchrone de generate()"""
+        return await to_async(self.generate, prompt, system_prompt, max_tokens, temperature)
+
+    async def agenerate_with_image(self, prompt, image_base64, system_prompt=None):
+        """Version asynchrone de generate_with_image()"""
+        return await to_async(self.generate_with_image, prompt, image_base64, system_prompt)
+
+    async def agenerate_json(self, prompt, system_prompt=None, max_tokens=None, temperature=None):
+        """Version asynchrone de generate_json()"""
+        return await to_async(self.generate_json, prompt, system_prompt, max_tokens, temperature)
+
+    async def agenerate_with_image_json(self, prompt, image_base64, system_prompt=None):
+        """Version asynchrone de generate_with_image_json()"""
+        return await to_async(self.generate_with_image_json, prompt, image_base64, system_prompt)
+
+    def _stream_json(self, payload, timeout):
+        """Envoie la requête en streaming et s'arrête au premier objet JSON complet"""
+        payload["stream"] = True
+        parser = JsonStreamParser()
+        self.last_response = ""
+        self.last_error = None
+        self._record_metrics()
+
+        kind = "json_image" if payload.get("images") else "json"
+        cache_key = self._cache_key(payload, kind="json")
+        if cache_key:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                self.last_response = cached
+                self._record_metrics(cached=True)
+                inference_telemetry.record(self.component, self.model, kind, 0.0, cached=True)
+                return extract_json(cached)
+
+        ttft_s = None
+        final_chunk = None
+        chunks = 0
+        start = time.time()
+        try:
+            self._before_call()
+            start = time.time()
+            # Fermer la réponse avant la fin du flux annule la génération côté Ollama
+            with self.session.post(
+                self.base_url,
+                json=payload,
+                timeout=timeout,
+                stream=True
+            ) as response:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if "error" in chunk:
+                        raise RuntimeError(chunk["error"])
+                    # Temps jusqu'au premier token ≈ chargement + évaluation du prompt
+                    if ttft_s is None:
+                        ttft_s = time.time() - start
+                        self._record_metrics(ttft_s=ttft_s)
+                    chunks += 1
+                    if chunk.get("done"):
+                        final_chunk = chunk
+                        self._record_metrics(chunk, ttft_s)
+                    result = parser.feed(chunk.get("response", ""))
+                    if result is not None:
+                        self.last_response = parser.buffer
+                        if cache_key:
+                            response_cache.put(cache_key, self.model, parser.buffer)
+                        return result
+                    if chunk.get("done"):
+                        break
+            self.last_response = parser.buffer
+            self.last_error = "Aucun JSON dans la réponse"
+            return None
+        except Exception as e:
+            self.last_response = parser.buffer
+            self.last_error = f"Erreur Ollama: {e}"
+            return None
+        finally:
+            inference_telemetry.record(
+                self.component,
+                self.model,
+                kind,
+                time.time() - start,
+                final_chunk,
+                ttft_s=ttft_s,
+                streamed_tokens=chunks,
+            )
+            self._after_call()
+
+    def _cache_key(self, payload, kind="text"):
+        """Clé de cache si l'appel est déterministe (temperature 0), sinon None"""
+        options = payload.get("options")
+        if not ResponseCache.is_cacheable(options):
+            return None
+        images = payload.get("images")
+        return ResponseCache.make_key(
+            self.model,
+            payload.get("prompt"),
+            system=payload.get("system"),
+            image_base64=images[0] if images else None,
+            options=options,
+            kind=kind,
+        )
+
+    def _before_call(self, reason=""):
+        """
+        Début d'appel: créneau du dispatcher (par priorité) puis réservation du modèle
+        Appelé dans le try de l'appelant: _after_call libère ce qui a été pris, même
+        si le chargement du modèle échoue.
+        """
+        self._last.acquired = False
+        slot = llm_dispatcher.slot(self.priority)
+        slot.__enter__()
+        self._last.slot = slot
+        residency_manager.acquire(self.model, reason=reason)
+        self._last.acquired = True
+
+    def _after_call(self):
+        """Fin d'appel: libère la réservation (et l'état résident en mode evict) puis le créneau"""
+        if getattr(self._last, "acquired", False):
+            self._last.acquired = False
+            residency_manager.release(self.model)
+        slot = getattr(self._last, "slot", None)
+        if slot is not None:
+            self._last.slot = None
+            slot.__exit__(None, None, None)
+        if self.residency == "evict":
+            residency_manager.mark_unloaded(self.model)
+
+    def preload(self):
+        """Charge le modèle en VRAM sans générer (requête sans prompt)"""
+        payload = {
+            "model": self.model,
+            "keep_alive": self._keep_alive(),
+        }
+        try:
+            self.session.post(self.base_url, json=payload, timeout=TIMEOUT_OLLAMA)
+            return True
+        except Exception as e:
+            print(f"[Ollama] Erreur préchargement {self.model}: {e}")
+            return False
+
+    def loaded_models(self):
+        """
+        Liste les modèles actuellement chargés par Ollama (/api/ps)
+        Returns:
+            list: [{"name": str, "size_vram": int (octets)}, ...]
+        """
+        try:
+            response = self.session.get(api_url("ps"), timeout=5)
+            return [
+                {"name": m.get("name", ""), "size_vram": m.get("size_vram", 0)}
+                for m in response.json().get("models", [])
+            ]
+        except Exception as e:
+            print(f"[Ollama] Erreur lecture modèles chargés: {e}")
+            return []
+
+    def unload(self, force=False):
+        """
+        Libère le modèle de la VRAM selon la politique de résidence
+        - pin / ttl : rien (sauf force=True), le modèle reste chaud pour l'étape suivante
+        - pressure  : le gestionnaire VRAM évince les modèles LRU si GPU_VRAM_BUDGET_MB est dépassé
+        - evict     : déchargé immédiatement (ancien comportement)
+        Returns:
+            bool: True si le modèle a été déchargé
+        """
+        if not force:
+            if self.residency in ("pin", "ttl"):
+                return False
+            if self.residency == "pressure":
+                residency_manager.enforce_budget(reason=f"pression après {self.model}")
+                return not residency_manager.is_resident(self.model)
+
         payload = {
             "model": self.model,
             "keep_alive": 0
         }
-        
+
         try:
-            requests.post(
+            self.session.post(
                 self.base_url,
                 json=payload,
                 timeout=5
             )
+            residency_manager.mark_unloaded(self.model)
             print(f"[Ollama] Modèle {self.model} déchargé de la VRAM")
+            return True
         except Exception as e:
-            print(f"[Ollama] Erreur déchargement: {e}")
\ No newline at end of file
+            print(f"[Ollama] Erreur déchargement: {e}")
+            return False
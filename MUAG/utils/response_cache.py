@@ -0,0 +1,180 @@
+"""
+Response Cache - Cache disque des réponses LLM/VLM déterministes (température 0)
+Clé = sha256(modèle + prompt + system + hash image + options)
+Stockage SQLite avec éviction LRU (RESPONSE_CACHE_MAX_ENTRIES) et TTL (RESPONSE_CACHE_TTL_S)
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from config import (
+    RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_FILE,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_TTL_S,
+)
+
+
+class ResponseCache:
+    """
+    Cache adressé par contenu des réponses Ollama
+
+    Seuls les appels déterministes (temperature == 0) sont cachés, et jamais
+    les réponses d'erreur.
+    """
+
+    def __init__(self, path=None, max_entries=None, ttl_s=None, enabled=None):
+        self.path = str(path or RESPONSE_CACHE_FILE)
+        self.max_entries = max_entries or RESPONSE_CACHE_MAX_ENTRIES
+        self.ttl_s = ttl_s if ttl_s is not None else RESPONSE_CACHE_TTL_S
+        self.enabled = RESPONSE_CACHE_ENABLED if enabled is None else enabled
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+        self._conn = None
+
+    # ============================================
+    # CLÉ
+    # ============================================
+
+    @staticmethod
+    def is_cacheable(options: Optional[Dict]) -> bool:
+        """Un appel est cachable seulement s'il est déterministe"""
+        return options is not None and options.get("temperature") == 0
+
+    @staticmethod
+    def make_key(model, prompt, system=None, image_base64=None, options=None, kind="text") -> str:
+        """Clé sha256 stable (l'image est réduite à son propre hash)"""
+        image_hash = (
+            hashlib.sha256(image_base64.encode()).hexdigest() if image_base64 else None
+        )
+        material = json.dumps(
+            {
+                "model": model,
+                "prompt": prompt,
+                "system": system,
+                "image": image_hash,
+                "options": options or {},
+                "kind": kind,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    # ============================================
+    # LECTURE / ÉCRITURE
+    # ============================================
+
+    def get(self, key: str) -> Optional[str]:
+        """Retourne la réponse cachée (ou None), met à jour l'horodatage LRU"""
+        if not self.enabled:
+            return None
+        with self.lock:
+            try:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT response, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self.stats["misses"] += 1
+                    return None
+                response, created = row
+                now = time.time()
+                if self.ttl_s and now - created > self.ttl_s:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    conn.commit()
+                    self.stats["expired"] += 1
+                    self.stats["misses"] += 1
+                    return None
+                conn.execute(
+                    "UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                    (now, key),
+                )
+                conn.commit()
+                self.stats["hits"] += 1
+                return response
+            except sqlite3.Error as e:
+                print(f"[Cache] Erreur lecture: {e}")
+                return None
+
+    def put(self, key: str, model: str, response: str):
+        """Enregistre une réponse (puis évince les entrées les moins récemment utilisées)"""
+        if not self.enabled or not response:
+            return
+        with self.lock:
+            try:
+                conn = self._connect()
+                now = time.time()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, response, created, last_used, hits) "
+                    "VALUES (?, ?, ?, ?, ?, 0)",
+                    (key, model, response, now, now),
+                )
+                self.stats["stores"] += 1
+                self._evict(conn)
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"[Cache] Erreur écriture: {e}")
+
+    def clear(self):
+        """Vide le cache"""
+        with self.lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def get_stats(self) -> Dict:
+        """Compteurs hit/miss + taille actuelle"""
+        with self.lock:
+            stats = dict(self.stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            try:
+                stats["entries"] = self._connect().execute(
+                    "SELECT COUNT(*) FROM responses"
+                ).fetchone()[0]
+            except sqlite3.Error:
+                stats["entries"] = 0
+            return stats
+
+    # ============================================
+    # INTERNE
+    # ============================================
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT, response TEXT, "
+                "created REAL, last_used REAL, hits INTEGER)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_last_used ON responses (last_used)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _evict(self, conn):
+        """TTL puis LRU (appelé sous verrou)"""
+        if self.ttl_s:
+            cursor = conn.execute(
+                "DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_s,)
+            )
+            self.stats["expired"] += max(cursor.rowcount, 0)
+        count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+            self.stats["evictions"] += excess
+
+
+# Instance globale
+response_cache = ResponseCache()
@@ -0,0 +1,150 @@
+"""
+Startup Orchestrator - Chargement parallèle des modèles au démarrage
+Les composants indépendants (Whisper, XTTS, calibration micro, agents, LLM,
+vision CUA) sont chargés en même temps sur un pool de threads puis préchauffés
+par une inférence factice (kernels CUDA initialisés avant la première requête).
+
+Les composants requis forment l'ensemble minimal pour répondre: dès qu'ils sont
+prêts, l'agent démarre; les composants optionnels finissent en arrière-plan.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from config import STARTUP_MAX_WORKERS, STARTUP_WARMUP
+
+
+class Component:
+    """Un composant à charger: load_fn() → valeur, puis warmup_fn(valeur)"""
+
+    def __init__(
+        self,
+        name: str,
+        load_fn: Callable[[], Any],
+        warmup_fn: Optional[Callable[[Any], Any]] = None,
+        required: bool = True,
+    ):
+        self.name = name
+        self.load_fn = load_fn
+        self.warmup_fn = warmup_fn
+        self.required = required
+        self.status = "pending"  # pending → loading → warming → ready | failed
+        self.value = None
+        self.error: Optional[Exception] = None
+        self.load_s = 0.0
+        self.warmup_s = 0.0
+        self.future = None
+
+
+class StartupOrchestrator:
+    """Charge les composants en parallèle et attend l'ensemble minimal"""
+
+    def __init__(self, max_workers: Optional[int] = None, warmup: Optional[bool] = None):
+        self.max_workers = max_workers or STARTUP_MAX_WORKERS
+        self.warmup = STARTUP_WARMUP if warmup is None else warmup
+        self.components: Dict[str, Component] = {}
+        self.executor = None
+        self.started_at = None
+
+    def add(
+        self,
+        name: str,
+        load_fn: Callable[[], Any],
+        warmup_fn: Optional[Callable[[Any], Any]] = None,
+        required: bool = True,
+    ) -> "StartupOrchestrator":
+        """Déclare un composant (avant start())"""
+        self.components[name] = Component(name, load_fn, warmup_fn, required)
+        return self
+
+    def start(self) -> "StartupOrchestrator":
+        """Lance le chargement de tous les composants"""
+        self.started_at = time.time()
+        workers = max(1, min(self.max_workers, len(self.components)))
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="startup")
+        # Requis d'abord: ils passent devant si le pool est plus petit que la liste
+        ordered = sorted(self.components.values(), key=lambda c: not c.required)
+        for component in ordered:
+            component.future = self.executor.submit(self._run, component)
+        print(f"[Startup] {len(ordered)} composant(s) en chargement sur {workers} thread(s)")
+        return self
+
+    def _run(self, component: Component):
+        try:
+            component.status = "loading"
+            start = time.time()
+            component.value = component.load_fn()
+            component.load_s = time.time() - start
+
+            if self.warmup and component.warmup_fn is not None:
+                component.status = "warming"
+                start = time.time()
+                component.warmup_fn(component.value)
+                component.warmup_s = time.time() - start
+
+            component.status = "ready"
+            print(
+                f"[Startup] ✅ {component.name} prêt "
+                f"(chargement {component.load_s:.2f}s, warmup {component.warmup_s:.2f}s)"
+            )
+        except Exception as e:
+            component.status = "failed"
+            component.error = e
+            level = "❌" if component.required else "⚠️"
+            print(f"[Startup] {level} {component.name} en échec: {e}")
+        return component.value
+
+    def wait_required(self, timeout: Optional[float] = None) -> bool:
+        """
+        Attend l'ensemble minimal (composants requis)
+        Returns:
+            True si tous les composants requis sont prêts
+        """
+        futures = [c.future for c in self.components.values() if c.required]
+        wait(futures, timeout=timeout)
+        ready = all(c.status == "ready" for c in self.components.values() if c.required)
+        elapsed = time.time() - self.started_at
+        pending = [c.name for c in self.components.values() if not c.required and c.status != "ready"]
+        if ready:
+            suffix = f", en arrière-plan: {', '.join(pending)}" if pending else ""
+            print(f"[Startup] Ensemble minimal prêt en {elapsed:.2f}s{suffix}")
+        self.report()
+        return ready
+
+    def get(self, name: str, timeout: Optional[float] = None):
+        """Valeur d'un composant (attend sa fin de chargement)"""
+        component = self.components[name]
+        component.future.result(timeout=timeout)
+        return component.value
+
+    def failed(self) -> List[str]:
+        return [c.name for c in self.components.values() if c.status == "failed"]
+
+    def report(self) -> Dict[str, Dict]:
+        """Temps de chargement / warmup par composant"""
+        report = {}
+        print("[Startup] Composant        Statut    Chargement  Warmup")
+        for c in self.components.values():
+            report[c.name] = {
+                "status": c.status,
+                "required": c.required,
+                "load_s": c.load_s,
+                "warmup_s": c.warmup_s,
+                "error": str(c.error) if c.error else None,
+            }
+            flag = "*" if c.required else " "
+            print(f"[Startup] {flag}{c.name:<15} {c.status:<9} {c.load_s:>9.2f}s {c.warmup_s:>6.2f}s")
+        return report
+
+    def shutdown(self, wait_pending: bool = False, cancel_pending: bool = False):
+        """
+        Libère le pool
+        wait_pending: attendre la fin des composants encore en chargement
+        cancel_pending: abandonner ceux pas encore démarrés (signalés, jamais en silence)
+        """
+        if self.executor is None:
+            return
+        pending = [c.name for c in self.components.values() if c.status == "pending"]
+        if cancel_pending and pending:
+            print(f"[Startup] Chargement abandonné: {', '.join(pending)}")
+        self.executor.shutdown(wait=wait_pending, cancel_futures=cancel_pending)
@@ -14,6 +14,7 @@ from config import (
     WHISPER_VAD_FILTER,
     AUDIO_SAMPLE_RATE
 )
+from utils.model_residency import residency_manager
 
 
 class STTEngine:
@@ -46,6 +47,10 @@ class STTEngine:
             )
             print(f"✅ Whisper chargé sur {self.device}")
             
+            # Whisper (CTranslate2) ne peut pas être déplacé: épinglé en VRAM
+            if self.device == "cuda":
+                residency_manager.register("whisper", pinned=True, resident=True)
+            
         except Exception as e:
             print(f"❌ Erreur lors du chargement de Whisper: {e}")
             raise
@@ -87,6 +92,17 @@ class STTEngine:
             print(f"❌ Erreur lors de la transcription: {e}")
             return ""
     
+    def warmup(self):
+        """Transcription factice (1s de silence) pour initialiser le modèle"""
+        silence = np.zeros(AUDIO_SAMPLE_RATE, dtype=np.float32)
+        segments, _ = self.model.transcribe(
+            silence,
+            language=self.language,
+            vad_filter=False,  # Le VAD couperait le silence avant le décodeur
+            beam_size=1
+        )
+        list(segments)  # Générateur: le décodage n'a lieu qu'à l'itération
+    
     def transcribe_file(self, audio_file, language=None):
         """
         Transcrit un fichier audio
@@ -15,6 +15,7 @@ from config import (
     TTS_SPEAKER_WAV,
     AUDIO_SAMPLE_RATE
 )
+from utils.model_residency import residency_manager
 
 
 class TTSEngine:
@@ -43,6 +44,15 @@ class TTSEngine:
             
             print(f"✅ TTS chargé sur {self.device}")
             
+            # XTTS peut céder la VRAM aux VLM pendant une tâche CUA
+            if self.device == "cuda":
+                residency_manager.register(
+                    "xtts",
+                    load_fn=lambda: self._move_model(self.device),
+                    unload_fn=lambda: self._move_model("cpu"),
+                    resident=True,
+                )
+            
             # Si XTTS, vérifier les speakers disponibles
             if "xtts" in self.model_name.lower():
                 self.is_multi_speaker = True
@@ -54,6 +64,12 @@ class TTSEngine:
             print(f"❌ Erreur lors du chargement de TTS: {e}")
             raise
     
+    def _move_model(self, device):
+        """Déplace XTTS entre GPU et CPU (appelé par le gestionnaire de résidence)"""
+        self.tts = self.tts.to(device)
+        if device == "cpu" and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    
     def synthesize(self, text, language=None, speaker_wav=None, save_path=None):
         """
         Synthétise le texte en audio
@@ -69,7 +85,11 @@ class TTSEngine:
             print("⚠️ Texte vide, pas de synthèse")
             return None
         
+        acquired = False
         try:
+            if self.device == "cuda":
+                residency_manager.acquire("xtts", reason="synthèse vocale")
+                acquired = True
             language = language or self.language
             speaker_wav = speaker_wav or self.speaker_wav
             
@@ -107,6 +127,13 @@ class TTSEngine:
         except Exception as e:
             print(f"❌ Erreur lors de la synthèse: {e}")
             return None
+        finally:
+            if acquired:
+                residency_manager.release("xtts")
+    
+    def warmup(self):
+        """Synthèse factice courte pour initialiser le modèle"""
+        return self.synthesize("Bonjour.") is not None
     
     def synthesize_to_file(self, text, output_file, language=None, speaker_wav=None):
         """
@@ -29,28 +29,41 @@ class VoiceManager:
             calibrate_mic: calibrer le microphone au démarrage
         """
         try:
-            # Charger STT
-            print("\n📥 Chargement de Whisper...")
-            self.stt_engine = STTEngine()
-            
-            # Charger TTS
-            print("\n📥 Chargement de XTTS...")
-            self.tts_engine = TTSEngine()
+            self.load_stt()
+            self.load_tts()
             
             # Calibrer le microphone si demandé
             if calibrate_mic:
-                print("\n🎚️ Calibration du microphone...")
-                self.audio_handler.calibrate_silence_threshold(duration=3)
-            
-            self.is_initialized = True
-            print("\n✅ Gestionnaire vocal prêt!")
+                self.calibrate()
             
+            self.mark_ready()
             return True
             
         except Exception as e:
             print(f"\n❌ Erreur lors de l'initialisation: {e}")
             return False
     
+    # Étapes d'initialisation séparées: le StartupOrchestrator les lance en parallèle
+    def load_stt(self):
+        print("\n📥 Chargement de Whisper...")
+        self.stt_engine = STTEngine()
+        return self.stt_engine
+    
+    def load_tts(self):
+        print("\n📥 Chargement de XTTS...")
+        self.tts_engine = TTSEngine()
+        return self.tts_engine
+    
+    def calibrate(self, duration=3):
+        print("\n🎚️ Calibration du microphone...")
+        return self.audio_handler.calibrate_silence_threshold(duration=duration)
+    
+    def mark_ready(self):
+        self.is_initialized = self.stt_engine is not None and self.tts_engine is not None
+        if self.is_initialized:
+            print("\n✅ Gestionnaire vocal prêt!")
+        return self.is_initialized
+    
     def listen(self):
         """
         Écoute l'utilisateur et transcrit en texte